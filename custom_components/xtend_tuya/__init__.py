@@ -17,6 +17,7 @@ from .const import (
     LOGGER,
     XTDeviceWatcherSpecialDevice,
     XTDeviceWatcherCategory,
+    XT_DEVICE_SNAPSHOT_STARTUP,
 )
 from .multi_manager.multi_manager import (
     MultiManager,
@@ -25,6 +26,12 @@ from .multi_manager.multi_manager import (
 from .multi_manager.shared.shared_classes import (
     HomeAssistantXTData,
 )
+from .multi_manager.shared.device_snapshot import (
+    XTDeviceSnapshot,
+)
+from .multi_manager.shared.product_schema_cache import (
+    XTProductSchemaCache,
+)
 from .multi_manager.shared.threading import (
     XTEventLoopProtector,
     XTConcurrencyManager,
@@ -88,29 +95,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: XTConfigEntry) -> bool:
     XTConcurrencyManager.hass = hass
     XTTuyaPatcher.patch_tuya_code()
     start_time = datetime.now()
-    last_time = start_time
     multi_manager = MultiManager(hass, entry)
     service_manager = ServiceManager(multi_manager=multi_manager)
-    last_time = datetime.now()
-    await multi_manager.setup_entry()
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for setup_entry",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("setup_entry", report=True):
+        await multi_manager.setup_entry()
 
-    # Get all devices from Tuya
-    last_time = datetime.now()
-    await multi_manager.update_device_cache()
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for update_device_cache",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    # Get all devices from Tuya (or from the last run, refreshed once loaded)
+    with multi_manager.startup_tracer.span("update_device_cache", report=True):
+        if not (
+            XT_DEVICE_SNAPSHOT_STARTUP and await multi_manager.async_load_device_snapshot()
+        ):
+            await multi_manager.update_device_cache()
 
     # Connection is successful, store the manager & listener
     entry.runtime_data = HomeAssistantXTData(
@@ -120,134 +115,71 @@ async def async_setup_entry(hass: HomeAssistant, entry: XTConfigEntry) -> bool:
     )
 
     # Cleanup device registry
-    last_time = datetime.now()
-    XTEventLoopProtector.execute_out_of_event_loop(
-        cleanup_device_registry, hass, multi_manager, entry
-    )
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for cleanup_device_registry",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("cleanup_device_registry", report=True):
+        XTEventLoopProtector.execute_out_of_event_loop(
+            cleanup_device_registry, hass, multi_manager, entry
+        )
 
     # Register known device IDs
-    last_time = datetime.now()
-    device_registry = dr.async_get(hass)
-    aggregated_device_map = multi_manager.device_map
-    for device in aggregated_device_map.values():
-        XTEntity.mark_overriden_entities_as_disabled(hass, device)
-        XTEntity.register_current_entities_as_handled_dpcode(hass, device)
-        multi_manager.virtual_state_handler.apply_init_virtual_states(device)
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for device id registration",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
-
-    last_time = datetime.now()
-    for device in aggregated_device_map.values():
-        domain_identifiers: list = multi_manager.get_domain_identifiers_of_device(
-            device.id
-        )
-        identifiers: set[tuple[str, str]] = set()
-        if device_registry.async_get_device({(DOMAIN_ORIG, device.id)}) is not None:
-            identifiers.add((DOMAIN_ORIG, device.id))
-
-        for domain_identifier in domain_identifiers:
-            identifiers.add((domain_identifier, device.id))
-        device_entry = device_registry.async_get_or_create(
-            config_entry_id=entry.entry_id,
-            identifiers=identifiers,
-            manufacturer="Tuya",
-            name=device.name,
-            model=f"{device.product_name} (unsupported)",
-        )
-        # Enable the device if it was disabled by the integration
-        if (
-            device_entry.disabled_by is not None
-            and device_entry.disabled_by != DeviceEntryDisabler.USER
-        ):
-            device_registry.async_update_device(
-                device_entry.id,
-                disabled_by=None,
+    with multi_manager.startup_tracer.span("device id registration", report=True):
+        device_registry = dr.async_get(hass)
+        aggregated_device_map = multi_manager.device_map
+        for device in aggregated_device_map.values():
+            XTEntity.mark_overriden_entities_as_disabled(hass, device)
+            XTEntity.register_current_entities_as_handled_dpcode(hass, device)
+            multi_manager.virtual_state_handler.apply_init_virtual_states(device)
+
+    with multi_manager.startup_tracer.span("create device", report=True):
+        for device in aggregated_device_map.values():
+            domain_identifiers: list = multi_manager.get_domain_identifiers_of_device(
+                device.id
             )
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for create device",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+            identifiers: set[tuple[str, str]] = set()
+            if device_registry.async_get_device({(DOMAIN_ORIG, device.id)}) is not None:
+                identifiers.add((DOMAIN_ORIG, device.id))
+
+            for domain_identifier in domain_identifiers:
+                identifiers.add((domain_identifier, device.id))
+            device_entry = device_registry.async_get_or_create(
+                config_entry_id=entry.entry_id,
+                identifiers=identifiers,
+                manufacturer="Tuya",
+                name=device.name,
+                model=f"{device.product_name} (unsupported)",
+            )
+            # Enable the device if it was disabled by the integration
+            if (
+                device_entry.disabled_by is not None
+                and device_entry.disabled_by != DeviceEntryDisabler.USER
+            ):
+                device_registry.async_update_device(
+                    device_entry.id,
+                    disabled_by=None,
+                )
 
-    last_time = datetime.now()
-    await multi_manager.setup_entity_parsers()
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for setup_entity_parsers",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("setup_entity_parsers", report=True):
+        await multi_manager.setup_entity_parsers()
 
-    last_time = datetime.now()
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for async_forward_entry_setups",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("async_forward_entry_setups", report=True):
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # If the device does not register any entities, the device does not need to subscribe
     # So the subscription is here
-    last_time = datetime.now()
-    await XTEventLoopProtector.execute_out_of_event_loop_and_return(
-        multi_manager.refresh_mq
-    )
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for refresh_mq",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("refresh_mq", report=True):
+        await XTEventLoopProtector.execute_out_of_event_loop_and_return(
+            multi_manager.refresh_mq
+        )
 
-    last_time = datetime.now()
-    service_manager.register_services()
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for register_services",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("register_services", report=True):
+        service_manager.register_services()
 
-    last_time = datetime.now()
-    XTEventLoopProtector.execute_out_of_event_loop(
-        cleanup_duplicated_devices, hass, entry
-    )
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for cleanup_duplicated_devices",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("cleanup_duplicated_devices", report=True):
+        XTEventLoopProtector.execute_out_of_event_loop(
+            cleanup_duplicated_devices, hass, entry
+        )
 
-    last_time = datetime.now()
-    await multi_manager.on_loading_finalized(hass, entry)
-    multi_manager.device_watcher.report_message(
-        XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
-        f"Xtended Tuya {entry.title} {datetime.now() - last_time} for on_loading_finalized",
-        XTDeviceWatcherCategory.XT_PERFORMANCE,
-        None,
-        False,
-    )
+    with multi_manager.startup_tracer.span("on_loading_finalized", report=True):
+        await multi_manager.on_loading_finalized(hass, entry)
     multi_manager.device_watcher.report_message(
         XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
         f"Xtended Tuya {entry.title} loaded in {datetime.now() - start_time}",
@@ -255,6 +187,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: XTConfigEntry) -> bool:
         None,
         False,
     )
+    if multi_manager.loaded_from_snapshot:
+        entry.async_create_background_task(
+            hass,
+            multi_manager.async_refresh_device_cache_from_cloud(),
+            f"{DOMAIN}_refresh_device_cache_{entry.entry_id}",
+        )
+    else:
+        if XT_DEVICE_SNAPSHOT_STARTUP:
+            await multi_manager.device_snapshot.async_save()
+        multi_manager.startup_tracer.stop()
     return True
 
 
@@ -374,6 +316,8 @@ async def async_remove_entry(hass: HomeAssistant, entry: XTConfigEntry) -> None:
 
     This will revoke the credentials from Tuya.
     """
+    await XTDeviceSnapshot.get_store(hass, entry.entry_id).async_remove()
+    await XTProductSchemaCache.get_store(hass, entry.entry_id).async_remove()
     runtime_data = get_config_entry_runtime_data(hass, entry, DOMAIN)
     if runtime_data:
         await XTEventLoopProtector.execute_out_of_event_loop_and_return(
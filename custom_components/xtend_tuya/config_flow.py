@@ -43,6 +43,7 @@ from .const import (
     CONF_PASSWORD_OT,
     CONF_USERNAME,
     CONF_USERNAME_OT,
+    CONF_STARTUP_TRACING,
     SMARTLIFE_APP,
     TUYA_COUNTRIES,
     TUYA_SMART_APP,
@@ -66,6 +67,7 @@ class XTStepId(StrEnum):
     INIT = "init"
     CONFIGURE_API = "configure_api"
     DEVICE_SETTINGS = "device_settings"
+    ADVANCED_SETTINGS = "advanced_settings"
     SELECT_CLIMATE_DEVICE = "select_climate_device"
     CLIMATE_DEVICE_SETTINGS = "climate_device_settings"
 
@@ -76,7 +78,11 @@ OPTION_STEP_DEFINITION: dict[XTStepId, tuple[str, list[Any], dict[str, Any], boo
         [],
         {
             "step_id": XTStepId.INIT,
-            "menu_options": [XTStepId.CONFIGURE_API, XTStepId.DEVICE_SETTINGS],
+            "menu_options": [
+                XTStepId.CONFIGURE_API,
+                XTStepId.DEVICE_SETTINGS,
+                XTStepId.ADVANCED_SETTINGS,
+            ],
         },
         False,
     ),
@@ -362,8 +368,32 @@ class TuyaOptionFlow(OptionsFlow):
                 # Preserve device_settings when updating API config
                 if "device_settings" in self.options:
                     data["device_settings"] = self.options["device_settings"]
+                if CONF_STARTUP_TRACING in self.options:
+                    data[CONF_STARTUP_TRACING] = self.options[CONF_STARTUP_TRACING]
                 return self.async_create_entry(data=data)
 
+    async def async_step_advanced_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        if user_input is not None:
+            new_options = dict(self.options)
+            new_options[CONF_STARTUP_TRACING] = user_input.get(
+                CONF_STARTUP_TRACING, False
+            )
+            return self.async_create_entry(title="", data=new_options)
+
+        return self.async_show_form(
+            step_id=XTStepId.ADVANCED_SETTINGS,
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_STARTUP_TRACING,
+                        default=self.options.get(CONF_STARTUP_TRACING, False),
+                    ): bool,
+                }
+            ),
+        )
+
     async def async_step_select_device(
         self,
         user_input: dict[str, Any] | None = None,
@@ -28,6 +28,7 @@ CONF_TERMINAL_ID = "terminal_id"
 CONF_TOKEN_INFO = "token_info"
 CONF_USER_CODE = "user_code"
 CONF_USERNAME = "username"
+CONF_STARTUP_TRACING = "startup_tracing"
 # OpenTuya specific conf
 CONF_NO_OPENAPI = "no_openapi"
 CONF_ENDPOINT_OT = "endpoint"
@@ -63,6 +64,86 @@ CROSS_CATEGORY_DEVICE_DESCRIPTOR: str = "cross_category_device_descriptor"
 
 XT_RETRY_FAILED_CALLS_NUMBER: int = 5
 
+XT_MQTT_INGEST_WORKER_COUNT: int = 4  # 0 processes messages on the MQTT thread
+XT_MQTT_INGEST_QUEUE_SIZE: int = 2000  # Shared between all the workers
+# Maximum number of status items and events kept while the devices are loading
+XT_MQTT_PENDING_BUFFER_SIZE: int = 20000
+
+# Delay (in seconds) used to group the status updates of a device before
+# dispatching them to the entities, 0 disables the grouping.
+# Opt-in per category, e.g. {"zndb": 1.0} for chatty electricity meters
+XT_STATUS_COALESCING_WINDOW: float = 0.0
+XT_STATUS_COALESCING_CATEGORY_WINDOWS: dict[str, float] = {}
+# Locks, alarms and event based devices are always dispatched immediately
+XT_STATUS_COALESCING_BYPASS_CATEGORIES: set[str] = {
+    "ms",  # Residential lock
+    "jtmspro",  # Residential lock pro
+    "jtmsbh",  # Smart lock (keep alive)
+    "videolock",  # Lock with camera
+    "gyms",  # Business lock
+    "mal",  # Alarm host
+    "sgbj",  # Siren alarm
+    "ywbj",  # Smoke alarm
+    "rqbj",  # Gas alarm
+    "cobj",  # CO detector
+    "sj",  # Water leak detector
+    "mcs",  # Contact sensor
+    "pir",  # Motion sensor
+    "sos",  # Emergency button
+    "wxkg",  # Wireless switch
+    "sp",  # Camera / doorbell
+}
+
+# Identical reports received from another source within this delay (in
+# seconds) are dropped, at most XT_DEDUPLICATION_CACHE_SIZE reports are kept
+XT_DEDUPLICATION_HORIZON: float = 5.0
+XT_DEDUPLICATION_CACHE_SIZE: int = 4096
+
+# Maximum number of topics sent in a single SUBSCRIBE / UNSUBSCRIBE packet
+XT_SHARING_MQ_SUBSCRIBE_BATCH_SIZE: int = 100
+
+# Maximum number of concurrent async API requests per account
+XT_API_MAX_CONCURRENT_REQUESTS: int = 20
+
+# Requests per second allowed per account (token bucket), halved on throttling
+XT_API_RATE_LIMIT: float = 10.0
+XT_API_RATE_LIMIT_BURST: int = 20
+
+# Commands sent to a device while a request to it is in flight are grouped
+# and sent together once it is done (a single request per route)
+XT_COMMAND_BATCHING: bool = True
+
+# Entity commands are sent in the background and their value is shown right
+# away, it is rolled back if no report confirms it within this delay (in seconds)
+XT_COMMAND_OPTIMISTIC_UPDATE: bool = True
+XT_COMMAND_CONFIRMATION_TIMEOUT: float = 10.0
+
+# Start from the devices saved at the last run and refresh them from the
+# cloud in the background
+XT_DEVICE_SNAPSHOT_STARTUP: bool = True
+XT_DEVICE_SNAPSHOT_REFRESH_RETRY_DELAY: float = 30.0
+XT_DEVICE_SNAPSHOT_REFRESH_MAX_RETRY_DELAY: float = 600.0
+
+# Devices bound while running are fetched after this delay (in seconds), the
+# time for the cloud to sync them
+XT_ADD_DEVICE_SYNC_DELAY: float = 1.0
+
+# Specifications and models are fetched once per product, kept across restarts
+XT_PRODUCT_SCHEMA_CACHE_MAX_AGE: float = 7 * 24 * 3600
+
+# Workers of the thread pool shared by all the config entries, and of the pool
+# running the jobs submitted by its jobs (nested fan-out)
+XT_EXECUTOR_MAX_WORKERS: int = 16
+XT_EXECUTOR_MAX_NESTED_WORKERS: int = 16
+
+# Sub-assets and devices of the IOT assets are fetched again after this
+# delay (in seconds), at most XT_IOT_ASSET_MAX_CONCURRENCY pages at a time
+XT_IOT_ASSET_CACHE_TTL: float = 3600.0
+XT_IOT_ASSET_MAX_CONCURRENCY: int = 9
+
+# Spans kept when the startup tracing option is enabled
+XT_STARTUP_TRACE_MAX_SPANS: int = 200000
+
 class TuyaCloudOpenAPIEndpoint(StrEnum):
     """Tuya Cloud Open API Endpoint."""
 
@@ -178,6 +259,14 @@ class XTLockingMechanism(StrEnum):
     DPCODE_COMMAND = "dpcode_command"
 
 
+class XTCommandApiType(StrEnum):
+    """API used by an account to send a command"""
+
+    DEFAULT = "default"
+    OPEN_API_REGULAR = "open_api_regular"
+    PROPERTY_UPDATE = "property_update"
+
+
 class XTMultiManagerPostSetupCallbackPriority(IntEnum):
     PRIORITY1 = 1
     PRIORITY2 = 2
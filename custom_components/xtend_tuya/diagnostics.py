@@ -13,6 +13,9 @@ from .multi_manager.multi_manager import (
     XTConfigEntry,
     XTDevice,
 )
+from .multi_manager.shared.threading import (
+    XTExecutorService,
+)
 from .const import DOMAIN, DOMAIN_ORIG, XTDPCode
 
 
@@ -52,6 +55,28 @@ def _async_get_diagnostics(
     }
 
     if hass_data.manager is not None:
+        data["mqtt_ingest"] = hass_data.manager.mq.get_statistics()
+        data["mqtt_startup_buffer"] = (
+            hass_data.manager.pending_messages.get_statistics()
+        )
+        data["coalesced_status_updates"] = (
+            hass_data.manager.multi_device_listener.coalesced_update_count
+        )
+        data["status_report_pipeline"] = (
+            hass_data.manager.status_report_pipeline.get_statistics()
+        )
+        data["deduplication"] = hass_data.manager.message_deduplicator.get_statistics()
+        data["command_routes"] = hass_data.manager.command_route_cache.get_statistics()
+        data["command_batching"] = hass_data.manager.command_aggregator.get_statistics()
+        data["command_dispatch"] = hass_data.manager.command_dispatcher.get_statistics()
+        data["executor"] = XTExecutorService.get_statistics()
+        data["product_schemas"] = (
+            hass_data.manager.product_schema_cache.get_statistics()
+        )
+        data["accounts"] = {
+            account_name: account.get_statistics()
+            for account_name, account in hass_data.manager.accounts.items()
+        }
         if device:
             tuya_device_id = next(iter(device.identifiers))[1]
             if tuya_device_id in hass_data.manager.device_map:
@@ -467,6 +467,15 @@ class XTEntity(TuyaEntity):
             return getattr(self.dpcode_wrapper, "_DPTYPE")
         return None
 
+    async def _async_send_commands(self, commands: list[dict[str, Any]]) -> None:
+        # Don't wait for the cloud, the device report confirms the command later
+        if isinstance(self.device_manager, mm.MultiManager):
+            await self.device_manager.command_dispatcher.async_dispatch(
+                self.device, commands
+            )
+            return
+        await super()._async_send_commands(commands)
+
     @staticmethod
     def mark_overriden_entities_as_disabled(hass: HomeAssistant, device: sc.XTDevice):
         device_registry = dr.async_get(hass)
@@ -22,6 +22,25 @@ class TuyaAssetManager:
     # Asset Management
     # https://developer.tuya.com/docs/cloud/industrial-general-asset-management/4872453fec?id=Kag2yom602i40
 
+    def get_device_page(
+        self, asset_id: str, last_row_key: str = "", page_size: int = 100
+    ) -> dict[str, Any]:
+        """Get one page of the devices of an asset.
+
+        Args:
+          asset_id(str): asset id
+          last_row_key(str): last_row_key of the previous page
+          page_size(int): page size
+
+        Returns:
+          The response, its result holds the page (list, has_next,
+          last_row_key, total_size).
+        """
+        return self.api.get(
+            f"/v1.0/iot-02/assets/{asset_id}/devices",
+            {"last_row_key": last_row_key, "page_size": page_size},
+        )
+
     def get_device_list(self, asset_id: str) -> list[str]:
         """Get devices by asset_id.
 
@@ -36,11 +55,7 @@ class TuyaAssetManager:
         has_next = True
         last_row_key = ""
         while has_next:
-            response = self.api.get(
-                f"/v1.0/iot-02/assets/{asset_id}/devices",
-                {"last_row_key": last_row_key, "page_size": 100},
-            )
-            result = response.get("result", {})
+            result = self.get_device_page(asset_id, last_row_key).get("result", {})
             has_next = result.get("has_next", False)
             last_row_key = result.get("last_row_key", "")
             total_size = result.get("total_size", 0)
@@ -64,6 +79,30 @@ class TuyaAssetManager:
         """
         return self.api.get(f"/v1.0/iot-02/assets/{asset_id}")
 
+    def get_asset_page(
+        self, parent_asset_id: str = "-1", last_row_key: str = "", page_size: int = 100
+    ) -> dict[str, Any]:
+        """Get one page of the under-nodes of the current node.
+
+        Args:
+            parent_asset_id(str): current node
+            last_row_key(str): last_row_key of the previous page
+            page_size(int): page size
+
+        Returns:
+            The response, its result holds the page (list, has_next,
+            last_row_key).
+        """
+        return self.api.get(
+            f"/v1.0/iot-02/assets/{parent_asset_id}/sub-assets",
+            {
+                # "parent_asset_id": parent_asset_id,
+                "asset_id": parent_asset_id,
+                "last_row_key": last_row_key,
+                "page_size": page_size,
+            },
+        )
+
     def get_asset_list(self, parent_asset_id: str = "-1") -> list:
         """Get under-nodes unser the current node.
 
@@ -78,16 +117,9 @@ class TuyaAssetManager:
         last_row_key = ""
 
         while has_next:
-            response = self.api.get(
-                f"/v1.0/iot-02/assets/{parent_asset_id}/sub-assets",
-                {
-                    # "parent_asset_id": parent_asset_id,
-                    "asset_id": parent_asset_id,
-                    "last_row_key": last_row_key,
-                    "page_size": 100,
-                },
+            result = self.get_asset_page(parent_asset_id, last_row_key).get(
+                "result", {}
             )
-            result = response.get("result", {})
             has_next = result.get("has_next", False)
             last_row_key = result.get("last_row_key", "")
 
@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import time
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from types import SimpleNamespace
-from typing import Any, Literal, Optional
+from typing import Any, Callable, Literal, Optional
 
 from .openapi import TuyaOpenAPI
 from .openlogging import (
@@ -24,6 +26,10 @@ BIZCODE_DPNAME_UPDATE = "dpNameUpdate"
 BIZCODE_BIND_USER = "bindUser"
 BIZCODE_DELETE = "delete"
 
+# The multi-device endpoints accept at most 20 ids per call
+DEVICE_IDS_CHUNK_SIZE = 20
+DEVICE_IDS_CHUNK_CONCURRENCY = 4
+
 
 class TuyaDeviceFunction(SimpleNamespace):
     """Tuya device's function.
@@ -278,37 +284,51 @@ class TuyaDeviceManager:
         response = self.get_device_list_status(devIds)
         for item in response.get("result", []):
             device_id = item["id"]
+            if (device := self.device_map.get(device_id)) is None:
+                # Its info chunk failed
+                continue
             for status in item["status"]:
                 if "code" in status and "value" in status:
                     code = status["code"]
                     value = status["value"]
-                    device = self.device_map[device_id]
                     device.status[code] = value
 
     def update_device_function_cache(self, devIds: list = []):
         """Update device function cache."""
-        device_map = (
-            filter(lambda d: d.id in devIds, self.device_map.values())
-            if devIds
-            else self.device_map.values()
-        )
+        if devIds:
+            devices = [
+                self.device_map[device_id]
+                for device_id in dict.fromkeys(devIds)
+                if device_id in self.device_map
+            ]
+        else:
+            devices = list(self.device_map.values())
 
-        for device in device_map:
+        for device in devices:
             response = self.get_device_specification(device.id)
-            if response.get("success"):
-                result = response.get("result", {})
-                function_map = {}
-                for function in result["functions"]:
-                    code = function["code"]
-                    function_map[code] = TuyaDeviceFunction(**function)
-
-                status_range = {}
-                for status in result["status"]:
-                    code = status["code"]
-                    status_range[code] = TuyaDeviceStatusRange(**status)
+            self._apply_device_specification(device, response)
+
+    def _apply_device_specification(self, device: TuyaDevice, response: dict[str, Any]):
+        """Update device's functions and status ranges from its specification.
 
-                device.function = function_map
-                device.status_range = status_range
+        Args:
+          device(TuyaDevice): device to update
+          response(dict): response of get_device_specification
+        """
+        if response.get("success"):
+            result = response.get("result", {})
+            function_map = {}
+            for function in result["functions"]:
+                code = function["code"]
+                function_map[code] = TuyaDeviceFunction(**function)
+
+            status_range = {}
+            for status in result["status"]:
+                code = status["code"]
+                status_range[code] = TuyaDeviceStatusRange(**status)
+
+            device.function = function_map
+            device.status_range = status_range
 
     def add_device_listener(self, listener: TuyaDeviceListener):
         """Add device listener."""
@@ -512,6 +532,81 @@ class DeviceManage(metaclass=ABCMeta):
     def __init__(self, api: TuyaOpenAPI):
         self.api = api
 
+    def _run_concurrently(
+        self, jobs: list[Callable[[], Any]], max_concurrency: int
+    ) -> list[Any]:
+        """Run the jobs concurrently and return their results in order.
+
+        Can be overridden to run them on an executor shared with the caller.
+        """
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(jobs))
+        ) as executor:
+            return list(executor.map(lambda job: job(), jobs))
+
+    def _request_in_chunks(
+        self,
+        device_ids: list[str],
+        request: Callable[[list[str]], dict[str, Any]],
+        chunk_size: int = DEVICE_IDS_CHUNK_SIZE,
+    ) -> dict[str, Any]:
+        """Split device_ids in chunks requested concurrently and merge the responses.
+
+        The merged response is successful if at least one chunk succeeded, the
+        failed chunks are listed in "failed_chunks".
+        """
+        chunks = [
+            device_ids[i : i + chunk_size] for i in range(0, len(device_ids), chunk_size)
+        ]
+        if len(chunks) <= 1:
+            return request(device_ids)
+
+        def request_chunk(chunk: list[str]) -> dict[str, Any]:
+            try:
+                return request(chunk)
+            except Exception as e:
+                return {"success": False, "msg": str(e)}
+
+        responses = self._run_concurrently(
+            [partial(request_chunk, chunk) for chunk in chunks],
+            DEVICE_IDS_CHUNK_CONCURRENCY,
+        )
+
+        merged_response: dict[str, Any] = {"success": False, "failed_chunks": []}
+        for chunk, response in zip(chunks, responses):
+            if not response.get("success", False):
+                logger.warning(
+                    f"Request of {len(chunk)} devices failed ({chunk}): {response}"
+                )
+                merged_response["failed_chunks"].append(
+                    {"device_ids": chunk, "response": response}
+                )
+                continue
+            merged_response["success"] = True
+            merged_response["t"] = response.get("t", merged_response.get("t"))
+            result = response.get("result")
+            if "result" not in merged_response:
+                merged_response["result"] = result
+            elif isinstance(result, list):
+                merged_response["result"].extend(result)
+            elif isinstance(result, dict):
+                # Several keys can reference the same list
+                extended_lists: set[int] = set()
+                for key, value in result.items():
+                    merged_value = merged_response["result"].get(key)
+                    if (
+                        isinstance(value, list)
+                        and isinstance(merged_value, list)
+                        and id(merged_value) not in extended_lists
+                    ):
+                        merged_value.extend(value)
+                        extended_lists.add(id(merged_value))
+        if merged_response["success"] is False and merged_response["failed_chunks"]:
+            merged_response["msg"] = merged_response["failed_chunks"][0]["response"].get(
+                "msg"
+            )
+        return merged_response
+
     @abstractmethod
     def update_device_caches(self, device_ids: list[str]):
         pass
@@ -583,12 +678,15 @@ class SmartHomeDeviceManage(DeviceManage):
         return response
 
     def get_device_list_info(self, device_ids: list[str]) -> dict[str, Any]:
+        return self._request_in_chunks(device_ids, self._get_device_list_info_chunk)
+
+    def _get_device_list_info_chunk(self, device_ids: list[str]) -> dict[str, Any]:
         response = self.api.get("/v1.0/devices/", {"device_ids": ",".join(device_ids)})
         if response["success"]:
             for info in response["result"]["devices"]:
                 if "status" in info:
                     info.pop("status")
-        response["result"]["list"] = response["result"]["devices"]
+            response["result"]["list"] = response["result"]["devices"]
         return response
 
     def get_device_status(self, device_id: str) -> dict[str, Any]:
@@ -597,6 +695,9 @@ class SmartHomeDeviceManage(DeviceManage):
         return response
 
     def get_device_list_status(self, device_ids: list[str]) -> dict[str, Any]:
+        return self._request_in_chunks(device_ids, self._get_device_list_status_chunk)
+
+    def _get_device_list_status_chunk(self, device_ids: list[str]) -> dict[str, Any]:
         response = self.api.get("/v1.0/devices/", {"device_ids": ",".join(device_ids)})
         status_list = []
         if response["success"]:
@@ -607,8 +708,11 @@ class SmartHomeDeviceManage(DeviceManage):
         return response
 
     def get_factory_info(self, device_ids: list[str]) -> dict[str, Any]:
-        return self.api.get(
-            "/v1.0/devices/factory-infos", {"device_ids": ",".join(device_ids)}
+        return self._request_in_chunks(
+            device_ids,
+            lambda chunk: self.api.get(
+                "/v1.0/devices/factory-infos", {"device_ids": ",".join(chunk)}
+            ),
         )
 
     def factory_reset(self, device_id: str) -> dict[str, Any]:
@@ -665,21 +769,30 @@ class IndustrySolutionDeviceManage(DeviceManage):
         return self.api.get(f"/v1.0/iot-03/devices/{device_id}")
 
     def get_device_list_info(self, device_ids: list[str]) -> dict[str, Any]:
-        return self.api.get(
-            "/v1.0/iot-03/devices", {"device_ids": ",".join(device_ids)}
+        return self._request_in_chunks(
+            device_ids,
+            lambda chunk: self.api.get(
+                "/v1.0/iot-03/devices", {"device_ids": ",".join(chunk)}
+            ),
         )
 
     def get_device_status(self, device_id: str) -> dict[str, Any]:
         return self.api.get(f"/v1.0/iot-03/devices/{device_id}/status")
 
     def get_device_list_status(self, device_ids: list[str]) -> dict[str, Any]:
-        return self.api.get(
-            "/v1.0/iot-03/devices/status", {"device_ids": ",".join(device_ids)}
+        return self._request_in_chunks(
+            device_ids,
+            lambda chunk: self.api.get(
+                "/v1.0/iot-03/devices/status", {"device_ids": ",".join(chunk)}
+            ),
         )
 
     def get_factory_info(self, device_ids: list[str]) -> dict[str, Any]:
-        return self.api.get(
-            "/v1.0/iot-03/devices/factory-infos", {"device_ids": ",".join(device_ids)}
+        return self._request_in_chunks(
+            device_ids,
+            lambda chunk: self.api.get(
+                "/v1.0/iot-03/devices/factory-infos", {"device_ids": ",".join(chunk)}
+            ),
         )
 
     def factory_reset(self, device_id: str) -> dict[str, Any]:
@@ -689,8 +802,11 @@ class IndustrySolutionDeviceManage(DeviceManage):
         return self.api.delete(f"/v1.0/iot-03/devices/{device_id}")
 
     def remove_device_list(self, device_ids: list[str]) -> dict[str, Any]:
-        return self.api.delete(
-            "/v1.0/iot-03/devices", {"device_ids": ",".join(device_ids)}
+        return self._request_in_chunks(
+            device_ids,
+            lambda chunk: self.api.delete(
+                "/v1.0/iot-03/devices", {"device_ids": ",".join(chunk)}
+            ),
         )
 
     def get_device_functions(self, device_id: str) -> dict[str, Any]:
@@ -2,15 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
+import threading
 import time
 from typing import Any, cast
 
+import aiohttp
 import requests
 
 from .openlogging import logger
+from .ratelimit import (
+    ERROR_CLASS_NETWORK,
+    ERROR_CLASS_THROTTLED,
+    TuyaRateLimiter,
+    TuyaRetryPolicy,
+    classify_error,
+)
+from .response_cache import TuyaResponseCache
 from .tuya_enums import AuthType
 from .version import VERSION
 
@@ -22,6 +33,11 @@ TO_C_SMART_HOME_REFRESH_TOKEN_API = "/v1.0/token/"
 TO_C_CUSTOM_TOKEN_API = "/v1.0/iot-03/users/login"
 TO_C_SMART_HOME_TOKEN_API = "/v1.0/iot-01/associated-users/actions/authorized-login"
 
+ASYNC_MAX_CONCURRENT_REQUESTS = 20
+
+# The token is refreshed in background this many seconds before it expires
+TOKEN_PROACTIVE_REFRESH_MARGIN = 300
+
 
 class TuyaTokenInfo:
     """Tuya token info.
@@ -47,18 +63,70 @@ class TuyaTokenInfo:
         self.uid = result.get("uid", "")
         self.success = token_response.get("success", False)
 
+        # Computed once so that is_valid doesn't depend on the wall clock
+        self.valid_until = time.monotonic() + (
+            self.expire_time - int(time.time() * 1000) - 60 * 1000
+        ) / 1000
+
     def __repr__(self) -> str:
         return f"TuyaTokenInfo(valid: {self.is_valid()}, expire_time: {self.expire_time}, access_token: {self.access_token}, refresh_token: {self.refresh_token}, uid: {self.uid})"
 
     def is_valid(self) -> bool:
         if self.success is False:
             return False
-        
-        now = int(time.time() * 1000)
-        if self.expire_time <= now + 60 * 1000:
-            return False
+        return time.monotonic() < self.valid_until
 
-        return True
+    def get_remaining_validity(self) -> float:
+        """Seconds before the token has to be refreshed."""
+        if self.success is False:
+            return 0.0
+        return max(0.0, self.valid_until - time.monotonic())
+
+
+class TuyaTokenRefreshStatistics:
+    """Latency of the token refreshes and time spent waiting for them."""
+
+    def __init__(self) -> None:
+        self.refresh_count: int = 0
+        self.failed_refresh_count: int = 0
+        self.proactive_refresh_count: int = 0
+        self.total_refresh_time: float = 0.0
+        self.max_refresh_time: float = 0.0
+        self.wait_count: int = 0
+        self.total_wait_time: float = 0.0
+        self.max_wait_time: float = 0.0
+
+    def register_refresh(self, duration: float, success: bool, proactive: bool):
+        self.refresh_count += 1
+        if success is False:
+            self.failed_refresh_count += 1
+        if proactive is True:
+            self.proactive_refresh_count += 1
+        self.total_refresh_time += duration
+        self.max_refresh_time = max(self.max_refresh_time, duration)
+
+    def register_wait(self, duration: float):
+        self.wait_count += 1
+        self.total_wait_time += duration
+        self.max_wait_time = max(self.max_wait_time, duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "refresh_count": self.refresh_count,
+            "failed_refresh_count": self.failed_refresh_count,
+            "proactive_refresh_count": self.proactive_refresh_count,
+            "average_refresh_time": round(
+                self.total_refresh_time / self.refresh_count, 6
+            )
+            if self.refresh_count
+            else 0.0,
+            "max_refresh_time": round(self.max_refresh_time, 6),
+            "wait_count": self.wait_count,
+            "average_wait_time": round(self.total_wait_time / self.wait_count, 6)
+            if self.wait_count
+            else 0.0,
+            "max_wait_time": round(self.max_wait_time, 6),
+        }
 
 
 class TuyaOpenAPI:
@@ -80,6 +148,11 @@ class TuyaOpenAPI:
     ) -> None:
         """Init TuyaOpenAPI."""
         self.session = requests.session()
+        self.async_session: aiohttp.ClientSession | None = None
+        self.async_semaphore: asyncio.Semaphore | None = None
+        self.rate_limiter = TuyaRateLimiter()
+        self.retry_policy = TuyaRetryPolicy()
+        self.response_cache = TuyaResponseCache()
 
         self.endpoint = endpoint
         self.access_id = access_id
@@ -101,7 +174,14 @@ class TuyaOpenAPI:
             self.__refresh_path = TO_C_SMART_HOME_REFRESH_TOKEN_API
 
         self.non_user_specific_api = non_user_specific_api
-        self.token_info: TuyaTokenInfo = TuyaTokenInfo()
+
+        # Guards the token refresh and the connection so that they are single-flight
+        self.__token_condition = threading.Condition()
+        self.__is_refreshing_token = False
+        self.__token_refresh_timer: threading.Timer | None = None
+        self.__closed = False
+        self.token_statistics = TuyaTokenRefreshStatistics()
+        self.__token_info: TuyaTokenInfo = TuyaTokenInfo()
 
         self.dev_channel: str = ""
 
@@ -111,6 +191,49 @@ class TuyaOpenAPI:
         self.__schema = ""
         self.__is_connecting = False
 
+    @property
+    def token_info(self) -> TuyaTokenInfo:
+        return self.__token_info
+
+    @token_info.setter
+    def token_info(self, token_info: TuyaTokenInfo):
+        self.__token_info = token_info
+        self.__schedule_token_refresh()
+
+    def __schedule_token_refresh(self):
+        if self.__token_refresh_timer is not None:
+            self.__token_refresh_timer.cancel()
+            self.__token_refresh_timer = None
+        remaining_validity = self.__token_info.get_remaining_validity()
+        if self.__closed or remaining_validity <= 0:
+            return
+        delay = max(
+            remaining_validity - TOKEN_PROACTIVE_REFRESH_MARGIN, remaining_validity / 2
+        )
+        self.__token_refresh_timer = threading.Timer(
+            delay, self.__refresh_access_token, kwargs={"proactive": True}
+        )
+        self.__token_refresh_timer.daemon = True
+        self.__token_refresh_timer.start()
+
+    def close(self):
+        """Stop the background token refresh."""
+        self.__closed = True
+        if self.__token_refresh_timer is not None:
+            self.__token_refresh_timer.cancel()
+            self.__token_refresh_timer = None
+
+    def get_token_statistics(self) -> dict[str, Any]:
+        with self.__token_condition:
+            return self.token_statistics.as_dict()
+
+    def __wait_for_token_operation(self):
+        # Called with __token_condition held
+        wait_start = time.monotonic()
+        while self.__is_refreshing_token or self.__is_connecting:
+            self.__token_condition.wait()
+        self.token_statistics.register_wait(time.monotonic() - wait_start)
+
     # https://developer.tuya.com/docs/iot/open-api/api-reference/singnature?id=Ka43a5mtx1gsc
     def _calculate_sign(
         self,
@@ -150,7 +273,7 @@ class TuyaOpenAPI:
         t = int(time.time() * 1000)
 
         message = self.access_id
-        if self.token_info.is_valid() is True:
+        if self.token_info.is_valid() is True and not self.__is_token_api(path):
             message += self.token_info.access_token
         message += str(t) + str_to_sign
         sign = (
@@ -164,33 +287,95 @@ class TuyaOpenAPI:
         )
         return sign, t
 
-    def __refresh_access_token_if_need(self, path: str, first_pass: bool):
+    def __need_access_token_refresh(self, path: str, first_pass: bool) -> bool:
         # logger.debug(f"Check if need to refresh access token. {self.token_info}")
         if first_pass is False:
             # logger.debug("Not the first pass, do not refresh access token again.")
-            return
+            return False
         if self.token_info.is_valid() is True:
             # logger.debug("Access token is valid, no need to refresh.")
-            return
+            return False
 
         if path.startswith(self.__refresh_path) or path.startswith(self.__login_path):
             # logger.debug("Already requesting refresh token, no need to refresh again.")
+            return False
+        return True
+
+    def __refresh_access_token_if_need(self, path: str, first_pass: bool):
+        if self.__need_access_token_refresh(path, first_pass) is False:
             return
+        self.__refresh_access_token()
+
+    def __refresh_access_token(self, proactive: bool = False):
+        with self.__token_condition:
+            if self.__is_refreshing_token or self.__is_connecting:
+                # Another thread is already refreshing, use its result
+                self.__wait_for_token_operation()
+                return
+            if proactive is False and self.token_info.is_valid() is True:
+                return
+            self.__is_refreshing_token = True
+
+        start_time = time.monotonic()
+        token_info = TuyaTokenInfo()
+        try:
+            if proactive is False:
+                self.token_info.access_token = ""
+
+            if self.auth_type == AuthType.CUSTOM:
+                # logger.debug(f"Refreshing access token with refresh token: {path}")
+                response = self.post(
+                    TO_C_CUSTOM_REFRESH_TOKEN_API + self.token_info.refresh_token
+                )
+            else:
+                # logger.debug(f"Refreshing access token with refresh token: {path}")
+                response = self.get(
+                    TO_C_SMART_HOME_REFRESH_TOKEN_API + self.token_info.refresh_token
+                )
+            # logger.debug(f"Refresh token response: {response}")
+            token_info = TuyaTokenInfo(response)
+        except Exception as e:
+            logger.error(f"Refreshing the access token failed: {e}")
+        finally:
+            with self.__token_condition:
+                if token_info.success or self.token_info.is_valid() is False:
+                    # A failed refresh keeps a still valid token (proactive refresh or
+                    # reconnection done while refreshing)
+                    self.token_info = token_info
+                self.__is_refreshing_token = False
+                self.token_statistics.register_refresh(
+                    time.monotonic() - start_time, token_info.success, proactive
+                )
+                self.__token_condition.notify_all()
+
+    async def __async_refresh_access_token_if_need(self, path: str, first_pass: bool):
+        if self.__need_access_token_refresh(path, first_pass) is False:
+            return
+        # Waiting for a refresh done by another thread must not block the event loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.__refresh_access_token
+        )
 
-        self.token_info.access_token = ""
+    def set_rate_limiter(self, rate_limiter: TuyaRateLimiter):
+        """Share a rate limiter between the clients of the same account."""
+        self.rate_limiter = rate_limiter
 
-        if self.auth_type == AuthType.CUSTOM:
-            # logger.debug(f"Refreshing access token with refresh token: {path}")
-            response = self.post(
-                TO_C_CUSTOM_REFRESH_TOKEN_API + self.token_info.refresh_token
-            )
-        else:
-            # logger.debug(f"Refreshing access token with refresh token: {path}")
-            response = self.get(
-                TO_C_SMART_HOME_REFRESH_TOKEN_API + self.token_info.refresh_token
-            )
-        # logger.debug(f"Refresh token response: {response}")
-        self.token_info = TuyaTokenInfo(response)
+    def set_response_cache(self, response_cache: TuyaResponseCache):
+        """Share a response cache between the clients of the same account."""
+        self.response_cache = response_cache
+
+    def set_async_session(
+        self,
+        session: aiohttp.ClientSession,
+        max_concurrent_requests: int = ASYNC_MAX_CONCURRENT_REQUESTS,
+    ):
+        """Set the aiohttp session used by the async_* methods.
+
+        At most max_concurrent_requests requests of this client are in flight
+        at the same time.
+        """
+        self.async_session = session
+        self.async_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
 
     def set_dev_channel(self, dev_channel: str):
         """Set dev channel."""
@@ -211,18 +396,30 @@ class TuyaOpenAPI:
         country_code: str = "",
         schema: str = "",
     ) -> dict[str, Any]:
-        self.__is_connecting = True
+        with self.__token_condition:
+            self.__is_connecting = True
+        try:
+            return self.__connect(username, password, country_code, schema)
+        finally:
+            with self.__token_condition:
+                self.__is_connecting = False
+                self.__token_condition.notify_all()
+
+    def __connect(
+        self,
+        username: str = "",
+        password: str = "",
+        country_code: str = "",
+        schema: str = "",
+    ) -> dict[str, Any]:
         if self.non_user_specific_api:
-            return_value = self.connect_non_user_specific()
-        else:
-            return_value = self.connect_user_specific(
-                username=username,
-                password=password,
-                country_code=country_code,
-                schema=schema,
-            )
-        self.__is_connecting = False
-        return return_value
+            return self.connect_non_user_specific()
+        return self.connect_user_specific(
+            username=username,
+            password=password,
+            country_code=country_code,
+            schema=schema,
+        )
 
     def connect_non_user_specific(self) -> dict[str, Any]:
         if self.auth_type == AuthType.CUSTOM:
@@ -304,37 +501,48 @@ class TuyaOpenAPI:
         return self.token_info.is_valid()
 
     def reconnect(self) -> bool:
-        if (
-            self.__username != ""
-            and self.__password != ""
-            and self.__country_code != ""
-            and self.__is_connecting is False
-        ):
-            self.connect(
+        with self.__token_condition:
+            if self.__is_connecting is True:
+                # logger.debug("Already connecting to tuya cloud, wait for it to finish.")
+                self.__wait_for_token_operation()
+                return self.is_token_valid()
+            if (
+                self.__username == ""
+                or self.__password == ""
+                or self.__country_code == ""
+            ):
+                return self.is_token_valid()
+            self.__is_connecting = True
+        try:
+            self.__connect(
                 self.__username, self.__password, self.__country_code, self.__schema
             )
-        elif self.__is_connecting is True:
-            wait_time = 0.5
-            loop_pass = 0
-            # logger.debug("Already connecting to tuya cloud, wait for it to finish.")
-            while self.__is_connecting is True:
-                time.sleep(wait_time)
-                loop_pass += 1
-            # logger.debug(f"Wait for connecting to finish. Waited {wait_time * loop_pass} seconds.")
+        finally:
+            with self.__token_condition:
+                self.__is_connecting = False
+                self.__token_condition.notify_all()
         return self.is_token_valid()
 
-    def __request(
+    def __is_token_api(self, path: str) -> bool:
+        # Token APIs are signed without the access token (a proactive refresh is
+        # done while the current token is still valid)
+        return (
+            path == self.__login_path
+            or path.startswith(TO_C_CUSTOM_REFRESH_TOKEN_API)
+            or path.startswith(TO_C_SMART_HOME_REFRESH_TOKEN_API)
+        )
+
+    def __get_request_headers(
         self,
         method: str,
         path: str,
         params: dict[str, Any] | None = None,
         body: dict[str, Any] | None = None,
-        first_pass: bool = True,
-    ) -> dict[str, Any]:
-        start_time = time.time()
-        self.__refresh_access_token_if_need(path, first_pass)
+    ) -> dict[str, str]:
         access_token = (
-            self.token_info.access_token if self.token_info.is_valid() else ""
+            self.token_info.access_token
+            if self.token_info.is_valid() and not self.__is_token_api(path)
+            else ""
         )
         sign, t = self._calculate_sign(method, path, params, body)
         headers = {
@@ -346,35 +554,151 @@ class TuyaOpenAPI:
             "lang": self.lang,
         }
 
-        if (
-            path == self.__login_path
-            or path.startswith(TO_C_CUSTOM_REFRESH_TOKEN_API)
-            or path.startswith(TO_C_SMART_HOME_REFRESH_TOKEN_API)
-        ):
+        if self.__is_token_api(path):
             headers["dev_lang"] = "python"
             headers["dev_version"] = VERSION
             headers["dev_channel"] = self.dev_channel
+        return headers
 
-        response = self.session.request(
-            method,
-            self.endpoint + path,
-            params=params,
-            json=body,
-            headers=headers,
+    def __log_failed_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+        result: dict[str, Any],
+        time_taken: float,
+    ):
+        logger.warning(
+            f"[IOT API][{time_taken}]Request: {method} {path} PARAMS: {json.dumps(params, ensure_ascii=False, indent=2) if params is not None else ''} BODY: {json.dumps(body, ensure_ascii=False, indent=2) if body is not None else ''}"
+        )
+        logger.warning(
+            f"[IOT API][{time_taken}]Response: {json.dumps(result, ensure_ascii=False, indent=2)}",
+            stack_info=True,
+        )
+
+    def __should_retry_after_reconnect(
+        self, path: str, result: dict[str, Any], first_pass: bool
+    ) -> bool:
+        return (
+            result.get("code", -1) == TUYA_ERROR_CODE_TOKEN_INVALID
+            and first_pass is True
+            and path.startswith(self.__login_path) is False
         )
 
-        result: dict[str, Any] = response.json()
+    def __get_error_class(self, http_status: int, result: dict[str, Any]) -> str | None:
+        error_class = classify_error(result.get("code"), http_status)
+        if error_class == ERROR_CLASS_THROTTLED:
+            self.rate_limiter.on_throttled()
+        elif error_class is None:
+            self.rate_limiter.on_success()
+        return error_class
+
+    def __send_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> tuple[bool, dict[str, Any]]:
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            headers = self.__get_request_headers(method, path, params, body)
+            try:
+                response = self.session.request(
+                    method,
+                    self.endpoint + path,
+                    params=params,
+                    json=body,
+                    headers=headers,
+                )
+                result: dict[str, Any] = response.json()
+            except (requests.exceptions.RequestException, ValueError):
+                delay = self.retry_policy.get_retry_delay(
+                    ERROR_CLASS_NETWORK, attempt, method
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.get_retry_delay(
+                    self.__get_error_class(response.status_code, result),
+                    attempt,
+                    method,
+                )
+                if delay is None:
+                    return response.ok, result
+            time.sleep(delay)
+            attempt += 1
+
+    async def __async_send_request(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> tuple[bool, dict[str, Any]]:
+        attempt = 0
+        while True:
+            await self.rate_limiter.async_acquire()
+            try:
+                async with semaphore:
+                    # Signed once a slot is obtained to keep the timestamp fresh
+                    headers = self.__get_request_headers(method, path, params, body)
+                    async with session.request(
+                        method,
+                        self.endpoint + path,
+                        params=(
+                            {
+                                key: str(value)
+                                for key, value in params.items()
+                                if value is not None
+                            }
+                            if params is not None
+                            else None
+                        ),
+                        json=body,
+                        headers=headers,
+                    ) as response:
+                        result: dict[str, Any] = await response.json(content_type=None)
+                        response_ok = response.ok
+                        response_status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                delay = self.retry_policy.get_retry_delay(
+                    ERROR_CLASS_NETWORK, attempt, method
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.get_retry_delay(
+                    self.__get_error_class(response_status, result),
+                    attempt,
+                    method,
+                )
+                if delay is None:
+                    return response_ok, result
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def __request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+        first_pass: bool = True,
+    ) -> dict[str, Any]:
+        start_time = time.time()
+        self.__refresh_access_token_if_need(path, first_pass)
+
+        response_ok, result = self.__send_request(method, path, params, body)
 
         time_taken = time.time() - start_time
 
-        if response.ok is False:
-            logger.warning(
-                f"[IOT API][{time_taken}]Request: {method} {path} PARAMS: {json.dumps(params, ensure_ascii=False, indent=2) if params is not None else ''} BODY: {json.dumps(body, ensure_ascii=False, indent=2) if body is not None else ''}"
-            )
-            logger.warning(
-                f"[IOT API][{time_taken}]Response: {json.dumps(result, ensure_ascii=False, indent=2)}",
-                stack_info=True,
-            )
+        if response_ok is False:
+            self.__log_failed_request(method, path, params, body, result, time_taken)
             return {}
         else:
             # logger.debug(
@@ -385,16 +709,50 @@ class TuyaOpenAPI:
             # )
             pass
 
-        if result.get("code", -1) == TUYA_ERROR_CODE_TOKEN_INVALID:
-            if first_pass is True and path.startswith(self.__login_path) is False and self.reconnect() is True:
+        if self.__should_retry_after_reconnect(path, result, first_pass):
+            if self.reconnect() is True:
                 return self.__request(method, path, params, body, False)
 
         return result
 
+    async def __async_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+        first_pass: bool = True,
+    ) -> dict[str, Any]:
+        session = self.async_session
+        semaphore = self.async_semaphore
+        if session is None or semaphore is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.__request, method, path, params, body, first_pass
+            )
+        start_time = time.time()
+        await self.__async_refresh_access_token_if_need(path, first_pass)
+
+        response_ok, result = await self.__async_send_request(
+            session, semaphore, method, path, params, body
+        )
+
+        if response_ok is False:
+            self.__log_failed_request(
+                method, path, params, body, result, time.time() - start_time
+            )
+            return {}
+
+        if self.__should_retry_after_reconnect(path, result, first_pass):
+            if await asyncio.get_running_loop().run_in_executor(None, self.reconnect):
+                return await self.__async_request(method, path, params, body, False)
+
+        return result
+
     def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
         """Http Get.
 
-        Requests the server to return specified resources.
+        Requests the server to return specified resources. The responses of
+        the metadata APIs are served from the response cache.
 
         Args:
             path (str): api path
@@ -403,7 +761,9 @@ class TuyaOpenAPI:
         Returns:
             response: response body
         """
-        return self.__request("GET", path, params, None)
+        return self.response_cache.get(
+            path, params, lambda: self.__request("GET", path, params, None)
+        )
 
     def post(self, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
         """Http Post.
@@ -446,3 +806,29 @@ class TuyaOpenAPI:
             response: response body
         """
         return self.__request("DELETE", path, params, None)
+
+    async def async_get(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Async version of get."""
+        return await self.response_cache.async_get(
+            path, params, lambda: self.__async_request("GET", path, params, None)
+        )
+
+    async def async_post(
+        self, path: str, body: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Async version of post."""
+        return await self.__async_request("POST", path, None, body)
+
+    async def async_put(
+        self, path: str, body: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Async version of put."""
+        return await self.__async_request("PUT", path, None, body)
+
+    async def async_delete(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Async version of delete."""
+        return await self.__async_request("DELETE", path, params, None)
@@ -2,15 +2,12 @@
 
 from __future__ import annotations
 
-import base64
-import json
 import threading
 import time
 import uuid
 from typing import Any, Callable
 from urllib.parse import urlsplit
 
-from Crypto.Cipher import AES
 from paho.mqtt import client as mqtt
 from paho.mqtt.enums import (
     CallbackAPIVersion as mqtt_CallbackAPIVersion,
@@ -28,10 +25,10 @@ from requests.exceptions import RequestException
 
 from .openapi import TuyaOpenAPI
 from .openlogging import logger
+from .openmq_decoder import TuyaMQMessageDecoder
 from .tuya_enums import AuthType
 
 LINK_ID = f"tuya-iot-app-sdk-python.{uuid.uuid1()}"
-GCM_TAG_LENGTH = 16
 CONNECT_FAILED_NOT_AUTHORISED = 5
 
 TO_C_CUSTOM_MQTT_CONFIG_API = "/v1.0/iot-03/open-hub/access-config"
@@ -54,6 +51,14 @@ class TuyaMQConfig:
         self.expire_time: int = result.get("expire_time", 0)
         self.valid_until: int = mqConfigResponse.get("t", 0) + self.expire_time * 1000
         self.marked_invalid = False
+        self._decoder: TuyaMQMessageDecoder | None = None
+
+    def get_decoder(self, use_ecb: bool) -> TuyaMQMessageDecoder:
+        decoder = self._decoder
+        if decoder is None or decoder.use_ecb != use_ecb:
+            decoder = TuyaMQMessageDecoder(self.password, use_ecb)
+            self._decoder = decoder
+        return decoder
 
     def mark_invalid(self) -> None:
         self.marked_invalid = True
@@ -126,46 +131,11 @@ class TuyaOpenMQ(threading.Thread):
 
         return TuyaMQConfig(response, self.class_id)
 
-    def _decode_mq_message(self, b64msg: str, password: str, t: str) -> dict[str, Any]:
-        key = password[8:24]
-
-        if self.api.auth_type == AuthType.SMART_HOME:
-            cipher = AES.new(key.encode("utf8"), AES.MODE_ECB)
-            msg = cipher.decrypt(base64.b64decode(b64msg))
-            padding_bytes = msg[-1]
-            msg = msg[:-padding_bytes]
-            return json.loads(msg)
-        else:
-            # base64 decode
-            buffer = base64.b64decode(b64msg)
-
-            # get iv buffer
-            iv_length = int.from_bytes(buffer[0:4], byteorder="big")
-            iv_buffer = buffer[4 : iv_length + 4]
-
-            # get data buffer
-            data_buffer = buffer[iv_length + 4 : len(buffer) - GCM_TAG_LENGTH]
-
-            # aad
-            aad_buffer = str(t).encode("utf8")
-
-            # tag
-            tag_buffer = buffer[len(buffer) - GCM_TAG_LENGTH :]
-
-            cipher = AES.new(key.encode("utf8"), AES.MODE_GCM, nonce=iv_buffer)
-            cipher.update(aad_buffer)
-            plaintext = cipher.decrypt_and_verify(data_buffer, tag_buffer).decode(
-                "utf8"
-            )
-            return json.loads(plaintext)
-
     def _on_message(self, mqttc: mqtt.Client, user_data: Any, msg: mqtt.MQTTMessage):
-        msg_dict = json.loads(msg.payload.decode("utf8"))
-        t = msg_dict.get("t", "")
-        mq_config = user_data["mqConfig"]
-        decrypted_data = self._decode_mq_message(
-            msg_dict["data"], mq_config.password, t
-        )
+        mq_config: TuyaMQConfig = user_data["mqConfig"]
+        decoder = mq_config.get_decoder(self.api.auth_type == AuthType.SMART_HOME)
+        msg_dict = decoder.loads_envelope(msg.payload)
+        decrypted_data = decoder.decode_data(msg_dict["data"], msg_dict.get("t", ""))
         if decrypted_data is None:
             logger.warning(f"[{self.class_id} MQTT] Failed to decode message: {msg_dict}")
             return
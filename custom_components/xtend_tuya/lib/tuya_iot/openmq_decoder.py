@@ -0,0 +1,92 @@
+"""Tuya Open IOT HUB message decoder."""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Callable
+
+from Crypto.Cipher import AES
+
+try:
+    # The key schedule of AESGCM is prepared once and reused for every nonce
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = None
+
+try:
+    import orjson
+
+    def json_loads(data: bytes | bytearray | memoryview | str) -> Any:
+        return orjson.loads(data)
+
+    JSON_BACKEND = "orjson"
+except ImportError:
+
+    def json_loads(data: bytes | bytearray | memoryview | str) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    JSON_BACKEND = "json"
+
+GCM_TAG_LENGTH = 16
+
+
+class TuyaMQMessageDecoder:
+    """Decoder of the messages received with a given MQTT password.
+
+    The key and the cipher contexts are prepared once instead of for every
+    message, and the JSON backend can be replaced (orjson by default when
+    it is installed).
+    """
+
+    def __init__(
+        self,
+        password: str,
+        use_ecb: bool,
+        loads: Callable[[Any], Any] = json_loads,
+    ) -> None:
+        """Init TuyaMQMessageDecoder."""
+        self.password = password
+        self.use_ecb = use_ecb
+        self.loads = loads
+        self.key: bytes = password[8:24].encode("utf8")
+        self._ecb_cipher = AES.new(self.key, AES.MODE_ECB) if use_ecb else None
+        self._gcm_cipher = AESGCM(self.key) if AESGCM is not None else None
+
+    def loads_envelope(self, payload: bytes) -> dict[str, Any]:
+        return self.loads(payload)
+
+    def decode_data(self, b64msg: str | bytes, t: Any) -> Any:
+        buffer = base64.b64decode(b64msg)
+        if self._ecb_cipher is not None:
+            msg = memoryview(self._ecb_cipher.decrypt(buffer))
+            padding_bytes = msg[-1]
+            return self.loads(msg[:-padding_bytes])
+
+        buffer_view = memoryview(buffer)
+        iv_length = int.from_bytes(buffer_view[0:4], byteorder="big")
+        if self._gcm_cipher is not None:
+            return self.loads(
+                self._gcm_cipher.decrypt(
+                    buffer_view[4 : iv_length + 4],
+                    buffer_view[iv_length + 4 :],
+                    str(t).encode("utf8"),
+                )
+            )
+        cipher = AES.new(
+            self.key, AES.MODE_GCM, nonce=buffer_view[4 : iv_length + 4]
+        )
+        cipher.update(str(t).encode("utf8"))
+        plaintext = cipher.decrypt_and_verify(
+            buffer_view[iv_length + 4 : len(buffer) - GCM_TAG_LENGTH],
+            buffer_view[len(buffer) - GCM_TAG_LENGTH :],
+        )
+        return self.loads(plaintext)
+
+    def decode(self, payload: bytes) -> dict[str, Any]:
+        msg_dict = self.loads(payload)
+        msg_dict["data"] = self.decode_data(msg_dict["data"], msg_dict.get("t", ""))
+        return msg_dict
+
@@ -0,0 +1,174 @@
+"""Tuya cloud API pacing and retry policy."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Any, NamedTuple
+
+ERROR_CLASS_THROTTLED = "throttled"
+ERROR_CLASS_TRANSIENT = "transient"
+ERROR_CLASS_NETWORK = "network"
+
+# Error codes (or HTTP statuses) meaning that the request rate is too high
+THROTTLING_ERROR_CODES = {"429", "1110", "40000309"}
+# Server side errors that usually succeed when retried
+TRANSIENT_ERROR_CODES = {"500", "502", "503", "504", "-9999999"}
+# A failed request of another method may have been executed (commands, door
+# unlocks, single use refresh tokens...), only throttled ones are retried
+RETRYABLE_METHODS = {"GET"}
+
+
+def classify_error(code: Any, http_status: int | None = None) -> str | None:
+    """Return the error class of a response, None if it should not be retried."""
+    if http_status is not None and str(http_status) in THROTTLING_ERROR_CODES:
+        return ERROR_CLASS_THROTTLED
+    if code is not None:
+        code = str(code)
+        if code in THROTTLING_ERROR_CODES:
+            return ERROR_CLASS_THROTTLED
+        if code in TRANSIENT_ERROR_CODES:
+            return ERROR_CLASS_TRANSIENT
+    if http_status is not None and str(http_status) in TRANSIENT_ERROR_CODES:
+        return ERROR_CLASS_TRANSIENT
+    return None
+
+
+class TuyaRetryRule(NamedTuple):
+    max_retries: int
+    base_delay: float
+    max_delay: float
+
+
+DEFAULT_RETRY_RULES: dict[str, TuyaRetryRule] = {
+    ERROR_CLASS_THROTTLED: TuyaRetryRule(max_retries=4, base_delay=1.0, max_delay=16.0),
+    ERROR_CLASS_TRANSIENT: TuyaRetryRule(max_retries=2, base_delay=0.5, max_delay=4.0),
+    ERROR_CLASS_NETWORK: TuyaRetryRule(max_retries=2, base_delay=1.0, max_delay=8.0),
+}
+
+
+class TuyaRetryPolicy:
+    """Exponential backoff with jitter, configured per error class."""
+
+    def __init__(
+        self,
+        rules: dict[str, TuyaRetryRule] | None = None,
+        idempotent_paths: list[str] | None = None,
+    ) -> None:
+        """Init TuyaRetryPolicy.
+
+        Args:
+          rules: retry rules replacing the default ones, per error class
+          idempotent_paths: patterns of the paths that are safe to repeat
+            whatever their method (POST used to read data...)
+        """
+        self.rules = dict(DEFAULT_RETRY_RULES)
+        if rules:
+            self.rules.update(rules)
+        self.idempotent_paths = [
+            re.compile(pattern) for pattern in idempotent_paths or []
+        ]
+
+    def is_retryable(self, method: str, path: str) -> bool:
+        """Whether a failed request may be repeated on any error class."""
+        if method.upper() in RETRYABLE_METHODS:
+            return True
+        return any(pattern.fullmatch(path) for pattern in self.idempotent_paths)
+
+    def get_retry_delay(
+        self,
+        error_class: str | None,
+        attempt: int,
+        method: str = "GET",
+        path: str = "",
+    ) -> float | None:
+        """Delay before the next attempt, None when the request must not be retried."""
+        if error_class is None:
+            return None
+        if error_class != ERROR_CLASS_THROTTLED and not self.is_retryable(
+            method, path
+        ):
+            return None
+        rule = self.rules.get(error_class)
+        if rule is None or attempt >= rule.max_retries:
+            return None
+        delay = min(rule.max_delay, rule.base_delay * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+
+class TuyaRateLimiter:
+    """Token bucket shared by the requests of an account.
+
+    The rate is halved each time the cloud reports throttling and slowly
+    recovers on successful requests.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, min_rate: float = 1.0) -> None:
+        self.lock = threading.Lock()
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = burst
+        self.tokens: float = burst
+        self.last_refill = time.monotonic()
+
+        self.acquired_count: int = 0
+        self.waited_count: int = 0
+        self.total_wait_time: float = 0.0
+        self.max_wait_time: float = 0.0
+        self.throttled_count: int = 0
+
+    def _reserve(self) -> float:
+        # Takes a token, possibly in advance, and returns how long to wait for it
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.last_refill) * self.rate
+            )
+            self.last_refill = now
+            self.tokens -= 1
+            self.acquired_count += 1
+            if self.tokens >= 0:
+                return 0.0
+            delay = -self.tokens / self.rate
+            self.waited_count += 1
+            self.total_wait_time += delay
+            self.max_wait_time = max(self.max_wait_time, delay)
+            return delay
+
+    def acquire(self) -> float:
+        if (delay := self._reserve()) > 0:
+            time.sleep(delay)
+        return delay
+
+    async def async_acquire(self) -> float:
+        if (delay := self._reserve()) > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def on_throttled(self):
+        with self.lock:
+            self.throttled_count += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self):
+        if self.rate >= self.max_rate:
+            return
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "rate": round(self.rate, 3),
+                "acquired_count": self.acquired_count,
+                "waited_count": self.waited_count,
+                "average_wait_time": round(self.total_wait_time / self.waited_count, 6)
+                if self.waited_count
+                else 0.0,
+                "max_wait_time": round(self.max_wait_time, 6),
+                "throttled_count": self.throttled_count,
+            }
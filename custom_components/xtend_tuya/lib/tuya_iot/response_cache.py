@@ -0,0 +1,198 @@
+"""Cache of the responses of Tuya cloud metadata GET requests."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+# Path pattern -> time to live (in seconds) of the successful responses
+DEFAULT_RESPONSE_CACHE_TTLS: dict[str, float] = {
+    r"/v1\.0/devices/[^/]+/all-statistic-type": 24 * 3600,
+    r"/v1\.0/devices/[^/]+/specifications": 3600,
+    r"/v1\.0/iot-03/devices/[^/]+/specification": 3600,
+    r"/v2\.0/cloud/thing/[^/]+/model": 3600,
+    r"/v1\.0/devices/[^/]+/webrtc-configs": 30,
+    r"/v2\.0/infrareds/[^/]+/categories": 24 * 3600,
+    r"/v2\.0/infrareds/[^/]+/categories/[^/]+/brands": 24 * 3600,
+    r"/v1\.0/functions/[^/]+": 24 * 3600,
+    r"/v1\.0/iot-03/categories/[^/]+/functions": 24 * 3600,
+}
+DEFAULT_RESPONSE_CACHE_SIZE = 1024
+
+
+class _InFlightRequest:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.response: dict[str, Any] | None = None
+
+
+class TuyaResponseCache:
+    """Size bounded LRU cache of GET responses with a TTL per path pattern.
+
+    Concurrent requests of the same resource share one cloud call. Only
+    successful responses are cached and callers always get their own copy.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        max_size: int = DEFAULT_RESPONSE_CACHE_SIZE,
+    ) -> None:
+        self.lock = threading.Lock()
+        self.max_size = max_size
+        self.rules: list[tuple[re.Pattern[str], float]] = []
+        for pattern, ttl in (
+            ttls if ttls is not None else DEFAULT_RESPONSE_CACHE_TTLS
+        ).items():
+            self.add_rule(pattern, ttl)
+        self.entries: OrderedDict[tuple, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.in_flight: dict[tuple, _InFlightRequest] = {}
+        self.async_in_flight: dict[tuple, asyncio.Future] = {}
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.evictions: int = 0
+
+    def add_rule(self, pattern: str, ttl: float):
+        """Cache the responses of the paths fully matching pattern for ttl seconds."""
+        self.rules.append((re.compile(pattern), ttl))
+
+    def get_ttl(self, path: str) -> float | None:
+        for pattern, ttl in self.rules:
+            if pattern.fullmatch(path):
+                return ttl
+        return None
+
+    @staticmethod
+    def _get_key(path: str, params: dict[str, Any] | None) -> tuple:
+        if not params:
+            return (path,)
+        return (path, *sorted((key, str(value)) for key, value in params.items()))
+
+    def _lookup(self, key: tuple) -> dict[str, Any] | None:
+        # Called with the lock held
+        if (entry := self.entries.get(key)) is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _store(self, key: tuple, ttl: float, response: dict[str, Any]):
+        # Called with the lock held
+        if not response.get("success", False):
+            return
+        self.entries[key] = (time.monotonic() + ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        fetch: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
+        if (ttl := self.get_ttl(path)) is None:
+            return fetch()
+        key = self._get_key(path, params)
+        with self.lock:
+            if (response := self._lookup(key)) is not None:
+                return copy.deepcopy(response)
+            in_flight = self.in_flight.get(key)
+            is_owner = in_flight is None
+            if in_flight is None:
+                in_flight = self.in_flight[key] = _InFlightRequest()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_owner:
+            in_flight.event.wait()
+            if in_flight.response is None:
+                # The shared request failed with an exception, try on our own
+                return fetch()
+            return copy.deepcopy(in_flight.response)
+
+        try:
+            response = fetch()
+            in_flight.response = response
+            with self.lock:
+                self._store(key, ttl, response)
+            return copy.deepcopy(response)
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            in_flight.event.set()
+
+    async def async_get(
+        self,
+        path: str,
+        params: dict[str, Any] | None,
+        fetch: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        if (ttl := self.get_ttl(path)) is None:
+            return await fetch()
+        key = self._get_key(path, params)
+        with self.lock:
+            if (response := self._lookup(key)) is not None:
+                return copy.deepcopy(response)
+        if (future := self.async_in_flight.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(future))
+            except Exception:
+                return await fetch()
+
+        future = asyncio.get_running_loop().create_future()
+        self.async_in_flight[key] = future
+        self.misses += 1
+        try:
+            response = await fetch()
+            with self.lock:
+                self._store(key, ttl, response)
+            future.set_result(response)
+            return copy.deepcopy(response)
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so that an unawaited future doesn't log an error
+            future.exception()
+            raise
+        finally:
+            self.async_in_flight.pop(key, None)
+
+    def invalidate(self, path: str | None = None):
+        """Forget the cached responses of path (all of them if path is None)."""
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+                return
+            for key in [key for key in self.entries if key[0] == path]:
+                del self.entries[key]
+
+    def invalidate_device(self, device_id: str):
+        """Forget the cached responses of the paths containing device_id."""
+        with self.lock:
+            for key in [
+                key for key in self.entries if f"/{device_id}/" in f"{key[0]}/"
+            ]:
+                del self.entries[key]
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+            }
@@ -4,15 +4,21 @@ import json
 from datetime import datetime, timedelta
 import copy
 from typing import Optional, Literal, Any
-from enum import StrEnum
 from webrtc_models import (
     RTCIceCandidateInit,
 )
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from ....lib.tuya_iot import (
     AuthType,
 )
+from ....lib.tuya_iot.ratelimit import (
+    TuyaRateLimiter,
+)
+from ....lib.tuya_iot.response_cache import (
+    TuyaResponseCache,
+)
 from .xt_tuya_iot_openapi import (
     XTIOTOpenAPI,
 )
@@ -58,6 +64,7 @@ from ....const import (
     LOGGER,
     TUYA_DISCOVERY_NEW,
     TUYA_HA_SIGNAL_UPDATE_ENTITY,
+    XTCommandApiType,
     XTDeviceSourcePriority,
     XTLockingMechanism,
     XTMultiManagerProperties,
@@ -66,6 +73,9 @@ from ....const import (
     XTIRRemoteKeysInformation,
     XTDeviceWatcherCategory,
     XTDeviceWatcherSpecialDevice,
+    XT_API_MAX_CONCURRENT_REQUESTS,
+    XT_API_RATE_LIMIT,
+    XT_API_RATE_LIMIT_BURST,
 )
 
 
@@ -153,6 +163,17 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
             non_user_specific_api=True,
         )
         api.set_dev_channel("hass")
+        rate_limiter = TuyaRateLimiter(XT_API_RATE_LIMIT, XT_API_RATE_LIMIT_BURST)
+        api.set_rate_limiter(rate_limiter)
+        non_user_api.set_rate_limiter(rate_limiter)
+        response_cache = TuyaResponseCache()
+        api.set_response_cache(response_cache)
+        non_user_api.set_response_cache(response_cache)
+        async_session = async_get_clientsession(hass)
+        api.set_async_session(async_session, XT_API_MAX_CONCURRENT_REQUESTS)
+        non_user_api.set_async_session(async_session, XT_API_MAX_CONCURRENT_REQUESTS)
+        api.set_tracer(self.multi_manager.startup_tracer)
+        non_user_api.set_tracer(self.multi_manager.startup_tracer)
         try:
             if auth_type == AuthType.CUSTOM:
                 connect_user_api = (
@@ -210,6 +231,8 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
                 )
             if user_api_valid is False:
                 LOGGER.error(f"Error validating the USER api: {user_api_valid}")
+            api.close()
+            non_user_api.close()
             await self.raise_issue(
                 hass=hass,
                 config_entry=config_entry,
@@ -260,7 +283,21 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
         )
 
     def unload(self):
-        pass
+        if self.iot_account is None:
+            return None
+        self.iot_account.device_manager.api.close()
+        self.iot_account.device_manager.non_user_api.close()
+
+    def get_statistics(self) -> dict[str, Any]:
+        if self.iot_account is None:
+            return {}
+        return {
+            "token_refresh": self.iot_account.device_manager.api.get_token_statistics(),
+            "non_user_token_refresh": self.iot_account.device_manager.non_user_api.get_token_statistics(),
+            "rate_limiter": self.iot_account.device_manager.api.rate_limiter.get_statistics(),
+            "response_cache": self.iot_account.device_manager.api.response_cache.get_statistics(),
+            "asset_tree": self.iot_account.home_manager.asset_tree.get_statistics(),
+        }
 
     def on_message(self, msg: dict):
         if self.iot_account is None:
@@ -307,6 +344,31 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
             return None
         self.iot_account.device_manager.add_device_by_id(device_id)
 
+    def get_device_ids(self) -> list[str]:
+        if self.iot_account is None:
+            return []
+        return list(self.iot_account.device_ids)
+
+    def restore_device_ids(self, device_ids: list[str]):
+        if self.iot_account is None:
+            return None
+        self.iot_account.device_ids.clear()
+        self.iot_account.device_ids.extend(device_ids)
+
+    def refresh_device_cache_by_ids(self, device_ids: list[str]):
+        if self.iot_account is None:
+            return None
+        self.iot_account.device_manager.refresh_device_cache_by_ids(device_ids)
+        for device_id in device_ids:
+            if (
+                device_id in self.iot_account.device_manager.device_map
+                and device_id not in self.iot_account.device_ids
+            ):
+                self.iot_account.device_ids.append(device_id)
+
+                # The asset of the new device is not known
+                self.iot_account.home_manager.asset_tree.invalidate()
+
     def on_mqtt_stop(self):
         if self.iot_account is None:
             return None
@@ -504,82 +566,136 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
     def send_command(
         self, device_id: str, command: dict[str, Any], reverse_filters: bool = False
     ) -> bool:
-        class XTApiList(StrEnum):
-            OPEN_API_REGULAR = "open_api_regular"
-            PROPERTY_UPDATE = "property_update"
+        return (
+            self.send_command_using_api(device_id, command, reverse_filters)
+            is not None
+        )
 
-        api_priority_list: list[XTApiList] = []
+    def send_command_using_api(
+        self,
+        device_id: str,
+        command: dict[str, Any],
+        reverse_filters: bool = False,
+        api_type: XTCommandApiType | None = None,
+    ) -> XTCommandApiType | None:
         device = self.multi_manager.device_map.get(device_id)
-        dpId: int | None = None
         if device is None or self.iot_account is None:
-            return False
-        command_code = command.get("code")
-        command_value = command.get("value")
+            return None
+        api_priority_list = self._get_command_api_priority_list(
+            device, command, reverse_filters
+        )
+        if api_type is not None:
+            if api_type not in api_priority_list:
+                return None
+            api_priority_list = [api_type]
 
-        if command_code is None or command_value is None:
-            return False
+        for api_type in api_priority_list:
+            if self._send_commands_with_api(device, [command], api_type):
+                return api_type
+        return None
+
+    def send_commands_using_api(
+        self,
+        device_id: str,
+        commands: list[dict[str, Any]],
+        reverse_filters: bool,
+        api_type: XTCommandApiType,
+    ) -> list[dict[str, Any]]:
+        device = self.multi_manager.device_map.get(device_id)
+        if device is None or self.iot_account is None:
+            return commands
+        eligible_commands: list[dict[str, Any]] = []
+        failed_commands: list[dict[str, Any]] = []
+        for command in commands:
+            if api_type in self._get_command_api_priority_list(
+                device, command, reverse_filters
+            ):
+                eligible_commands.append(command)
+            else:
+                failed_commands.append(command)
+        if eligible_commands and not self._send_commands_with_api(
+            device, eligible_commands, api_type
+        ):
+            failed_commands.extend(eligible_commands)
+        return failed_commands
 
+    def _get_command_api_priority_list(
+        self, device: XTDevice, command: dict[str, Any], reverse_filters: bool
+    ) -> list[XTCommandApiType]:
+        command_code = command.get("code")
+        if command_code is None or command.get("value") is None:
+            return []
         if dpId := self.multi_manager._read_dpId_from_code(command_code, device):
             use_open_api: bool = device.local_strategy[dpId].get("use_open_api", False)
             if use_open_api is False:
                 if reverse_filters is False:
-                    return False
+                    return []
             else:
                 if reverse_filters is True:
-                    return False
+                    return []
             property_update: bool = device.local_strategy[dpId].get(
                 "property_update", False
             )
             if property_update:
-                api_priority_list.append(XTApiList.PROPERTY_UPDATE)
-                api_priority_list.append(XTApiList.OPEN_API_REGULAR)
-            else:
-                api_priority_list.append(XTApiList.OPEN_API_REGULAR)
-                api_priority_list.append(XTApiList.PROPERTY_UPDATE)
-        else:
-            return False
+                return [
+                    XTCommandApiType.PROPERTY_UPDATE,
+                    XTCommandApiType.OPEN_API_REGULAR,
+                ]
+            return [XTCommandApiType.OPEN_API_REGULAR, XTCommandApiType.PROPERTY_UPDATE]
+        return []
 
+    def _send_commands_with_api(
+        self,
+        device: XTDevice,
+        commands: list[dict[str, Any]],
+        api_type: XTCommandApiType,
+    ) -> bool:
+        if self.iot_account is None:
+            return False
         command_list: list = []
-        for api_type in api_priority_list:
-            try:
-                match api_type:
-                    case XTApiList.OPEN_API_REGULAR:
-                        command_list = []
-                        command_dict = {"code": command_code, "value": command_value}
-                        command_list.append(command_dict)
-                        self.multi_manager.device_watcher.report_message(
-                            device_id,
-                            f"Sending Open API regular command : {command_list}",
-                            XTDeviceWatcherCategory.IOT_API,
-                            device,
-                            False,
-                        )
-                        self.iot_account.device_manager.send_commands(
-                            device_id, command_list
-                        )
-                    case XTApiList.PROPERTY_UPDATE:
-                        command_list = []
-                        property_dict = {str(command_code): command_value}
-                        command_list.append(property_dict)
-                        self.multi_manager.device_watcher.report_message(
-                            device_id,
-                            f"Sending property command : {command_list}",
-                            XTDeviceWatcherCategory.IOT_API,
-                            device,
-                            False,
-                        )
-                        self.iot_account.device_manager.send_property_update(
-                            device_id, command_list
-                        )
+        try:
+            match api_type:
+                case XTCommandApiType.OPEN_API_REGULAR:
+                    command_list = [
+                        {"code": command["code"], "value": command["value"]}
+                        for command in commands
+                    ]
+                    self.multi_manager.device_watcher.report_message(
+                        device.id,
+                        f"Sending Open API regular command : {command_list}",
+                        XTDeviceWatcherCategory.IOT_API,
+                        device,
+                        False,
+                    )
+                    self.iot_account.device_manager.send_commands(
+                        device.id, command_list
+                    )
+                case XTCommandApiType.PROPERTY_UPDATE:
+                    command_list = [
+                        {str(command["code"]): command["value"]}
+                        for command in commands
+                    ]
+                    self.multi_manager.device_watcher.report_message(
+                        device.id,
+                        f"Sending property command : {command_list}",
+                        XTDeviceWatcherCategory.IOT_API,
+                        device,
+                        False,
+                    )
+                    self.iot_account.device_manager.send_property_update(
+                        device.id, command_list
+                    )
+                case _:
+                    return False
 
-                # If the command fails, the caller returns an exception, so we assume it worked if we reach here
-                return True
-            except Exception as e:
-                self.multi_manager.device_watcher.report_message(
-                    device_id,
-                    f"[IOT]Send {api_type} command failed, device id: {device_id}, command: {command_list}, exception: {e}",
-                    XTDeviceWatcherCategory.IOT_API,
-                )
+            # If the command fails, the caller returns an exception, so we assume it worked if we reach here
+            return True
+        except Exception as e:
+            self.multi_manager.device_watcher.report_message(
+                device.id,
+                f"[IOT]Send {api_type} command failed, device id: {device.id}, command: {command_list}, exception: {e}",
+                XTDeviceWatcherCategory.IOT_API,
+            )
         return False
 
     def get_device_consumption_statistics_by_day(
@@ -721,6 +837,23 @@ class XTTuyaIOTDeviceManagerInterface(XTDeviceManagerInterface):
                 return self.iot_account.device_manager.api.post(url, params)
         return None
 
+    async def async_call_api(
+        self, method: str, url: str, payload: str | None
+    ) -> dict[str, Any] | None:
+        if self.iot_account is None:
+            return None
+        params: dict[str, Any] | None = None
+        if payload:
+            params = json.loads(payload)
+        match method:
+            case "GET":
+                return await self.iot_account.device_manager.api.async_get(url, params)
+            case "POST":
+                return await self.iot_account.device_manager.api.async_post(
+                    url, params
+                )
+        return None
+
     def get_webrtc_sdp_answer(
         self, device_id: str, session_id: str, sdp_offer: str, channel: str
     ) -> str | None:
@@ -1,12 +1,14 @@
 from __future__ import annotations
 from typing import Any
-import json
 from paho.mqtt import (
     client as mqtt,
 )
 from ..xt_tuya_iot_mq import (
     XTIOTOpenMQ,
 )
+from .....lib.tuya_iot.openmq_decoder import (
+    json_loads,
+)
 import custom_components.xtend_tuya.multi_manager.managers.tuya_iot.xt_tuya_iot_openapi as iot_api
 import custom_components.xtend_tuya.multi_manager.managers.tuya_iot.ipc.xt_tuya_iot_ipc_manager as ipc_man
 
@@ -25,7 +27,7 @@ class XTIOTOpenMQIPC(XTIOTOpenMQ):
         )
 
     def _on_message(self, mqttc: mqtt.Client, user_data: Any, msg: mqtt.MQTTMessage):
-        msg_dict = json.loads(msg.payload.decode("utf8"))
+        msg_dict = json_loads(msg.payload)
 
         for listener in self.message_listeners:
             listener(msg_dict)
@@ -0,0 +1,209 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Callable
+from ....const import (
+    XT_IOT_ASSET_CACHE_TTL,
+    XT_IOT_ASSET_MAX_CONCURRENCY,
+)
+from ....lib.tuya_iot.asset import TuyaAssetManager
+from ...shared.threading import (
+    XTExecutorService,
+)
+
+ROOT_ASSET_ID = "-1"
+
+
+class XTIOTAssetNode:
+    def __init__(
+        self, fetch_time: float, sub_asset_ids: list[str], device_ids: list[str]
+    ) -> None:
+        self.fetch_time = fetch_time
+        self.sub_asset_ids = sub_asset_ids
+        self.device_ids = device_ids
+
+
+class XTIOTAssetTree:
+    def __init__(
+        self,
+        asset_manager: TuyaAssetManager,
+        ttl: float = XT_IOT_ASSET_CACHE_TTL,
+        max_concurrency: int = XT_IOT_ASSET_MAX_CONCURRENCY,
+    ) -> None:
+        self.asset_manager = asset_manager
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+
+        # asset_id -> sub-assets and devices directly under the asset
+        self.nodes: dict[str, XTIOTAssetNode] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.request_count: int = 0
+        self.failed_count: int = 0
+
+    async def async_get_device_ids(
+        self, root_asset_id: str = ROOT_ASSET_ID
+    ) -> list[str]:
+        # Breadth first, the sub-assets are queued as soon as their page is
+        # received and the requests of all the levels share the same limit.
+        # Only the assets whose cache entry expired are fetched again
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        device_ids: dict[str, None] = {}
+        visited: set[str] = set()
+        tasks: list[asyncio.Task] = []
+
+        def visit(asset_id: str):
+            if asset_id in visited:
+                return
+            visited.add(asset_id)
+            tasks.append(
+                asyncio.create_task(
+                    self._async_visit(asset_id, semaphore, visit, device_ids)
+                )
+            )
+
+        visit(root_asset_id)
+        try:
+            # The list grows while the tree is walked
+            index = 0
+            while index < len(tasks):
+                await tasks[index]
+                index += 1
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        if root_asset_id == ROOT_ASSET_ID:
+            # Forget the assets that were removed from the tree
+            for asset_id in [
+                asset_id for asset_id in self.nodes if asset_id not in visited
+            ]:
+                del self.nodes[asset_id]
+        return list(device_ids)
+
+    async def _async_visit(
+        self,
+        asset_id: str,
+        semaphore: asyncio.Semaphore,
+        visit: Callable[[str], None],
+        device_ids: dict[str, None],
+    ):
+        node = self.nodes.get(asset_id)
+        if node is not None and time.monotonic() - node.fetch_time < self.ttl:
+            self.hits += 1
+        else:
+            self.misses += 1
+            (node_device_ids, devices_complete), (
+                sub_asset_ids,
+                sub_assets_complete,
+            ) = await asyncio.gather(
+                self._async_fetch_device_ids(asset_id, semaphore),
+                self._async_fetch_sub_asset_ids(asset_id, semaphore, visit),
+            )
+            if devices_complete and sub_assets_complete:
+                node = XTIOTAssetNode(
+                    time.monotonic(), sub_asset_ids, node_device_ids
+                )
+                self.nodes[asset_id] = node
+            else:
+                # Not cached, a failed page would hide the rest of the asset
+                # until the TTL expires. The last known content is used with
+                # what could be fetched
+                self.failed_count += 1
+                if node is not None:
+                    sub_asset_ids = list(
+                        dict.fromkeys([*sub_asset_ids, *node.sub_asset_ids])
+                    )
+                    node_device_ids = list(
+                        dict.fromkeys([*node_device_ids, *node.device_ids])
+                    )
+                node = XTIOTAssetNode(0, sub_asset_ids, node_device_ids)
+        for sub_asset_id in node.sub_asset_ids:
+            visit(sub_asset_id)
+        device_ids.update(dict.fromkeys(node.device_ids))
+
+    async def _async_get_page(
+        self,
+        semaphore: asyncio.Semaphore,
+        get_page: Callable[[str, str], dict[str, Any]],
+        asset_id: str,
+        last_row_key: str,
+    ) -> dict[str, Any] | None:
+        # The page, None if the request failed
+        async with semaphore:
+            self.request_count += 1
+            response = await asyncio.wrap_future(
+                XTExecutorService.submit(get_page, asset_id, last_row_key)
+            )
+        if not response.get("success", False):
+            return None
+        return response.get("result", {})
+
+    async def _async_fetch_device_ids(
+        self, asset_id: str, semaphore: asyncio.Semaphore
+    ) -> tuple[list[str], bool]:
+        # The device ids and whether all the pages were fetched
+        device_ids: list[str] = []
+        if asset_id == ROOT_ASSET_ID:
+            return device_ids, True
+        has_next = True
+        last_row_key = ""
+        while has_next:
+            result = await self._async_get_page(
+                semaphore, self.asset_manager.get_device_page, asset_id, last_row_key
+            )
+            if result is None:
+                return device_ids, False
+            has_next = result.get("has_next", False)
+            last_row_key = result.get("last_row_key", "")
+            if len(device_ids) > result.get("total_size", 0):
+                raise Exception("get_device_list error, too many devices.")
+            for item in result.get("list", []):
+                device_ids.append(item["device_id"])
+        return device_ids, True
+
+    async def _async_fetch_sub_asset_ids(
+        self,
+        asset_id: str,
+        semaphore: asyncio.Semaphore,
+        visit: Callable[[str], None],
+    ) -> tuple[list[str], bool]:
+        # The sub-asset ids and whether all the pages were fetched
+        sub_asset_ids: list[str] = []
+        has_next = True
+        last_row_key = ""
+        while has_next:
+            result = await self._async_get_page(
+                semaphore, self.asset_manager.get_asset_page, asset_id, last_row_key
+            )
+            if result is None:
+                return sub_asset_ids, False
+            has_next = result.get("has_next", False)
+            last_row_key = result.get("last_row_key", "")
+            for item in result.get("list", []):
+                sub_asset_ids.append(item["asset_id"])
+
+                # Walked while the next pages are fetched
+                visit(item["asset_id"])
+        return sub_asset_ids, True
+
+    def invalidate(self):
+        self.nodes.clear()
+
+    def get_statistics(self) -> dict[str, Any]:
+        return {
+            "assets": len(self.nodes),
+            "devices": len(
+                {
+                    device_id
+                    for node in self.nodes.values()
+                    for device_id in node.device_ids
+                }
+            ),
+            "hits": self.hits,
+            "misses": self.misses,
+            "requests": self.request_count,
+            "failed": self.failed_count,
+        }
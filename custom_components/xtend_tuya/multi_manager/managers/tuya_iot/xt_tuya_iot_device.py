@@ -1,14 +1,28 @@
 from __future__ import annotations
+from typing import Any, Callable
 
 from ....lib.tuya_iot.device import (
     SmartHomeDeviceManage,
     IndustrySolutionDeviceManage,
 )
+from ...shared.threading import (
+    XTExecutorService,
+)
 
 
 class XTSmartHomeDeviceManage(SmartHomeDeviceManage):
-    pass
+    def _run_concurrently(
+        self, jobs: list[Callable[[], Any]], max_concurrency: int
+    ) -> list[Any]:
+        # On the nested pool when requested from an executor job, one after
+        # the other when requested from a nested job
+        return XTExecutorService.run_all(jobs, max_concurrency)
 
 
 class XTIndustrySolutionDeviceManage(IndustrySolutionDeviceManage):
-    pass
+    def _run_concurrently(
+        self, jobs: list[Callable[[], Any]], max_concurrency: int
+    ) -> list[Any]:
+        # On the nested pool when requested from an executor job, one after
+        # the other when requested from a nested job
+        return XTExecutorService.run_all(jobs, max_concurrency)
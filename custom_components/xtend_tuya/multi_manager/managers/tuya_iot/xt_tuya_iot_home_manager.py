@@ -8,9 +8,9 @@ from ....lib.tuya_iot.tuya_enums import AuthType
 from ...multi_manager import (
     MultiManager,
 )
-from ...shared.threading import (
-    XTConcurrencyManager,
-    XTEventLoopProtector,
+from .xt_tuya_iot_asset_tree import (
+    XTIOTAssetTree,
+    ROOT_ASSET_ID,
 )
 import custom_components.xtend_tuya.multi_manager.managers.tuya_iot.xt_tuya_iot_manager as man
 
@@ -25,37 +25,16 @@ class XTIOTHomeManager(TuyaHomeManager):
         super().__init__(api, device_manager.mq, device_manager)
         self.multi_manager = multi_manager
         self.device_manager = device_manager
+        self.asset_tree = XTIOTAssetTree(TuyaAssetManager(api))
 
-    async def async_query_device_ids(
-        self, asset_manager: TuyaAssetManager, asset_id: str, device_ids: list
-    ) -> list:
-        if asset_id != "-1":
-            device_ids += (
-                await XTEventLoopProtector.execute_out_of_event_loop_and_return(
-                    asset_manager.get_device_list, asset_id
-                )
-            )
-        assets = await XTEventLoopProtector.execute_out_of_event_loop_and_return(
-            asset_manager.get_asset_list, asset_id
-        )
-        concurrency_manager = XTConcurrencyManager(max_concurrency=9)
-        for asset in assets:
-            concurrency_manager.add_coroutine(
-                self.async_query_device_ids(
-                    asset_manager, asset["asset_id"], device_ids
-                )
-            )
-        await concurrency_manager.gather()
-        return device_ids
+    async def async_query_device_ids(self, asset_id: str = ROOT_ASSET_ID) -> list[str]:
+        return await self.asset_tree.async_get_device_ids(asset_id)
 
     async def async_update_device_cache(self):
         """Update home's devices cache."""
         self.device_manager.device_map.clear()
         if self.api.auth_type == AuthType.CUSTOM:
-            device_ids = []
-            asset_manager = TuyaAssetManager(self.api)
-
-            await self.async_query_device_ids(asset_manager, "-1", device_ids)
+            device_ids = await self.async_query_device_ids()
 
             # assets = asset_manager.get_asset_list()
             # for asset in assets:
@@ -4,14 +4,19 @@ https://github.com/tuya/tuya-iot-python-sdk
 """
 
 from __future__ import annotations
+import asyncio
 import json
 import datetime
 import time
+from concurrent.futures import Future
 from ....lib.tuya_iot import (
     TuyaDeviceManager,
 )
 from ....lib.tuya_iot.device import (
     BIZCODE_BIND_USER,
+    BIZCODE_DELETE,
+    BIZCODE_DPNAME_UPDATE,
+    BIZCODE_NAME_UPDATE,
 )
 from ....lib.tuya_iot.tuya_enums import (
     AuthType,
@@ -36,12 +41,18 @@ from ...shared.shared_classes import (
     XTDeviceMap,
 )
 from ...shared.threading import (
-    XTConcurrencyManager,
     XTEventLoopProtector,
+    XTExecutorService,
 )
 from ...shared.merging_manager import (
     XTMergingManager,
 )
+from ...shared.product_schema_cache import (
+    XTProductSchemaKind,
+)
+from ...shared.startup_tracer import (
+    XTStartupTracer,
+)
 from ...multi_manager import (
     MultiManager,  # noqa: F811
 )
@@ -139,8 +150,8 @@ class XTIOTDeviceManager(TuyaDeviceManager):
     async def async_update_device_list_in_smart_home_mod(self):
         if self.api.token_info.is_valid() is False:  # CHANGED
             return None  # CHANGED
-        response = await XTEventLoopProtector.execute_out_of_event_loop_and_return(
-            self.api.get, f"/v1.0/users/{self.api.token_info.uid}/devices"
+        response = await self.api.async_get(
+            f"/v1.0/users/{self.api.token_info.uid}/devices"
         )
         if response["success"]:
             for item in response["result"]:
@@ -199,12 +210,16 @@ class XTIOTDeviceManager(TuyaDeviceManager):
         Update devices info, devices status
 
         Args:
-          devIds(list[str]): devices' id, max 20 once call
+          devIds(list[str]): devices' id, split in chunks of 20 by the device manage
         """
-        self._update_device_list_info_cache(devIds)
-        self._update_device_list_status_cache(devIds)
+        await XTEventLoopProtector.execute_out_of_event_loop_and_return(
+            self._update_device_list_info_cache, devIds
+        )
+        await XTEventLoopProtector.execute_out_of_event_loop_and_return(
+            self._update_device_list_status_cache, devIds
+        )
 
-        self.update_device_function_cache(devIds)
+        await self.async_update_device_function_cache(devIds)
 
     def get_devices_from_sharing(self) -> dict[str, XTDevice]:
         return_dict: dict[str, XTDevice] = {}
@@ -234,35 +249,109 @@ class XTIOTDeviceManager(TuyaDeviceManager):
         self.update_device_list_in_smart_home_mod()
 
     async def async_update_device_function_cache(self, devIds: list = []):
-        concurrency_manager = XTConcurrencyManager(max_concurrency=9)
+        semaphore = asyncio.Semaphore(9)
 
-        device_map = (
-            filter(lambda d: d.id in devIds, self.device_map.values())
-            if devIds
-            else self.device_map.values()
+        async def update_single_device(device: XTDevice):
+            async with semaphore:
+                await self.async_update_single_device_function_cache(device)
+
+        await asyncio.gather(
+            *[
+                update_single_device(device)
+                for device in self._get_devices_by_ids(devIds)
+            ]
         )
 
-        async def update_single_device(device: XTDevice):
-            await XTEventLoopProtector.execute_out_of_event_loop_and_return(
-                self.update_device_function_cache, [device.id]
+    def update_device_function_cache(self, devIds: list = []):
+        for device in self._get_devices_by_ids(devIds):
+            self.update_single_device_function_cache(device)
+
+    def _get_devices_by_ids(self, devIds: list[str]) -> list[XTDevice]:
+        if not devIds:
+            return list(self.device_map.values())
+        return [
+            self.device_map[device_id]
+            for device_id in dict.fromkeys(devIds)
+            if device_id in self.device_map
+        ]
+
+    def update_single_device_function_cache(self, device: XTDevice):
+        with self.multi_manager.startup_tracer.span(
+            f"IOT device {device.id}",
+            XTStartupTracer.CATEGORY_DEVICE,
+            device_id=device.id,
+            device_name=device.name,
+            product_id=device.product_id,
+        ):
+            self._update_single_device_function_cache(device)
+
+    async def async_update_single_device_function_cache(self, device: XTDevice):
+        # The requests are submitted from the event loop, a job submitting
+        # them from a worker would run them one after the other
+        with self.multi_manager.startup_tracer.span(
+            f"IOT device {device.id}",
+            XTStartupTracer.CATEGORY_DEVICE,
+            track=f"IOT device {device.id}",
+            device_id=device.id,
+            device_name=device.name,
+            product_id=device.product_id,
+        ):
+            responses = await asyncio.gather(
+                *[
+                    asyncio.wrap_future(future)
+                    for future in self._submit_device_function_requests(device)
+                ]
+            )
+            await asyncio.wrap_future(
+                XTExecutorService.submit(
+                    self._apply_device_function_responses, device, *responses
+                )
             )
 
-        for device in device_map:
-            concurrency_manager.add_coroutine(update_single_device(device))
-        await concurrency_manager.gather()
+    def _update_single_device_function_cache(self, device: XTDevice):
+        self._apply_device_function_responses(
+            device,
+            *[future.result() for future in self._submit_device_function_requests(device)],
+        )
 
-    def update_device_function_cache(self, devIds: list = []):
-        for device_id in self.device_map:
-            device = self.device_map[device_id]
-            if device_id in devIds or not devIds:
-                super().update_device_function_cache(devIds=[device_id])
-                device_open_api = self.get_open_api_device(device)
-                XTMergingManager.merge_devices(
-                    device, device_open_api, self.multi_manager
-                )
-                self.multi_manager.virtual_state_handler.apply_init_virtual_states(
-                    device
-                )
+    def _submit_device_function_requests(self, device: XTDevice) -> list[Future]:
+        # The specification, model and shadow requests don't depend on each other,
+        # the first two are the same for all the devices of a product
+        product_schema_cache = self.multi_manager.product_schema_cache
+        fingerprint = product_schema_cache.get_device_fingerprint(device)
+        return [
+            XTExecutorService.submit(
+                product_schema_cache.get_response,
+                XTProductSchemaKind.IOT_SPECIFICATION,
+                device.product_id,
+                lambda: self.get_device_specification(device.id),
+                fingerprint,
+            ),
+            XTExecutorService.submit(
+                self.api.get, f"/v2.0/cloud/thing/{device.id}/shadow/properties"
+            ),
+            XTExecutorService.submit(
+                product_schema_cache.get_response,
+                XTProductSchemaKind.IOT_MODEL,
+                device.product_id,
+                lambda: self.api.get(f"/v2.0/cloud/thing/{device.id}/model"),
+                fingerprint,
+            ),
+        ]
+
+    def _apply_device_function_responses(
+        self,
+        device: XTDevice,
+        specification: dict[str, Any],
+        shadow_response: dict[str, Any],
+        model_response: dict[str, Any],
+    ):
+        self._apply_device_specification(device, specification)
+        device_open_api = self.get_open_api_device(
+            device, shadow_response, model_response
+        )
+        XTMergingManager.merge_devices(device, device_open_api, self.multi_manager)
+        self.multi_manager.virtual_state_handler.apply_init_virtual_states(device)
 
     def on_message(self, msg: dict):
         super().on_message(msg)
@@ -273,12 +362,25 @@ class XTIOTDeviceManager(TuyaDeviceManager):
             f"[{MESSAGE_SOURCE_TUYA_IOT}]On device other: {biz_code} <=> {data}",
             XTDeviceWatcherCategory.MQTT,
         )
+        if biz_code in (
+            BIZCODE_BIND_USER,
+            BIZCODE_DELETE,
+            BIZCODE_NAME_UPDATE,
+            BIZCODE_DPNAME_UPDATE,
+        ):
+            self.invalidate_response_cache(data.get("devId", device_id))
+        if biz_code == BIZCODE_DPNAME_UPDATE:
+            self.multi_manager.invalidate_product_schemas(data.get("devId", device_id))
         if biz_code == BIZCODE_BIND_USER:
-            self.multi_manager.add_device_by_id(data["devId"])
+            self.multi_manager.schedule_add_device_by_id(data["devId"])
             return None
 
         return super()._on_device_other(device_id, biz_code, data)
 
+    def invalidate_response_cache(self, device_id: str):
+        # Shared by the user and non user clients
+        self.api.response_cache.invalidate_device(device_id)
+
     def add_device_by_id(self, device_id: str):
         device_ids = [device_id]
         # wait for es sync
@@ -294,6 +396,11 @@ class XTIOTDeviceManager(TuyaDeviceManager):
             for listener in self.device_listeners:
                 listener.add_device(device)
 
+    def refresh_device_cache_by_ids(self, device_ids: list[str]):
+        self._update_device_list_info_cache(device_ids)
+        self._update_device_list_status_cache(device_ids)
+        self.update_device_function_cache(device_ids)
+
     def _on_device_report(self, device_id: str, status: list):
         self.multi_manager.device_watcher.report_message(
             device_id,
@@ -303,24 +410,19 @@ class XTIOTDeviceManager(TuyaDeviceManager):
         device = self.device_map.get(device_id, None)
         if not device:
             return
-        status_new = self.multi_manager.convert_device_report_status_list(
-            device_id,
-            status,
-            MESSAGE_SOURCE_TUYA_IOT,
-        )
-        status_new = self.multi_manager.multi_source_handler.filter_status_list(
-            device_id, MESSAGE_SOURCE_TUYA_IOT, status_new
-        )
-        status_new = self.multi_manager.virtual_state_handler.apply_virtual_states_to_status_list(
-            device, status_new, MESSAGE_SOURCE_TUYA_IOT
-        )
-        for item in status_new:
-            if "code" in item and "value" in item:
-                code = item["code"]
-                value = item["value"]
-                device.status[code] = value
 
-        super()._on_device_report(device_id, [])
+        def apply_status(status_new: list[dict[str, Any]]):
+            for item in status_new:
+                if "code" in item and "value" in item:
+                    code = item["code"]
+                    value = item["value"]
+                    device.status[code] = value
+
+            super(XTIOTDeviceManager, self)._on_device_report(device_id, [])
+
+        self.multi_manager.status_report_pipeline.process(
+            device, status, MESSAGE_SOURCE_TUYA_IOT, apply_status
+        )
 
     def _update_device_list_info_cache(self, devIds: list[str]):
         response = self.get_device_list_info(devIds)
@@ -330,7 +432,12 @@ class XTIOTDeviceManager(TuyaDeviceManager):
             self.device_map[device_id] = XTDevice(**item)
             self.device_map[device_id].source = "IOT _update_device_list_info_cache"
 
-    def get_open_api_device(self, device: XTDevice) -> XTDevice | None:
+    def get_open_api_device(
+        self,
+        device: XTDevice,
+        shadow_response: dict[str, Any] | None = None,
+        model_response: dict[str, Any] | None = None,
+    ) -> XTDevice | None:
         device_properties = XTDevice.from_compatible_device(
             device, "IOT get_open_api_device"
         )
@@ -339,8 +446,14 @@ class XTIOTDeviceManager(TuyaDeviceManager):
         device_properties.status = {}
         device_properties.local_strategy = {}
         device_properties.device_source_priority = XTDeviceSourcePriority.TUYA_IOT
-        response = self.api.get(f"/v2.0/cloud/thing/{device.id}/shadow/properties")
-        response2 = self.api.get(f"/v2.0/cloud/thing/{device.id}/model")
+        if shadow_response is None:
+            shadow_response = self.api.get(
+                f"/v2.0/cloud/thing/{device.id}/shadow/properties"
+            )
+        if model_response is None:
+            model_response = self.api.get(f"/v2.0/cloud/thing/{device.id}/model")
+        response = shadow_response
+        response2 = model_response
         if not response.get("success") or not response2.get("success"):
             LOGGER.warning(f"Response1: {response}")
             LOGGER.warning(f"Response2: {response2}")
@@ -467,22 +580,22 @@ class XTIOTDeviceManager(TuyaDeviceManager):
         return device_properties
 
     def send_property_update(self, device_id: str, properties: list[dict[str, Any]]):
+        # All the properties are issued in a single request
+        merged_properties: dict[str, Any] = {}
         for property in properties:
-            for prop_key in property:
-                property_str = json.dumps({prop_key: property[prop_key]})
-                self.multi_manager.device_watcher.report_message(
-                    device_id,
-                    f"Sending property update, payload: {json.dumps({'properties': property_str})}",
-                    XTDeviceWatcherCategory.IOT_API,
-                )
-                result = self.api.post(
-                    f"/v2.0/cloud/thing/{device_id}/shadow/properties/issue",
-                    {"properties": property_str},
-                )
-                if result.get("success") is False:
-                    raise Exception(
-                        f"send_property_update error:({properties}): {result}"
-                    )
+            merged_properties.update(property)
+        property_str = json.dumps(merged_properties)
+        self.multi_manager.device_watcher.report_message(
+            device_id,
+            f"Sending property update, payload: {json.dumps({'properties': property_str})}",
+            XTDeviceWatcherCategory.IOT_API,
+        )
+        result = self.api.post(
+            f"/v2.0/cloud/thing/{device_id}/shadow/properties/issue",
+            {"properties": property_str},
+        )
+        if result.get("success") is False:
+            raise Exception(f"send_property_update error:({properties}): {result}")
 
     def send_lock_unlock_command(
         self,
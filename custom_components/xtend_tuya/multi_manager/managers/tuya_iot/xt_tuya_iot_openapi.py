@@ -1,10 +1,59 @@
 """Tuya Open API."""
 
 from __future__ import annotations
+from typing import Any
 from ....lib.tuya_iot import (
     TuyaOpenAPI,
 )
+from ...shared.startup_tracer import (
+    XTStartupTracer,
+)
 
 
 class XTIOTOpenAPI(TuyaOpenAPI):
-    pass
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.tracer = XTStartupTracer()
+
+    def set_tracer(self, tracer: XTStartupTracer):
+        self.tracer = tracer
+
+    def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        with self.tracer.api_span("GET", path):
+            return super().get(path, params)
+
+    def post(self, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+        with self.tracer.api_span("POST", path):
+            return super().post(path, body)
+
+    def put(self, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+        with self.tracer.api_span("PUT", path):
+            return super().put(path, body)
+
+    def delete(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        with self.tracer.api_span("DELETE", path):
+            return super().delete(path, params)
+
+    async def async_get(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        with self.tracer.api_span("GET", path):
+            return await super().async_get(path, params)
+
+    async def async_post(
+        self, path: str, body: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        with self.tracer.api_span("POST", path):
+            return await super().async_post(path, body)
+
+    async def async_put(
+        self, path: str, body: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        with self.tracer.api_span("PUT", path):
+            return await super().async_put(path, body)
+
+    async def async_delete(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        with self.tracer.api_span("DELETE", path):
+            return await super().async_delete(path, params)
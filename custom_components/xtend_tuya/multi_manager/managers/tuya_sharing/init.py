@@ -5,6 +5,7 @@ from datetime import datetime
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from tuya_sharing.home import (
     HomeRepository,
 )
@@ -71,6 +72,7 @@ from ....const import (
     TUYA_DISCOVERY_NEW,
     TUYA_DISCOVERY_NEW_ORIG,
     TUYA_HA_SIGNAL_UPDATE_ENTITY,
+    XTCommandApiType,
     XTDeviceSourcePriority,
     LOGGER,
     XTLockingMechanism,
@@ -177,6 +179,12 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
                 token_listener,
             )
             sharing_device_manager.mq = None
+        sharing_device_manager.customer_api.set_async_session(
+            async_get_clientsession(hass)
+        )
+        sharing_device_manager.customer_api.set_tracer(
+            self.multi_manager.startup_tracer
+        )
         sharing_device_manager.home_repository = HomeRepository(
             sharing_device_manager.customer_api
         )
@@ -330,6 +338,28 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
             return None
         self.sharing_account.device_manager.add_device_by_id(device_id)
 
+    def get_device_ids(self) -> list[str]:
+        if self.sharing_account is None:
+            return []
+        return list(self.sharing_account.device_ids)
+
+    def restore_device_ids(self, device_ids: list[str]):
+        if self.sharing_account is None:
+            return None
+        self.sharing_account.device_ids.clear()
+        self.sharing_account.device_ids.extend(device_ids)
+
+    def refresh_device_cache_by_ids(self, device_ids: list[str]):
+        if self.sharing_account is None:
+            return None
+        self.sharing_account.device_manager.refresh_device_cache_by_ids(device_ids)
+        for device_id in device_ids:
+            if (
+                device_id in self.sharing_account.device_manager.device_map
+                and device_id not in self.sharing_account.device_ids
+            ):
+                self.sharing_account.device_ids.append(device_id)
+
     def on_mqtt_stop(self):
         if (
             self.sharing_account is not None
@@ -373,33 +403,36 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
     def send_command(
         self, device_id: str, command: dict[str, Any], reverse_filters: bool = False
     ) -> bool:
-        if self.sharing_account is None:
-            return False
-        regular_commands: list[dict[str, Any]] = []
+        return not self.send_commands_using_api(
+            device_id, [command], reverse_filters, XTCommandApiType.DEFAULT
+        )
+
+    def send_commands_using_api(
+        self,
+        device_id: str,
+        commands: list[dict[str, Any]],
+        reverse_filters: bool,
+        api_type: XTCommandApiType,
+    ) -> list[dict[str, Any]]:
+        if self.sharing_account is None or api_type != XTCommandApiType.DEFAULT:
+            return commands
         device = self.multi_manager.device_map.get(device_id)
         if device is None:
-            return False
-        command_code = command.get("code")
-        if command_code is None:
-            return False
-
-        # Filter commands that require the use of OpenAPI
-        if dpId := self.multi_manager._read_dpId_from_code(command_code, device):
-            use_open_api: bool = device.local_strategy[dpId].get("use_open_api", False)
-            if use_open_api:
-                if reverse_filters is False:
-                    return False
+            return commands
+        regular_commands: list[dict[str, Any]] = []
+        failed_commands: list[dict[str, Any]] = []
+        for command in commands:
+            if self._is_command_allowed(device, command, reverse_filters):
+                regular_commands.append(command)
             else:
-                if reverse_filters is True:
-                    return False
-        regular_commands.append(command)
+                failed_commands.append(command)
 
         try:
             if regular_commands:
                 self.sharing_account.device_manager.send_commands(
                     device_id, regular_commands
                 )
-            return True
+            return failed_commands
         except Exception as e:
             self.multi_manager.device_watcher.report_message(
                 device_id,
@@ -407,7 +440,25 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
                 XTDeviceWatcherCategory.SHARING_API,
                 device=device,
             )
-        return False
+        return commands
+
+    def _is_command_allowed(
+        self, device: XTDevice, command: dict[str, Any], reverse_filters: bool
+    ) -> bool:
+        command_code = command.get("code")
+        if command_code is None:
+            return False
+
+        # Filter commands that require the use of OpenAPI
+        if dpId := self.multi_manager._read_dpId_from_code(command_code, device):
+            use_open_api: bool = device.local_strategy[dpId].get("use_open_api", False)
+            if use_open_api:
+                if reverse_filters is False:
+                    return False
+            else:
+                if reverse_filters is True:
+                    return False
+        return True
 
     def convert_to_xt_device(
         self, device: Any, device_source_priority: XTDeviceSourcePriority | None = None
@@ -432,6 +483,16 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
             device, lock, force_unlock_mechanism
         )
 
+    def get_statistics(self) -> dict[str, Any]:
+        if (
+            self.sharing_account is None
+            or self.sharing_account.device_manager.customer_api is None
+        ):
+            return {}
+        return {
+            "rate_limiter": self.sharing_account.device_manager.customer_api.rate_limiter.get_statistics(),
+        }
+
     def call_api(
         self, method: str, url: str, payload: str | None
     ) -> dict[str, Any] | None:
@@ -452,6 +513,30 @@ class XTTuyaSharingDeviceManagerInterface(XTDeviceManagerInterface):
                 )
         return None
 
+    async def async_call_api(
+        self, method: str, url: str, payload: str | None
+    ) -> dict[str, Any] | None:
+        params: dict[str, Any] | None = None
+        if (
+            self.sharing_account is None
+            or self.sharing_account.device_manager.customer_api is None
+        ):
+            return None
+        if payload:
+            params = json.loads(payload)
+        match method:
+            case "GET":
+                return await self.sharing_account.device_manager.customer_api.async_get(
+                    url, params
+                )
+            case "POST":
+                return (
+                    await self.sharing_account.device_manager.customer_api.async_post(
+                        url, params
+                    )
+                )
+        return None
+
     def trigger_scene(self, home_id: str, scene_id: str) -> bool:
         if self.sharing_account is None:
             return False
@@ -1,11 +1,14 @@
 from __future__ import annotations
 from typing import Any
+import asyncio
 import uuid
 import hashlib
 import time
 
 # from datetime import datetime
 import json
+import aiohttp
+import requests
 from tuya_sharing import SharingTokenListener
 from tuya_sharing.customerapi import (
     CustomerApi,
@@ -18,8 +21,30 @@ from tuya_sharing.customerapi import (
 )
 from ....const import (
     LOGGER,
+    XT_API_MAX_CONCURRENT_REQUESTS,
+    XT_API_RATE_LIMIT,
+    XT_API_RATE_LIMIT_BURST,
     XT_RETRY_FAILED_CALLS_NUMBER,
 )
+from ...shared.startup_tracer import (
+    XTStartupTracer,
+)
+from ....lib.tuya_iot.ratelimit import (
+    ERROR_CLASS_NETWORK,
+    ERROR_CLASS_THROTTLED,
+    ERROR_CLASS_TRANSIENT,
+    TuyaRateLimiter,
+    TuyaRetryPolicy,
+    TuyaRetryRule,
+    classify_error,
+)
+
+
+# POST requests that only read data, retried like the GET ones
+IDEMPOTENT_POST_PATHS: list[str] = [
+    r"/v1\.0/m/life/ha/access/config",
+    r"/v1\.0/m/ipc/[^/]+/stream/actions/allocate",
+]
 
 
 class XTSharingTokenInfo(CustomerTokenInfo):
@@ -36,6 +61,20 @@ class XTSharingAPI(CustomerApi):
         listener: SharingTokenListener,
     ):
         super().__init__(token_info, client_id, user_code, end_point, listener)
+        self.async_session: aiohttp.ClientSession | None = None
+        self.async_semaphore: asyncio.Semaphore | None = None
+        self.rate_limiter = TuyaRateLimiter(XT_API_RATE_LIMIT, XT_API_RATE_LIMIT_BURST)
+        self.tracer = XTStartupTracer()
+        self.retry_policy = TuyaRetryPolicy(
+            {
+                ERROR_CLASS_TRANSIENT: TuyaRetryRule(
+                    max_retries=XT_RETRY_FAILED_CALLS_NUMBER,
+                    base_delay=0.5,
+                    max_delay=4.0,
+                )
+            },
+            IDEMPOTENT_POST_PATHS,
+        )
 
     @staticmethod
     def get_api_from_customer_api(other_api: CustomerApi) -> XTSharingAPI:
@@ -49,6 +88,17 @@ class XTSharingAPI(CustomerApi):
         new_api.session = other_api.session
         return new_api
 
+    def set_tracer(self, tracer: XTStartupTracer):
+        self.tracer = tracer
+
+    def set_async_session(
+        self,
+        session: aiohttp.ClientSession,
+        max_concurrent_requests: int = XT_API_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        self.async_session = session
+        self.async_semaphore = asyncio.Semaphore(max(1, max_concurrent_requests))
+
     def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
         """Http Get.
 
@@ -115,17 +165,11 @@ class XTSharingAPI(CustomerApi):
         request_result = self.__request("DELETE", path, params, None)
         return request_result if request_result is not None else {}
 
-    def __request(
+    def __prepare_request(
         self,
-        method: str,
-        path: str,
         params: dict[str, Any] | None = None,
         body: dict[str, Any] | None = None,
-        attempt_number: int = 0,
-    ) -> dict[str, Any] | None:
-        # start_time = datetime.now()
-        self.refresh_access_token_if_need()
-
+    ) -> tuple[dict[str, Any] | None, dict[str, Any] | None, dict[str, str], str]:
         rid = str(uuid.uuid4())
         sid = ""
         md5 = hashlib.md5()
@@ -139,8 +183,8 @@ class XTSharingAPI(CustomerApi):
         if params is not None and len(params.keys()) > 0:
             query_encdata = _form_to_json(params)
             query_encdata = _aes_gcm_encrypt(query_encdata, secret)
-            params_enc = {"encdata": query_encdata}
             query_encdata = str(query_encdata, encoding="utf8")
+            params_enc = {"encdata": query_encdata}
         body_encdata = ""
         body_encrypted = body
         if body is not None and len(body.keys()) > 0:
@@ -161,35 +205,28 @@ class XTSharingAPI(CustomerApi):
 
         sign = _restful_sign(hash_key, query_encdata, body_encdata, headers)
         headers["X-sign"] = sign
+        return params_enc, body_encrypted, headers, secret
 
-        response = self.session.request(
-            method,
-            self.endpoint + path,
-            params=params_enc,
-            json=body_encrypted,
-            headers=headers,
-        )
-
-        if response.ok is False:
-            LOGGER.error(
-                f"Response error: code={response.status_code}, content={response.content}"
-            )
-            return None
-
-        ret = response.json()
-
+    def __get_error_class(self, http_status: int, ret: dict[str, Any]) -> str | None:
+        error_class = None
+        if not ret.get("success"):
+            error_class = classify_error(ret.get("code"), http_status)
+        if error_class == ERROR_CLASS_THROTTLED:
+            self.rate_limiter.on_throttled()
+        elif error_class is None:
+            self.rate_limiter.on_success()
+        return error_class
+
+    def __decode_response(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+        ret: dict[str, Any],
+        secret: str,
+    ) -> dict[str, Any]:
         if not ret.get("success"):
-            if (
-                ret.get("code", 0) == "-9999999"
-                and attempt_number < XT_RETRY_FAILED_CALLS_NUMBER
-            ):
-                return self.__request(
-                    method=method,
-                    path=path,
-                    params=params,
-                    body=body,
-                    attempt_number=(attempt_number + 1),
-                )
             # LOGGER.warning(f"[SHARING API]API call error: Request: {method} {path} PARAMS: {json.dumps(params, ensure_ascii=False, indent=2) if params is not None else ''} BODY: {json.dumps(body, ensure_ascii=False, indent=2) if body is not None else ''}, Response: {json.dumps(ret, ensure_ascii=False, indent=2)}")
             raise Exception(
                 f"[SHARING API]API call error: Request: {method} {path} PARAMS: {json.dumps(params, ensure_ascii=False, indent=2) if params is not None else ''} BODY: {json.dumps(body, ensure_ascii=False, indent=2) if body is not None else ''}, Response: {json.dumps(ret, ensure_ascii=False, indent=2)}"
@@ -206,3 +243,166 @@ class XTSharingAPI(CustomerApi):
         #    f"[SHARING API][{time_taken}]Request: {method} {path} PARAMS: {json.dumps(params, ensure_ascii=False, indent=2) if params is not None else ''} BODY: {json.dumps(body, ensure_ascii=False, indent=2) if body is not None else ''}, Response: {json.dumps(ret, ensure_ascii=False, indent=2)}"
         # )
         return ret
+
+    def __request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        with self.tracer.api_span(method, path):
+            return self.__send_request(method, path, params, body)
+
+    def __send_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        # start_time = datetime.now()
+        self.refresh_access_token_if_need()
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            params_enc, body_encrypted, headers, secret = self.__prepare_request(
+                params, body
+            )
+            try:
+                response = self.session.request(
+                    method,
+                    self.endpoint + path,
+                    params=params_enc,
+                    json=body_encrypted,
+                    headers=headers,
+                )
+                ret = response.json() if response.ok else {}
+            except (requests.exceptions.RequestException, ValueError):
+                delay = self.retry_policy.get_retry_delay(
+                    ERROR_CLASS_NETWORK, attempt, method, path
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.get_retry_delay(
+                    self.__get_error_class(response.status_code, ret),
+                    attempt,
+                    method,
+                    path,
+                )
+                if delay is None:
+                    if response.ok is False:
+                        LOGGER.error(
+                            f"Response error: code={response.status_code}, content={response.content}"
+                        )
+                        return None
+                    return self.__decode_response(
+                        method, path, params, body, ret, secret
+                    )
+            time.sleep(delay)
+            attempt += 1
+
+    async def __async_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        with self.tracer.api_span(method, path):
+            return await self.__async_send_request(method, path, params, body)
+
+    async def __async_send_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any] | None:
+        session = self.async_session
+        semaphore = self.async_semaphore
+        if session is None or semaphore is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.__request, method, path, params, body
+            )
+        if self.token_info.expire_time - 60 * 1000 <= int(time.time() * 1000):
+            # Rare, the token refresh stays synchronous
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.refresh_access_token_if_need
+            )
+
+        attempt = 0
+        while True:
+            await self.rate_limiter.async_acquire()
+            try:
+                async with semaphore:
+                    params_enc, body_encrypted, headers, secret = (
+                        self.__prepare_request(params, body)
+                    )
+                    async with session.request(
+                        method,
+                        self.endpoint + path,
+                        params=params_enc,
+                        json=body_encrypted,
+                        headers=headers,
+                    ) as response:
+                        response_ok = response.ok
+                        response_status = response.status
+                        if response_ok:
+                            ret = await response.json(content_type=None)
+                        else:
+                            ret = {}
+                            content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                delay = self.retry_policy.get_retry_delay(
+                    ERROR_CLASS_NETWORK, attempt, method, path
+                )
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.get_retry_delay(
+                    self.__get_error_class(response_status, ret),
+                    attempt,
+                    method,
+                    path,
+                )
+                if delay is None:
+                    if response_ok is False:
+                        LOGGER.error(
+                            f"Response error: code={response_status}, content={content}"
+                        )
+                        return None
+                    return self.__decode_response(
+                        method, path, params, body, ret, secret
+                    )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def async_get(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        request_result = await self.__async_request("GET", path, params, None)
+        return request_result if request_result is not None else {}
+
+    async def async_post(
+        self,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        request_result = await self.__async_request("POST", path, params, body)
+        return request_result if request_result is not None else {}
+
+    async def async_put(
+        self, path: str, body: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        request_result = await self.__async_request("PUT", path, None, body)
+        return request_result if request_result is not None else {}
+
+    async def async_delete(
+        self, path: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        request_result = await self.__async_request("DELETE", path, params, None)
+        return request_result if request_result is not None else {}
@@ -1,9 +1,12 @@
 from __future__ import annotations
 from typing import Any
+from functools import partial
 import json
 from tuya_sharing.device import (
     CustomerDevice,
+    DeviceFunction,
     DeviceRepository,
+    DeviceStatusRange,
 )
 import custom_components.xtend_tuya.multi_manager.managers.tuya_sharing.xt_tuya_sharing_manager as sm
 from .xt_tuya_sharing_api import (
@@ -16,8 +19,15 @@ from ...shared.shared_classes import (
     XTDeviceFunction,
     XTDeviceStatusRange,
 )
+from ...shared.product_schema_cache import (
+    XTProductSchemaCache,
+    XTProductSchemaKind,
+)
+from ...shared.startup_tracer import (
+    XTStartupTracer,
+)
 from ...shared.threading import (
-    XTThreadingManager,
+    XTExecutorService,
 )
 from ....const import (
     LOGGER,  # noqa: F401
@@ -74,8 +84,32 @@ class XTSharingDeviceRepository(DeviceRepository):
                         )
                         # device.status[key] = False
 
+    # Copy of the Tuya original method, the specification is shared by the devices of a product
+    def _update_device_specification_mod(self, device: CustomerDevice):
+        device_id = device.id
+        response = self.multi_manager.product_schema_cache.get_response(  # CHANGED
+            XTProductSchemaKind.SHARING_SPECIFICATION,
+            device.product_id,
+            lambda: self.api.get(f"/v1.1/m/life/{device_id}/specifications"),
+            XTProductSchemaCache.get_device_fingerprint(device),
+        )
+        if response.get("success"):
+            result = response.get("result", {})
+            function_map = {}
+            for function in result["functions"]:
+                code = function["code"]
+                function_map[code] = DeviceFunction(**function)
+
+            status_range = {}
+            for status in result["status"]:
+                code = status["code"]
+                status_range[code] = DeviceStatusRange(**status)
+
+            device.function = function_map
+            device.status_range = status_range
+
     def update_device_specification(self, device: CustomerDevice):
-        super().update_device_specification(device)
+        self._update_device_specification_mod(device)
 
         self._fix_infrared_device_specification(device)
 
@@ -96,9 +130,7 @@ class XTSharingDeviceRepository(DeviceRepository):
         return self._query_devices(response)
 
     def _query_devices(self, response) -> list[CustomerDevice]:
-        _devices = []
-
-        def _query_devices_thread(item) -> None:
+        def _query_device(item) -> CustomerDevice:
             device = CustomerDevice(**item)
             status = {}
             for item_status in device.status:
@@ -107,20 +139,34 @@ class XTSharingDeviceRepository(DeviceRepository):
                     value = item_status["value"]  # type: ignore
                     status[code] = value
             device.status = status
-            self.update_device_specification(device)
-            self.update_device_strategy_info(device)
-            _devices.append(device)
+            with self.multi_manager.startup_tracer.span(
+                f"Sharing device {device.id}",
+                XTStartupTracer.CATEGORY_DEVICE,
+                device_id=device.id,
+                device_name=getattr(device, "name", ""),
+                product_id=getattr(device, "product_id", ""),
+            ):
+                self.update_device_specification(device)
+                self.update_device_strategy_info(device)
+            return device
 
-        thread_manager: XTThreadingManager = XTThreadingManager()
-        if response["success"]:
-            for item in response["result"]:
-                thread_manager.add_thread(_query_devices_thread, item=item)
-        thread_manager.start_and_wait(max_concurrency=9)
-        return _devices
+        if not response["success"]:
+            return []
+        # Runs on the nested pool when called from an executor job, inline
+        # (one device at a time) when called from a nested job
+        return XTExecutorService.run_all(
+            [partial(_query_device, item) for item in response["result"]],
+            max_concurrency=9,
+        )
 
     def _update_device_strategy_info_mod(self, device: CustomerDevice):
         device_id = device.id
-        response = self.api.get(f"/v1.0/m/life/devices/{device_id}/status")
+        response = self.multi_manager.product_schema_cache.get_response(  # CHANGED
+            XTProductSchemaKind.SHARING_STRATEGY,
+            device.product_id,
+            lambda: self.api.get(f"/v1.0/m/life/devices/{device_id}/status"),
+            XTProductSchemaCache.get_device_fingerprint(device),
+        )
         support_local = True
         if response.get("success"):
             result = response.get("result", {})
@@ -11,6 +11,7 @@ from tuya_sharing.manager import (
     BIZCODE_OFFLINE,
     BIZCODE_ONLINE,
     BIZCODE_BIND_USER,
+    BIZCODE_DPNAME_UPDATE,
 )
 from tuya_sharing.home import (
     SmartLifeHome,
@@ -83,9 +84,6 @@ class XTSharingDeviceManager(Manager):  # noqa: F811
                 self.mq.stop()
             self.__other_device_manager.refresh_mq()
             return
-        if self.mq is not None:
-            self.mq.stop()
-            self.mq = None
 
         home_ids = [home.id for home in self.user_homes]
         device = [
@@ -94,6 +92,20 @@ class XTSharingDeviceManager(Manager):  # noqa: F811
             # if hasattr(device, "id") and getattr(device, "set_up", False)
         ]
 
+        if (
+            isinstance(self.mq, mq.XTSharingMQ)
+            and self.mq.api is self.customer_api
+            and self.mq.is_alive()
+            and not self.mq.stopped
+        ):
+            # Keep the connection, only subscribe / unsubscribe what changed
+            self.mq.update_subscriptions(home_ids, device)
+            return
+
+        if self.mq is not None:
+            self.mq.stop()
+            self.mq = None
+
         if self.customer_api is not None:
             self.mq = mq.XTSharingMQ(
                 self.customer_api,
@@ -164,8 +176,10 @@ class XTSharingDeviceManager(Manager):  # noqa: F811
             f"[{MESSAGE_SOURCE_TUYA_SHARING}]On device other: {biz_code} <=> {data}",
             XTDeviceWatcherCategory.MQTT,
         )
+        if biz_code == BIZCODE_DPNAME_UPDATE:
+            self.multi_manager.invalidate_product_schemas(device_id)
         if biz_code == BIZCODE_BIND_USER:
-            self.multi_manager.add_device_by_id(device_id)
+            self.multi_manager.schedule_add_device_by_id(device_id)
         else:
             super()._on_device_other(device_id, biz_code, data)
         if biz_code in [BIZCODE_ONLINE, BIZCODE_OFFLINE]:
@@ -183,6 +197,17 @@ class XTSharingDeviceManager(Manager):  # noqa: F811
                 for listener in self.device_listeners:
                     listener.add_device(device)
 
+    def refresh_device_cache_by_ids(self, device_ids: list[str]):
+        new_device_ids = [
+            device_id for device_id in device_ids if device_id not in self.device_map
+        ]
+        self._update_device_list_info_cache(device_ids)
+
+        if self.mq is not None:
+            for device_id in new_device_ids:
+                if device := self.device_map.get(device_id):
+                    self.mq.subscribe_device(device_id, device)
+
     def _on_device_report(self, device_id: str, status: list):
         self.multi_manager.device_watcher.report_message(
             device_id,
@@ -192,19 +217,13 @@ class XTSharingDeviceManager(Manager):  # noqa: F811
         device = self.device_map.get(device_id, None)
         if not device:
             return
-        status_new = self.multi_manager.convert_device_report_status_list(
-            device_id,
-            status,
-            MESSAGE_SOURCE_TUYA_SHARING,
-        )
-        status_new = self.multi_manager.multi_source_handler.filter_status_list(
-            device_id, MESSAGE_SOURCE_TUYA_SHARING, status_new
-        )
-        status_new = self.multi_manager.virtual_state_handler.apply_virtual_states_to_status_list(
-            device, status_new, MESSAGE_SOURCE_TUYA_SHARING
-        )
 
-        super()._on_device_report(device_id, status_new)
+        def apply_status(status_new: list[dict[str, Any]]):
+            super(XTSharingDeviceManager, self)._on_device_report(device_id, status_new)
+
+        self.multi_manager.status_report_pipeline.process(
+            device, status, MESSAGE_SOURCE_TUYA_SHARING, apply_status
+        )
 
     def send_commands(self, device_id: str, commands: list[dict[str, Any]]):
         self.multi_manager.device_watcher.report_message(
@@ -1,6 +1,7 @@
 from __future__ import annotations
-import json
-from typing import Any
+import threading
+import time
+from typing import Any, Iterable
 from tuya_sharing.mq import (
     SharingMQ,
     SharingMQConfig,
@@ -11,6 +12,10 @@ from paho.mqtt import client as mqtt
 import custom_components.xtend_tuya.multi_manager.managers.tuya_sharing.xt_tuya_sharing_manager as sm
 from ....const import (
     LOGGER,
+    XT_SHARING_MQ_SUBSCRIBE_BATCH_SIZE,
+)
+from ....lib.tuya_iot.openmq_decoder import (
+    json_loads,
 )
 
 # from paho.mqtt.enums import (
@@ -28,6 +33,118 @@ from ....const import (
 from urllib.parse import urlsplit
 
 
+class XTSharingMQSubscriptions:
+    # Desired topics vs topics acknowledged by the broker on the current client
+    def __init__(self, batch_size: int = XT_SHARING_MQ_SUBSCRIBE_BATCH_SIZE) -> None:
+        self.batch_size = max(1, batch_size)
+        self.lock = threading.Lock()
+        self.client: mqtt.Client | None = None
+        self.desired_topics: dict[str, None] = {}
+        self.acknowledged_topics: set[str] = set()
+        self.in_flight: dict[int, list[str]] = {}
+        self.rejected_topics: set[str] = set()
+
+    def set_desired_topics(self, topics: Iterable[str]) -> None:
+        new_topics = dict.fromkeys(topics)
+        with self.lock:
+            removed_topics = [
+                topic for topic in self.desired_topics if topic not in new_topics
+            ]
+            self.desired_topics = new_topics
+            self._unsubscribe(removed_topics)
+            self._subscribe_missing()
+
+    def add_topics(self, topics: Iterable[str]) -> None:
+        with self.lock:
+            for topic in topics:
+                self.desired_topics[topic] = None
+            self._subscribe_missing()
+
+    def remove_topics(self, topics: Iterable[str]) -> None:
+        with self.lock:
+            removed_topics: list[str] = []
+            for topic in topics:
+                if topic in self.desired_topics:
+                    del self.desired_topics[topic]
+                    removed_topics.append(topic)
+            self._unsubscribe(removed_topics)
+
+    def on_connect(self, client: mqtt.Client, topics: Iterable[str]) -> None:
+        # The sessions are not persistent, everything has to be subscribed again
+        with self.lock:
+            self.client = client
+            self.desired_topics = dict.fromkeys(topics)
+            self.acknowledged_topics.clear()
+            self.in_flight.clear()
+            self.rejected_topics.clear()
+            start_time = time.monotonic()
+            packet_count = self._subscribe_missing()
+            LOGGER.debug(
+                f"Sharing MQ: subscribing {len(self.desired_topics)} topics in {packet_count} packets took {time.monotonic() - start_time:.3f}s"
+            )
+
+    def on_disconnect(self, client: mqtt.Client) -> None:
+        with self.lock:
+            # Ignore the disconnection of a replaced client
+            if client is not self.client:
+                return
+            self.client = None
+            self.acknowledged_topics.clear()
+            self.in_flight.clear()
+
+    def on_subscribe(self, client: mqtt.Client, mid: int, granted_qos: Any) -> None:
+        with self.lock:
+            if client is not self.client:
+                return
+            topics = self.in_flight.pop(mid, None)
+            if topics is None:
+                return
+            for topic, qos in zip(topics, granted_qos or []):
+                if qos == 128:
+                    self.rejected_topics.add(topic)
+                elif topic in self.desired_topics:
+                    self.acknowledged_topics.add(topic)
+            if self.rejected_topics:
+                LOGGER.warning(
+                    f"Sharing MQ: the broker rejected {len(self.rejected_topics)} topics"
+                )
+
+    def _subscribe_missing(self) -> int:
+        # Called with the lock held
+        if self.client is None:
+            return 0
+        pending_topics: set[str] = set()
+        for topics in self.in_flight.values():
+            pending_topics.update(topics)
+        missing_topics = [
+            topic
+            for topic in self.desired_topics
+            if topic not in self.acknowledged_topics
+            and topic not in pending_topics
+            and topic not in self.rejected_topics
+        ]
+        packet_count = 0
+        for i in range(0, len(missing_topics), self.batch_size):
+            batch_topics = missing_topics[i : i + self.batch_size]
+            result, mid = self.client.subscribe([(topic, 0) for topic in batch_topics])
+            if result != mqtt.MQTT_ERR_SUCCESS:
+                # Will be subscribed again on the next connection
+                break
+            self.in_flight[mid] = batch_topics
+            packet_count += 1
+        return packet_count
+
+    def _unsubscribe(self, topics: list[str]) -> None:
+        # Called with the lock held
+        for topic in topics:
+            self.acknowledged_topics.discard(topic)
+            self.rejected_topics.discard(topic)
+        if self.client is None:
+            return
+        for i in range(0, len(topics), self.batch_size):
+            self.client.unsubscribe(topics[i : i + self.batch_size])
+
+
 class XTSharingMQ(SharingMQ):
     # This block will be useful when we'll use Paho MQTT 3.x or above
     # def _on_disconnect(self, client: mqtt.Client, userdata: Any, flags: mqtt_DisconnectFlags, rc: mqtt_ReasonCode, properties: mqtt_Properties | None = None):
@@ -55,19 +172,49 @@ class XTSharingMQ(SharingMQ):
             device,  # type: ignore
         )
         self.manager = manager
-        self.shutting_down = False
+        self.subscriptions = XTSharingMQSubscriptions()
+        self.device = self._get_unique_devices(device)
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+        super().stop()
+
+    def _get_unique_devices(self, device: list) -> list:
+        return list({dev.id: dev for dev in device}.values())
+
+    def _get_device_topics(self, dev_id: str) -> list[str]:
+        return [self.subscribe_topic(dev_id, False), self.subscribe_topic(dev_id, True)]
+
+    def _get_desired_topics(self) -> list[str]:
+        if self.mq_config is None:
+            return []
+        topics = [
+            self.mq_config.owner_topic.format(ownerId=owner_id)
+            for owner_id in self.owner_ids
+        ]
+        for dev in self.device:
+            topics.extend(self._get_device_topics(dev.id))
+        return topics
+
+    def update_subscriptions(self, owner_ids: list, device: list[sm.XTDevice]) -> None:
+        # Only the difference with the current subscriptions is sent
+        self.owner_ids = owner_ids
+        self.device = self._get_unique_devices(device)
+        if self.mq_config is not None:
+            self.subscriptions.set_desired_topics(self._get_desired_topics())
 
     def subscribe_device(self, dev_id: str, device: CustomerDevice):
         if device is None:
             return
-        self.device.append(device)
+        if all(dev.id != dev_id for dev in self.device):
+            self.device.append(device)
         self.subscribe_to_mqtt_topics(dev_id)
-    
+
     def un_subscribe_device(self, dev_id: str, support_local: bool):
-        topic1 = self.subscribe_topic(dev_id, True)
-        topic2 = self.subscribe_topic(dev_id, False)
-        if self.client is not None:
-            self.client.unsubscribe([topic1, topic2])
+        self.device = [dev for dev in self.device if dev.id != dev_id]
+        if self.mq_config is not None:
+            self.subscriptions.remove_topics(self._get_device_topics(dev_id))
 
     def _start(self, mq_config: SharingMQConfig) -> mqtt.Client:
         # mqttc = mqtt.Client(callback_api_version=mqtt_CallbackAPIVersion.VERSION2, client_id=mq_config.client_id)
@@ -91,16 +238,18 @@ class XTSharingMQ(SharingMQ):
         return mqttc
 
     def _on_disconnect(self, client, userdata, rc):
+        self.subscriptions.on_disconnect(client)
         if rc != 0:
-            if self.shutting_down is False:
-                self.shutting_down = True
-                LOGGER.warning("Unexpected disconnection. Reconnecting...")
-                self.manager.refresh_mq()
+            # The client reconnects by itself and _on_connect subscribes again
+            LOGGER.warning("Unexpected disconnection. Reconnecting...")
         else:
             LOGGER.debug("disconnect")
+
+    def _on_subscribe(self, mqttc: mqtt.Client, user_data: Any, mid, granted_qos):
+        self.subscriptions.on_subscribe(mqttc, mid, granted_qos)
     
     def _on_message(self, mqttc: mqtt.Client, user_data: Any, msg: mqtt.MQTTMessage):
-        msg_dict = json.loads(msg.payload.decode("utf8"))
+        msg_dict = json_loads(msg.payload)
 
         # LOGGER.warning(f"[SHARING MQTT]({self.uuid})on_message: {msg_dict}, user_data: {user_data}")
 
@@ -108,29 +257,13 @@ class XTSharingMQ(SharingMQ):
             listener(msg_dict)
     
     def subscribe_to_mqtt_topics(self, dev_id: str) -> None:
-        topic1 = self.subscribe_topic(dev_id, True)
-        topic2 = self.subscribe_topic(dev_id, False)
-        if self.client is not None:
-            self.client.subscribe([(topic1, 0), (topic2, 0)])
+        if self.mq_config is not None:
+            self.subscriptions.add_topics(self._get_device_topics(dev_id))
 
     def _on_connect(self, mqttc: mqtt.Client, user_data: Any, flags, rc):
         if rc == 0:
             if self.mq_config is None:
                 return
-            for owner_id in self.owner_ids:
-                mqttc.subscribe(self.mq_config.owner_topic.format(ownerId=owner_id))
-            batch_size = 10
-            for i in range(0, len(self.device), batch_size):
-                batch_devices = self.device[i:i + batch_size]
-                topics_to_subscribe = []
-                for dev in batch_devices:
-                    dev_id = dev.id
-                    topic_str = self.subscribe_topic(dev_id, False)
-                    topics_to_subscribe.append((topic_str, 0))  # 指定主题和qos=0
-                    topic_str = self.subscribe_topic(dev_id, True)
-                    topics_to_subscribe.append((topic_str, 0))  # 指定主题和qos=0
-
-                if topics_to_subscribe:
-                    mqttc.subscribe(topics_to_subscribe)
+            self.subscriptions.on_connect(mqttc, self._get_desired_topics())
         else:
             super()._on_connect(mqttc, user_data, flags, rc)
@@ -1,6 +1,8 @@
 from __future__ import annotations
-import copy
+import asyncio
 import importlib
+import threading
+import time
 import os
 import inspect
 from typing import Any, Literal, Optional, Callable
@@ -11,6 +13,7 @@ from ..lib.tuya_iot.device import (
     PROTOCOL_OTHER,
 )
 from ..const import (
+    CONF_STARTUP_TRACING,
     LOGGER,
     AllowedPlugins,
     XTDeviceEntityFunctions,
@@ -20,8 +23,10 @@ from ..const import (
     XTIRRemoteInformation,
     XTIRRemoteKeysInformation,
     XTLockingMechanism,
-    MESSAGE_SOURCE_TUYA_SHARING,
     XTDeviceWatcherCategory,
+    XT_DEVICE_SNAPSHOT_REFRESH_RETRY_DELAY,
+    XT_DEVICE_SNAPSHOT_REFRESH_MAX_RETRY_DELAY,
+    XT_ADD_DEVICE_SYNC_DELAY,
 )
 from .shared.shared_classes import (
     DeviceWatcher,
@@ -33,6 +38,7 @@ from .shared.shared_classes import (
 from .shared.threading import (
     XTConcurrencyManager,
     XTEventLoopProtector,
+    XTExecutorService,
 )
 from .shared.debug.debug_helper import (
     DebugHelper,
@@ -48,6 +54,29 @@ from .shared.multi_source_handler import (
 )
 from .shared.multi_mq import (
     MultiMQTTQueue,
+    MultiMQTTPendingBuffer,
+)
+from .shared.multi_deduplicator import (
+    MultiMessageDeduplicator,
+)
+from .shared.multi_command_route_cache import (
+    MultiCommandRoute,
+    MultiCommandRouteCache,
+)
+from .shared.multi_command_aggregator import (
+    MultiCommandAggregator,
+)
+from .shared.multi_command_dispatcher import (
+    MultiCommandDispatcher,
+)
+from .shared.startup_tracer import (
+    XTStartupTracer,
+)
+from .shared.product_schema_cache import (
+    XTProductSchemaCache,
+)
+from .shared.device_snapshot import (
+    XTDeviceSnapshot,
 )
 from .shared.multi_device_listener import (
     MultiDeviceListener,
@@ -58,6 +87,9 @@ from .shared.multi_virtual_state_handler import (
 from .shared.multi_virtual_function_handler import (
     XTVirtualFunctionHandler,
 )
+from .shared.status_report_pipeline import (
+    XTStatusReportPipeline,
+)
 from ..util import (
     append_lists,
 )
@@ -73,6 +105,9 @@ import custom_components.xtend_tuya.multi_manager.shared.data_entry.shared_data_
 class MultiManager:  # noqa: F811
     def __init__(self, hass: HomeAssistant, config_entry: XTConfigEntry) -> None:
         self.config_entry = config_entry
+        self.startup_tracer = XTStartupTracer(
+            self, enabled=config_entry.options.get(CONF_STARTUP_TRACING, False)
+        )
         self.virtual_state_handler = XTVirtualStateHandler(self)
         self.virtual_function_handler = XTVirtualFunctionHandler(self)
         self.multi_mqtt_queue: MultiMQTTQueue = MultiMQTTQueue(self)
@@ -81,11 +116,19 @@ class MultiManager:  # noqa: F811
         )
         self.hass = hass
         self.multi_source_handler = MultiSourceHandler(self)
+        self.status_report_pipeline = XTStatusReportPipeline(self)
+        self.message_deduplicator = MultiMessageDeduplicator(self)
+        self.command_route_cache = MultiCommandRouteCache(self)
+        self.command_aggregator = MultiCommandAggregator(self)
+        self.command_dispatcher = MultiCommandDispatcher(self)
         self.device_watcher = DeviceWatcher(self)
         self.accounts: dict[str, XTDeviceManagerInterface] = {}
         self.master_device_map: XTDeviceMap = XTDeviceMap({})
         self.is_ready_for_messages = False
-        self.pending_messages: list[tuple[str, dict]] = []
+        self.pending_messages = MultiMQTTPendingBuffer(self)
+        # Reentrant: without MQTT workers the replayed messages are processed
+        # while it is held
+        self.pending_messages_lock = threading.RLock()
         self.devices_shared: dict[str, XTDevice] = {}
         self.debug_helper = DebugHelper(self)
         self.scene_id: list[str] = []
@@ -98,6 +141,12 @@ class MultiManager:  # noqa: F811
         for priority in XTMultiManagerPostSetupCallbackPriority:
             self.post_setup_callbacks[priority] = []
         self.loading_finalized: bool = False
+        self.device_snapshot = XTDeviceSnapshot(self)
+        self.product_schema_cache = XTProductSchemaCache(self)
+        self.loaded_from_snapshot: bool = False
+
+        # device_id -> code -> value reported during the refresh of the snapshot
+        self.snapshot_reported_status: dict[str, dict[str, Any]] = {}
         self._user_input_flows: dict[str, shared_data_entry.XTFlowDataBase] = {}
 
     @property
@@ -137,9 +186,7 @@ class MultiManager:  # noqa: F811
                     )
                     #LOGGER.debug(f"Plugin {load_path} loaded")
                     instance: XTDeviceManagerInterface = plugin.get_plugin_instance()
-                    concurrency_manager.add_coroutine(
-                        instance.setup_from_entry(self.hass, self.config_entry, self)
-                    )
+                    concurrency_manager.add_coroutine(self._setup_plugin(instance, directory))
                 except ModuleNotFoundError as e:
                     LOGGER.error(f"Loading module failed: {e}")
         await concurrency_manager.gather()
@@ -176,15 +223,31 @@ class MultiManager:  # noqa: F811
                 return_list.append(new_descriptors)
         return return_list
 
+    async def _setup_plugin(self, instance: XTDeviceManagerInterface, name: str):
+        with self.startup_tracer.span(
+            f"setup_from_entry {name}", XTStartupTracer.CATEGORY_ACCOUNT, track=name
+        ):
+            await instance.setup_from_entry(self.hass, self.config_entry, self)
+
     async def update_device_cache(self):
         self.is_ready_for_messages = False
+        await self._update_account_device_caches()
+        self._build_master_device_map()
+
+    async def _update_account_device_caches(self):
         XTDeviceMap.clear_master_device_map()
+        await self.product_schema_cache.async_load()
         concurrency_manager = XTConcurrencyManager()
 
         async def update_manager_device_cache(
             manager: XTDeviceManagerInterface,
         ) -> None:
-            await manager.update_device_cache()
+            with self.startup_tracer.span(
+                f"update_device_cache {manager.get_type_name()}",
+                XTStartupTracer.CATEGORY_ACCOUNT,
+                track=manager.get_type_name(),
+            ):
+                await manager.update_device_cache()
 
         for manager in self.accounts.values():
             concurrency_manager.add_coroutine(
@@ -192,7 +255,9 @@ class MultiManager:  # noqa: F811
             )
 
         await concurrency_manager.gather()
+        await self.product_schema_cache.async_save()
 
+    def _build_master_device_map(self):
         # Register all devices in the master device map
         self.update_master_device_map()
 
@@ -200,12 +265,7 @@ class MultiManager:  # noqa: F811
         # "All functionnality" device
         self._merge_devices_from_multiple_sources()
         for device in self.device_map.values():
-            # Applied twice because some parts at the end of apply_fix would change values of previous calls
-            CloudFixes.apply_fixes(device, self)
-            CloudFixes.apply_fixes(device, self)
-
-            # Don't allow changes to DPCodes after the global initialization
-            device.force_compatibility = True
+            self._apply_cloud_fixes(device)
         self._enable_multi_map_device_alignment()
         self._process_pending_messages()
         for device in self.device_map.values():
@@ -213,11 +273,164 @@ class MultiManager:  # noqa: F811
                 if isinstance(device.status, XTTrackedDictionnary) is False:
                     device.status = XTTrackedDictionnary(device.status) # type: ignore
 
+    async def async_load_device_snapshot(self) -> bool:
+        # Devices of the last run, the device reports are applied to them
+        # until the cloud refresh replaces them
+        devices = await self.device_snapshot.async_load()
+        if not devices:
+            return False
+        self.is_ready_for_messages = False
+        XTDeviceMap.clear_master_device_map()
+        for device in devices:
+            device.set_device_map(self.master_device_map)
+            self.master_device_map[device.id] = device
+            device.rebuild_dpcode_index()
+        XTDeviceMap.register_device_map(self.master_device_map)
+        for account_name, account in self.accounts.items():
+            account.restore_device_ids(
+                self.device_snapshot.account_device_ids.get(account_name, [])
+            )
+        self.loaded_from_snapshot = True
+        self._process_pending_messages()
+        return True
+
+    async def async_refresh_device_cache_from_cloud(self):
+        retry_delay = XT_DEVICE_SNAPSHOT_REFRESH_RETRY_DELAY
+        while True:
+            try:
+                with self.startup_tracer.span("refresh_device_cache_from_cloud"):
+                    await self._async_refresh_device_cache_from_cloud()
+                self.startup_tracer.stop()
+                return
+            except Exception as e:
+                LOGGER.warning(
+                    f"Refreshing the devices of {self.config_entry.title} failed, retrying in {retry_delay}s: {e}"
+                )
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, XT_DEVICE_SNAPSHOT_REFRESH_MAX_RETRY_DELAY)
+
+    async def _async_refresh_device_cache_from_cloud(self):
+        # The entities keep the snapshot devices, they are updated with the
+        # cloud data and put back in place of the fresh devices
+        self.snapshot_reported_status = {}
+        await self._update_account_device_caches()
+
+        # The messages received while the devices are swapped are replayed on
+        # the fresh devices
+        with self.pending_messages_lock:
+            self.is_ready_for_messages = False
+            self.loaded_from_snapshot = False
+        snapshot_devices: dict[str, XTDevice] = dict(self.master_device_map)
+        self.master_device_map.clear()
+        self._build_master_device_map()
+
+        structure_changed = set(snapshot_devices) != set(self.master_device_map)
+        for device_id, fresh_device in list(self.master_device_map.items()):
+            snapshot_device = snapshot_devices.get(device_id)
+            if snapshot_device is None:
+                continue
+
+            # Reports received during the refresh are newer than the cloud status
+            fresh_device.status.update(
+                self.snapshot_reported_status.get(device_id, {})
+            )
+            if self._replace_device_in_place(snapshot_device, fresh_device):
+                structure_changed = True
+            self.virtual_state_handler.apply_init_virtual_states(snapshot_device)
+            self.multi_device_listener.update_device(snapshot_device)
+        self.snapshot_reported_status = {}
+
+        await XTEventLoopProtector.execute_out_of_event_loop_and_return(
+            self.refresh_mq
+        )
+        await self.device_snapshot.async_save()
+        if structure_changed:
+            # New, removed or redefined devices need their entities to be rebuilt
+            LOGGER.info(
+                f"Devices of {self.config_entry.title} changed since the last run, reloading"
+            )
+            self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+
+    def _replace_device_in_place(
+        self, device: XTDevice, fresh_device: XTDevice
+    ) -> bool:
+        # The entities keep a reference to device, it takes the fresh values
+        # and replaces fresh_device in all the device maps.
+        # Returns whether the entities of the device need to be rebuilt
+        structure_changed = (
+            device.category != fresh_device.category
+            or device.function.keys() != fresh_device.function.keys()
+            or device.status_range.keys() != fresh_device.status_range.keys()
+            or device.local_strategy.keys() != fresh_device.local_strategy.keys()
+        )
+        # The entities may read the device meanwhile, the attributes are never
+        # missing (the dict is written directly to skip the __setattr__ sync)
+        fresh_attributes = dict(vars(fresh_device))
+        fresh_attributes["device_preference"] = (
+            device.device_preference | fresh_device.device_preference
+        )
+        attributes = vars(device)
+        attributes.update(fresh_attributes)
+        for key in [key for key in attributes if key not in fresh_attributes]:
+            attributes.pop(key, None)
+        for device_map in [self.master_device_map, *self.__get_available_device_maps()]:
+            if device_map.get(device.id) is fresh_device:
+                device_map[device.id] = device
+        return structure_changed
+
+    def refresh_devices(self, device_ids: list[str]):
+        # Refreshes only the given devices from the cloud, the merging, fixes
+        # and alignment are not run for the other devices
+        device_ids = list(dict.fromkeys(device_ids))
+        if not device_ids:
+            return None
+        for device_id in device_ids:
+            # A known device bound again may have a new firmware
+            self.invalidate_product_schemas(device_id)
+        for account in self.accounts.values():
+            account.refresh_device_cache_by_ids(device_ids)
+
+        added_device_ids: list[str] = []
+        updated_devices: list[XTDevice] = []
+        removed_device_ids: list[str] = []
+        for device_id in device_ids:
+            self.command_route_cache.invalidate_device(device_id)
+            fresh_device = self._convert_account_devices(device_id)
+            if fresh_device is None:
+                if self.master_device_map.pop(device_id, None) is not None:
+                    removed_device_ids.append(device_id)
+                continue
+            self._merge_device_from_multiple_sources(device_id)
+            self._apply_cloud_fixes(fresh_device)
+            device = self.master_device_map.get(device_id)
+            if device is None:
+                self.master_device_map[device_id] = fresh_device
+                device = fresh_device
+                added_device_ids.append(device_id)
+            elif device is not fresh_device:
+                if self._replace_device_in_place(device, fresh_device):
+                    added_device_ids.append(device_id)
+                else:
+                    updated_devices.append(device)
+            else:
+                updated_devices.append(device)
+            self._align_multi_map_device(device)
+            self.virtual_state_handler.apply_init_virtual_states(device)
+
+        for device_id in removed_device_ids:
+            self.multi_device_listener.remove_device(device_id)
+        for device_id in added_device_ids:
+            self.multi_device_listener.add_device_by_id(device_id)
+        for device in updated_devices:
+            self.multi_device_listener.update_device(device)
+
     def _process_pending_messages(self):
-        self.is_ready_for_messages = True
-        for messages in self.pending_messages:
-            self.on_message(messages[0], messages[1])
-        self.pending_messages.clear()
+        # Queued before any live message (on_message waits for the lock), the
+        # per-device order of the messages is kept
+        with self.pending_messages_lock:
+            for source, msg in self.pending_messages.pop_messages():
+                self.multi_mqtt_queue.put(source, msg)
+            self.is_ready_for_messages = True
 
     def update_master_device_map(self):
         for manager in self.accounts.values():
@@ -232,6 +445,21 @@ class MultiManager:  # noqa: F811
                     if device_id not in self.master_device_map:
                         self.master_device_map[device_id] = device_map[device_id]
 
+    def _convert_account_devices(self, device_id: str) -> XTDevice | None:
+        # Same as update_master_device_map for a single device, returns the
+        # device that would be registered in the master device map
+        first_device: XTDevice | None = None
+        for manager in self.accounts.values():
+            for device_map in manager.get_available_device_maps():
+                if device_id not in device_map:
+                    continue
+                device_map[device_id] = manager.convert_to_xt_device(
+                    device_map[device_id], device_map.device_source_priority
+                )
+                if first_device is None:
+                    first_device = device_map[device_id]
+        return first_device
+
     def __get_available_device_maps(self) -> list[XTDeviceMap]:
         return_list: list[XTDeviceMap] = []
         for manager in self.accounts.values():
@@ -242,12 +470,29 @@ class MultiManager:  # noqa: F811
     def _merge_devices_from_multiple_sources(self):
         # Merge the device function, status_range and status between managers
         for device in self.device_map.values():
-            to_be_merged: list[XTDevice] = []
-            devices = self.__get_devices_from_device_id(device.id)
-            for current_device in devices:
-                for prev_device in to_be_merged:
-                    XTMergingManager.merge_devices(prev_device, current_device, self)
-                to_be_merged.append(current_device)
+            self._merge_device_from_multiple_sources(device.id)
+
+    def _merge_device_from_multiple_sources(self, device_id: str):
+        to_be_merged: list[XTDevice] = []
+        devices = self.__get_devices_from_device_id(device_id)
+        for current_device in devices:
+            for prev_device in to_be_merged:
+                XTMergingManager.merge_devices(prev_device, current_device, self)
+            to_be_merged.append(current_device)
+
+    def _apply_cloud_fixes(self, device: XTDevice):
+        # Applied twice because some parts at the end of apply_fix would change values of previous calls
+        with self.startup_tracer.span(
+            f"cloud_fixes {device.id}",
+            XTStartupTracer.CATEGORY_CLOUD_FIX,
+            device_id=device.id,
+        ):
+            CloudFixes.apply_fixes(device, self)
+            CloudFixes.apply_fixes(device, self)
+
+        # Don't allow changes to DPCodes after the global initialization
+        device.force_compatibility = True
+        device.rebuild_dpcode_index()
 
     def _enable_multi_map_device_alignment(self):
         for device_map in self.__get_available_device_maps():
@@ -256,12 +501,16 @@ class MultiManager:  # noqa: F811
         self._align_multi_map_devices()
 
     def _align_multi_map_devices(self):
-        # Refresh all master device variables with themselves to trigger alignment
         for device in self.device_map.values():
-            for key, value in vars(device).items():
-                setattr(device, key, value)
+            self._align_multi_map_device(device)
+
+    def _align_multi_map_device(self, device: XTDevice):
+        # Refresh all master device variables with themselves to trigger alignment
+        for key, value in list(vars(device).items()):
+            setattr(device, key, value)
 
     def unload(self):
+        self.command_dispatcher.stop()
         for manager in self.accounts.values():
             manager.unload()
 
@@ -286,24 +535,10 @@ class MultiManager:  # noqa: F811
             and device.status_range[code].dp_id != 0
         ):
             return device.status_range[code].dp_id
-        for dpId in device.local_strategy:
-            if device.local_strategy[dpId]["status_code"] == code:
-                return dpId
-            if (
-                "status_code_alias" in device.local_strategy[dpId]
-                and code in device.local_strategy[dpId]["status_code_alias"]
-            ):
-                return dpId
-            elif "status_code_alias" not in device.local_strategy[dpId]:
-                LOGGER.warning(
-                    f"Device {device.name} ({device.id}) has no status_code_alias dict for dpId {dpId}, please contact the developer about this"
-                )
-        return None
+        return device.get_dpcode_index().code_to_dpid.get(code)
 
     def _read_code_from_dpId(self, dpId: int, device: XTDevice) -> str | None:
-        if dp_id_item := device.local_strategy.get(dpId, None):
-            return dp_id_item["status_code"]
-        return None
+        return device.get_dpcode_index().dpid_to_code.get(dpId)
 
     def __get_devices_from_device_id(self, device_id: str) -> list[XTDevice]:
         return_list = []
@@ -363,28 +598,16 @@ class MultiManager:  # noqa: F811
             return None, None, None, False
         return code, dpId, value, True
 
-    def convert_device_report_status_list(
-        self, device_id: str, status_in: list, source: str
-    ) -> list[dict[str, Any]]:
-        status = copy.deepcopy(status_in)
-        for item in status:
-            if "t" in item and source in [MESSAGE_SOURCE_TUYA_SHARING]:
-                item["t"] = int(item["t"] / 1000)  # Convert from ms to s
-            code, dpId, value, result_ok = self._read_code_dpid_value_from_state(
-                device_id, item
-            )
-            if result_ok:
-                item["code"] = code
-                item["dpId"] = dpId
-                item["value"] = value
-            else:
-                pass
-        return status
-
     def on_message(self, source: str, msg: dict):
+        # Called from the MQTT threads, only queue the message there
         if not self.is_ready_for_messages:
-            self.pending_messages.append((source, msg))
-            return
+            with self.pending_messages_lock:
+                if not self.is_ready_for_messages:
+                    self.pending_messages.append(source, msg)
+                    return
+        self.multi_mqtt_queue.put(source, msg)
+
+    def process_message(self, source: str, msg: dict):
         dev_id = self._get_device_id_from_message(msg)
         if not dev_id:
             return
@@ -406,13 +629,78 @@ class MultiManager:  # noqa: F811
             )
             # self.device_watcher.report_message(dev_id, f"on_message ({source}) status list => {status_list}")
 
+            # Drop what was already received from another source
+            new_status_list = self.message_deduplicator.filter_status_list(
+                dev_id, source, status_list
+            )
+            if not new_status_list:
+                return
+            if new_status_list is not status_list:
+                new_message = dict(new_message)
+                new_message["data"] = dict(new_message.get("data", {}))
+                new_message["data"]["status"] = new_status_list
+
+        if self.loaded_from_snapshot:
+            self._process_snapshot_message(source, dev_id, new_message)
+            return
+
         if source in self.accounts:
             self.accounts[source].on_message(new_message)
 
+    def _process_snapshot_message(self, source: str, dev_id: str, msg: dict):
+        # The accounts don't know the snapshot devices, their reports are
+        # applied here and the other messages wait for the cloud refresh
+        status_list = self._get_status_list_from_message(msg)
+        if status_list is None:
+            with self.pending_messages_lock:
+                if self.loaded_from_snapshot:
+                    self.pending_messages.append(source, msg)
+                    return
+            self.on_message(source, msg)
+            return
+        device = self.master_device_map.get(dev_id)
+        if device is None:
+            return
+        reported_status = self.snapshot_reported_status.setdefault(dev_id, {})
+
+        def apply_status(status_new: list[dict[str, Any]]):
+            updated_status_properties: list[str] = []
+            for item in status_new:
+                if "code" in item and "value" in item:
+                    device.status[item["code"]] = item["value"]
+                    reported_status[item["code"]] = item["value"]
+                    updated_status_properties.append(item["code"])
+            if updated_status_properties:
+                self.multi_device_listener.update_device(
+                    device, updated_status_properties
+                )
+
+        self.status_report_pipeline.process(device, status_list, source, apply_status)
+
+    def invalidate_product_schemas(self, device_id: str):
+        if device := self.master_device_map.get(device_id):
+            self.product_schema_cache.invalidate_product(device.product_id)
+
     def add_device_by_id(self, device_id: str):
-        for account in self.accounts.values():
-            account.add_device_by_id(device_id)
-        self.update_master_device_map()
+        # wait for es sync
+        time.sleep(XT_ADD_DEVICE_SYNC_DELAY)
+        self.refresh_devices([device_id])
+
+    def schedule_add_device_by_id(self, device_id: str):
+        # Called from the MQ workers, the wait and the refresh must not hold them
+        self.hass.loop.call_soon_threadsafe(
+            self.hass.loop.call_later,
+            XT_ADD_DEVICE_SYNC_DELAY,
+            XTExecutorService.submit,
+            self._refresh_added_device,
+            device_id,
+        )
+
+    def _refresh_added_device(self, device_id: str):
+        try:
+            self.refresh_devices([device_id])
+        except Exception as e:
+            LOGGER.error(f"Adding device {device_id} failed: {e}")
 
     def _get_device_id_from_message(self, msg: dict) -> str | None:
         protocol = msg.get("protocol", 0)
@@ -453,85 +741,152 @@ class MultiManager:  # noqa: F811
         return return_list
 
     def send_commands(self, device_id: str, commands: list[dict[str, Any]]) -> bool:
+        results = self.send_commands_with_results(device_id, commands)
+        if not results:
+            return False
+        return results[-1]
+
+    def send_commands_with_results(
+        self, device_id: str, commands: list[dict[str, Any]]
+    ) -> list[bool]:
+        # One result per command, in the order of the commands
         virtual_function_commands: list[dict[str, Any]] = []
         regular_commands: list[dict[str, Any]] = []
         if device := self.device_map.get(device_id, None):
-            virtual_function_list = (
-                self.virtual_function_handler.get_category_virtual_functions(
-                    device.category
-                )
+            command_routes = self.virtual_function_handler.get_category_command_routes(
+                device.category
             )
-            for command in commands:
-                command_code = command["code"]
-                command_value = command["value"]
-                vf_found = False
-                for virtual_function in virtual_function_list:
-                    if (
-                        command_code == virtual_function.key
-                        or command_code in virtual_function.vf_reset_state
-                    ):
-                        command_dict = {
-                            "code": command_code,
-                            "value": command_value,
-                            "virtual_function": virtual_function,
-                        }
-                        virtual_function_commands.append(command_dict)
-                        vf_found = True
-                        break
-                if not vf_found:
-                    regular_commands.append(command)
+            if not command_routes:
+                regular_commands = commands
+            else:
+                for command in commands:
+                    if virtual_function := command_routes.get(command["code"]):
+                        virtual_function_commands.append(
+                            {
+                                "code": command["code"],
+                                "value": command["value"],
+                                "virtual_function": virtual_function,
+                            }
+                        )
+                    else:
+                        regular_commands.append(command)
         else:
-            return False
+            return [False] * len(commands)
 
         if virtual_function_commands:
             self.virtual_function_handler.process_virtual_function(
                 device_id, virtual_function_commands
             )
-            return True
-
-        last_command_result: bool = False
-        if regular_commands:
-            for regular_command in regular_commands:
-                for account in self.accounts.values():
-                    if last_command_result := account.send_command(
-                        device_id, regular_command, reverse_filters=False
+            return [True] * len(commands)
+
+        if not regular_commands:
+            return [False] * len(commands)
+        return self.command_aggregator.send_commands(device, regular_commands)
+
+    def _send_regular_commands(
+        self, device: XTDevice, commands: list[dict[str, Any]]
+    ) -> list[bool]:
+        # The commands are sent in their order, consecutive commands sharing a
+        # learned route are sent in a single request
+        results: list[bool] = [False] * len(commands)
+        routes: list[MultiCommandRoute | None] = [
+            self._get_command_route(device, command) for command in commands
+        ]
+        index = 0
+        while index < len(commands):
+            route = routes[index]
+            if route is None:
+                results[index] = self._send_command_searching_route(
+                    device, commands[index]
+                )
+                index += 1
+                continue
+            group: list[tuple[int, dict[str, Any]]] = []
+            while index < len(commands):
+                next_route = routes[index]
+                if next_route is None or (
+                    next_route.account_name,
+                    next_route.reverse_filters,
+                    next_route.api_type,
+                ) != (route.account_name, route.reverse_filters, route.api_type):
+                    break
+                routed_command = commands[index]
+                if next_route.code != routed_command["code"]:
+                    routed_command = {
+                        "code": next_route.code,
+                        "value": routed_command.get("value"),
+                    }
+                group.append((index, routed_command))
+                index += 1
+
+            failed_commands: list[dict[str, Any]] = [
+                routed_command for _, routed_command in group
+            ]
+            if account := self.accounts.get(route.account_name):
+                failed_commands = account.send_commands_using_api(
+                    device.id,
+                    failed_commands,
+                    route.reverse_filters,
+                    route.api_type,
+                )
+            failed_command_ids = {id(command) for command in failed_commands}
+            for group_index, routed_command in group:
+                if id(routed_command) in failed_command_ids:
+                    # Then the full search for the commands without a working route
+                    self.command_route_cache.invalidate_route(
+                        device.id, commands[group_index]["code"]
+                    )
+                    results[group_index] = self._send_command_searching_route(
+                        device, commands[group_index]
+                    )
+                else:
+                    self.command_route_cache.register_hit()
+                    results[group_index] = True
+        return results
+
+    def _get_command_route(
+        self, device: XTDevice, command: dict[str, Any]
+    ) -> MultiCommandRoute | None:
+        if code := command.get("code", None):
+            return self.command_route_cache.get_route(device.id, code)
+        return None
+
+    def _send_command_searching_route(
+        self, device: XTDevice, command: dict[str, Any]
+    ) -> bool:
+        route = self._search_command_route(device, command)
+        if route is None:
+            return False
+        if code := command.get("code", None):
+            self.command_route_cache.register_route(device.id, code, route)
+        return True
+
+    def _search_command_route(
+        self, device: XTDevice, command: dict[str, Any]
+    ) -> MultiCommandRoute | None:
+        # Try the regular APIs, then the other APIs, then the command aliases
+        command_list: list[dict[str, Any]] = [command]
+        if code := command.get("code", None):
+            for alias in device.get_status_code_aliases(code):
+                command_list.append(
+                    {
+                        "code": alias,
+                        "value": command["value"],
+                    }
+                )
+        for current_command in command_list:
+            for reverse_filters in (False, True):
+                for account_name, account in self.accounts.items():
+                    if api_type := account.send_command_using_api(
+                        device.id, current_command, reverse_filters=reverse_filters
                     ):
-                        break
-
-                # If the command failed, try using the other APIs
-                if last_command_result is False:
-                    for account in self.accounts.values():
-                        if last_command_result := account.send_command(
-                            device_id, regular_command, reverse_filters=True
-                        ):
-                            break
-
-                # If it still didn't work, try sending the command aliases if they exist
-                if last_command_result is False:
-                    alias_command: list[dict[str, Any]] = []
-                    if code := regular_command.get("code", None):
-                        for alias in device.get_status_code_aliases(code):
-                            alias_command.append(
-                                {
-                                    "code": alias,
-                                    "value": regular_command["value"],
-                                }
-                            )
-                    for command in alias_command:
-                        last_command_result = False
-                        for account in self.accounts.values():
-                            if last_command_result := account.send_command(
-                                device_id, command, reverse_filters=False
-                            ):
-                                break
-                        for account in self.accounts.values():
-                            if last_command_result := account.send_command(
-                                device_id, command, reverse_filters=True
-                            ):
-                                break
-                        if last_command_result is True:
-                            break
-        return last_command_result
+                        return MultiCommandRoute(
+                            account_name,
+                            reverse_filters,
+                            current_command.get("code", ""),
+                            api_type,
+                        )
+        return None
 
     def get_device_stream_allocate(
         self, device_id: str, stream_type: Literal["flv", "hls", "rtmp", "rtsp"]
@@ -29,6 +29,7 @@ class CloudFixes:
             #     device=device,
             # )
             pass
+        device.invalidate_dpcode_index()
         CloudFixes._unify_data_types(device)
         CloudFixes._unify_added_attributes(device)
         CloudFixes._map_dpid_to_codes(device)
@@ -985,6 +986,7 @@ class CloudFixes:
                     if status_code not in status_formats_dict:
                         status_formats_dict[status_code] = "$"
                     config_item["statusFormat"] = json.dumps(status_formats_dict)
+        device.invalidate_dpcode_index()
 
     @staticmethod
     def _remove_status_that_are_local_strategy_aliases(device: XTDevice):
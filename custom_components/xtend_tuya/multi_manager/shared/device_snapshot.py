@@ -0,0 +1,116 @@
+from __future__ import annotations
+from dataclasses import asdict
+from typing import Any
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from ...const import (
+    DOMAIN,
+    LOGGER,
+)
+from ...ha_tuya_integration.tuya_integration_imports import (
+    TuyaDPType,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
+
+
+class XTDeviceSnapshot:
+    STORAGE_VERSION = 1
+
+    # Runtime only attributes, device_preference holds entities and API objects
+    FIELDS_NOT_STORED: list[str] = [
+        "device_map",
+        "original_device",
+        "dpcode_index",
+        "device_preference",
+    ]
+
+    def __init__(self, multi_manager: mm.MultiManager) -> None:
+        self.multi_manager = multi_manager
+        self.store = XTDeviceSnapshot.get_store(
+            multi_manager.hass, multi_manager.config_entry.entry_id
+        )
+
+        # Account name -> ids of its devices, the entity signals are sent by
+        # the accounts owning the device
+        self.account_device_ids: dict[str, list[str]] = {}
+
+    @staticmethod
+    def get_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+        return Store(
+            hass,
+            XTDeviceSnapshot.STORAGE_VERSION,
+            f"{DOMAIN}.device_snapshot.{entry_id}",
+        )
+
+    @staticmethod
+    def serialize_device(device: shared.XTDevice) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        for key, value in vars(device).items():
+            if key in XTDeviceSnapshot.FIELDS_NOT_STORED:
+                continue
+            match key:
+                case "function" | "status_range":
+                    data[key] = {code: asdict(item) for code, item in value.items()}
+                case "local_strategy":
+                    data[key] = {str(dpId): item for dpId, item in value.items()}
+                case "status":
+                    data[key] = dict(value)
+                case _:
+                    data[key] = value
+        return data
+
+    @staticmethod
+    def deserialize_device(data: dict[str, Any]) -> shared.XTDevice:
+        data = dict(data)
+        function = data.pop("function", {})
+        status_range = data.pop("status_range", {})
+        local_strategy = data.pop("local_strategy", {})
+        device = shared.XTDevice(**data)
+        device.function = {
+            code: shared.XTDeviceFunction(
+                **(item | {"type": TuyaDPType.try_parse(item.get("type"))})
+            )
+            for code, item in function.items()
+        }
+        device.status_range = {
+            code: shared.XTDeviceStatusRange(
+                **(item | {"type": TuyaDPType.try_parse(item.get("type"))})
+            )
+            for code, item in status_range.items()
+        }
+        device.local_strategy = {
+            int(dpId): item for dpId, item in local_strategy.items()
+        }
+        return device
+
+    async def async_load(self) -> list[shared.XTDevice] | None:
+        try:
+            data = await self.store.async_load()
+            if not data or not data.get("devices"):
+                return None
+            self.account_device_ids = data.get("account_device_ids", {})
+            return [
+                XTDeviceSnapshot.deserialize_device(device_data)
+                for device_data in data["devices"]
+            ]
+        except Exception as e:
+            LOGGER.warning(f"Could not load the device snapshot, ignoring it: {e}")
+            return None
+
+    async def async_save(self) -> None:
+        try:
+            await self.store.async_save(
+                {
+                    "devices": [
+                        XTDeviceSnapshot.serialize_device(device)
+                        for device in self.multi_manager.device_map.values()
+                    ],
+                    "account_device_ids": {
+                        account_name: account.get_device_ids()
+                        for account_name, account in self.multi_manager.accounts.items()
+                    },
+                }
+            )
+        except Exception as e:
+            LOGGER.warning(f"Could not save the device snapshot: {e}")
@@ -12,11 +12,15 @@ from ..shared_classes import (
     XTConfigEntry,
     XTDeviceMap,
 )
+from ..threading import (
+    XTEventLoopProtector,
+)
 import custom_components.xtend_tuya.multi_manager.multi_manager as mm
 import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
 from ....const import (
     DOMAIN,
     LOGGER,
+    XTCommandApiType,
     XTDeviceSourcePriority,
     XTIRHubInformation,
     XTIRRemoteInformation,
@@ -35,9 +39,45 @@ class XTDeviceManagerAPIInterface(ABC):
     ) -> dict[str, Any] | None:
         pass
 
+    async def async_call_api(
+        self, method: str, url: str, payload: str | None
+    ) -> dict[str, Any] | None:
+        return await XTEventLoopProtector.execute_out_of_event_loop_and_return(
+            self.call_api, method, url, payload
+        )
+
     def send_command(self, device_id: str, command: dict[str, Any], reverse_filters: bool = False) -> bool:
         return False
 
+    def send_command_using_api(
+        self,
+        device_id: str,
+        command: dict[str, Any],
+        reverse_filters: bool = False,
+        api_type: XTCommandApiType | None = None,
+    ) -> XTCommandApiType | None:
+        # Returns the API that accepted the command, None if it failed
+        if self.send_command(device_id, command, reverse_filters):
+            return XTCommandApiType.DEFAULT
+        return None
+
+    def send_commands_using_api(
+        self,
+        device_id: str,
+        commands: list[dict[str, Any]],
+        reverse_filters: bool,
+        api_type: XTCommandApiType,
+    ) -> list[dict[str, Any]]:
+        # Returns the commands that failed
+        return [
+            command
+            for command in commands
+            if self.send_command_using_api(
+                device_id, command, reverse_filters, api_type
+            )
+            is None
+        ]
+
     @abstractmethod
     def query_scenes(self) -> list:
         pass
@@ -207,6 +247,17 @@ class XTDeviceManagerDeviceManagementInterface(ABC):
     def add_device_by_id(self, device_id: str):
         return None
 
+    def refresh_device_cache_by_ids(self, device_ids: list[str]):
+        # Fetch these devices in the account device maps without notifying the listeners
+        return None
+
+    def get_device_ids(self) -> list[str]:
+        return []
+
+    def restore_device_ids(self, device_ids: list[str]):
+        # Devices of the account at the last run, used until update_device_cache
+        return None
+
 
 class XTDeviceManagerMQTTManagementInterface(ABC):
     def on_mqtt_stop(self):
@@ -235,6 +286,9 @@ class XTDeviceManagerMultiManagerManagementInterface(ABC):
     def unload(self):
         pass
 
+    def get_statistics(self) -> dict[str, Any]:
+        return {}
+
     @abstractmethod
     def get_device_registry_identifiers(self) -> list:
         return []
@@ -96,6 +96,8 @@ class XTMergingManager:
         lower_priority.function = higher_priority.function
         lower_priority.status = higher_priority.status
         lower_priority.local_strategy = higher_priority.local_strategy
+        higher_priority.invalidate_dpcode_index()
+        lower_priority.invalidate_dpcode_index()
         # if multi_manager:
         #    multi_manager.device_watcher.report_message(device1.id, f"Merged into {device1}", device1)
 
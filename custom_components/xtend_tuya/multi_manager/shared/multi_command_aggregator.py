@@ -0,0 +1,115 @@
+from __future__ import annotations
+import threading
+from typing import Any
+from ...const import (
+    LOGGER,
+    XT_COMMAND_BATCHING,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
+
+
+class MultiCommandBatch:
+    def __init__(self) -> None:
+        self.commands: list[dict[str, Any]] = []
+        self.codes: set[str] = set()
+        self.results: list[bool] = []
+        self.is_sending: bool = False
+        self.event = threading.Event()
+
+    def can_add_commands(self, commands: list[dict[str, Any]]) -> bool:
+        # A DP is only sent once per batch, the commands of several callers
+        # for the same DP are sent in successive batches
+        if self.is_sending:
+            return False
+        return not any(command.get("code") in self.codes for command in commands)
+
+    def add_commands(self, commands: list[dict[str, Any]]) -> int:
+        offset = len(self.commands)
+        self.commands.extend(commands)
+        self.codes.update(
+            command["code"] for command in commands if command.get("code")
+        )
+        return offset
+
+
+class MultiCommandAggregator:
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager,
+        batching: bool = XT_COMMAND_BATCHING,
+    ) -> None:
+        self.multi_manager = multi_manager
+        self.batching = batching
+        self.lock = threading.Lock()
+
+        # device_id -> batches in the order they are sent, the first one is
+        # being sent and the others wait for the one before them
+        self.batches: dict[str, list[MultiCommandBatch]] = {}
+
+        self.batch_count: int = 0
+        self.command_count: int = 0
+        self.joined_count: int = 0
+
+    def send_commands(
+        self, device: shared.XTDevice, commands: list[dict[str, Any]]
+    ) -> list[bool]:
+        # Sent right away when nothing is sent to the device, otherwise the
+        # commands join the next batch, which is sent once the previous one
+        # is done. The commands keep the order they were received in
+        if not self.batching:
+            return self._send_batch(device, commands)
+        previous_batch: MultiCommandBatch | None = None
+        with self.lock:
+            device_batches = self.batches.setdefault(device.id, [])
+            if device_batches and device_batches[-1].can_add_commands(commands):
+                batch = device_batches[-1]
+                is_leader = False
+                self.joined_count += len(commands)
+            else:
+                if device_batches:
+                    previous_batch = device_batches[-1]
+                batch = MultiCommandBatch()
+                device_batches.append(batch)
+                is_leader = True
+            offset = batch.add_commands(commands)
+
+        if is_leader:
+            try:
+                if previous_batch is not None:
+                    previous_batch.event.wait()
+                with self.lock:
+                    batch.is_sending = True
+                batch.results = self._send_batch(device, batch.commands)
+            except Exception as e:
+                LOGGER.error(f"Sending commands to {device.id} failed: {e}", exc_info=True)
+            finally:
+                with self.lock:
+                    device_batches.remove(batch)
+                    if not device_batches:
+                        self.batches.pop(device.id, None)
+                batch.event.set()
+        else:
+            batch.event.wait()
+
+        results = batch.results[offset : offset + len(commands)]
+        if len(results) != len(commands):
+            return [False] * len(commands)
+        return results
+
+    def _send_batch(
+        self, device: shared.XTDevice, commands: list[dict[str, Any]]
+    ) -> list[bool]:
+        results = self.multi_manager._send_regular_commands(device, commands)
+        with self.lock:
+            self.batch_count += 1
+            self.command_count += len(commands)
+        return results
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "batches": self.batch_count,
+                "commands": self.command_count,
+                "joined": self.joined_count,
+            }
@@ -0,0 +1,233 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from typing import Any
+from ...const import (
+    DOMAIN,
+    LOGGER,
+    XT_COMMAND_CONFIRMATION_TIMEOUT,
+    XT_COMMAND_OPTIMISTIC_UPDATE,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
+import custom_components.xtend_tuya.multi_manager.shared.status_report_pipeline as srp
+
+EVENT_COMMAND_NOT_CONFIRMED = f"{DOMAIN}_command_not_confirmed"
+
+
+class MultiPendingCommand:
+    def __init__(
+        self,
+        device: shared.XTDevice,
+        code: str,
+        value: Any,
+        previous_value: Any,
+        index: int,
+    ) -> None:
+        self.device = device
+        self.code = code
+        self.value = value
+        self.previous_value = previous_value
+
+        # Position of the command in the sent commands (for its result)
+        self.index = index
+        self.is_optimistic: bool = False
+        self.send_time: float = time.monotonic()
+        self.timeout_handle: asyncio.TimerHandle | None = None
+
+
+class MultiCommandDispatcher:
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager,
+        optimistic_update: bool = XT_COMMAND_OPTIMISTIC_UPDATE,
+        confirmation_timeout: float = XT_COMMAND_CONFIRMATION_TIMEOUT,
+    ) -> None:
+        self.multi_manager = multi_manager
+        self.optimistic_update = optimistic_update
+        self.confirmation_timeout = confirmation_timeout
+        self.lock = threading.Lock()
+
+        # (device_id, code) -> command waiting for its report
+        self.pending_commands: dict[tuple[str, str], MultiPendingCommand] = {}
+        self.ack_latency = srp.XTStatusReportStageStatistics()
+        self.report_latency = srp.XTStatusReportStageStatistics()
+        self.confirmed_count: int = 0
+        self.corrected_count: int = 0
+        self.failed_count: int = 0
+        self.timed_out_count: int = 0
+
+    async def async_dispatch(
+        self, device: shared.XTDevice, commands: list[dict[str, Any]]
+    ) -> None:
+        # Returns as soon as the commands are queued, the cloud call runs in the background
+        new_commands: list[MultiPendingCommand] = []
+        with self.lock:
+            for index, command in enumerate(commands):
+                code = command.get("code")
+                if code is None or "value" not in command:
+                    continue
+                previous_value = device.status.get(code)
+                if replaced_command := self.pending_commands.pop((device.id, code), None):
+                    # Roll back to the last confirmed value, not to an optimistic one
+                    previous_value = replaced_command.previous_value
+                    if replaced_command.timeout_handle is not None:
+                        replaced_command.timeout_handle.cancel()
+                pending_command = MultiPendingCommand(
+                    device, code, command["value"], previous_value, index
+                )
+                self.pending_commands[(device.id, code)] = pending_command
+                new_commands.append(pending_command)
+
+        if self.optimistic_update:
+            updated_status_properties: list[str] = []
+            for pending_command in new_commands:
+                if pending_command.code in device.status:
+                    device.status[pending_command.code] = pending_command.value
+                    pending_command.is_optimistic = True
+                    updated_status_properties.append(pending_command.code)
+            if updated_status_properties:
+                self.multi_manager.multi_device_listener.update_device(
+                    device, updated_status_properties
+                )
+
+        self.multi_manager.hass.async_create_background_task(
+            self._async_send_commands(device, commands, new_commands),
+            f"{DOMAIN}_send_commands_{device.id}",
+        )
+
+    async def _async_send_commands(
+        self,
+        device: shared.XTDevice,
+        commands: list[dict[str, Any]],
+        new_commands: list[MultiPendingCommand],
+    ) -> None:
+        hass = self.multi_manager.hass
+        try:
+            results = await hass.async_add_executor_job(
+                self.multi_manager.send_commands_with_results, device.id, commands
+            )
+        except Exception as e:
+            LOGGER.error(f"Sending commands {commands} to {device.id} failed: {e}")
+            results = []
+        ack_time = time.monotonic()
+
+        failed_commands: list[MultiPendingCommand] = []
+        with self.lock:
+            for pending_command in new_commands:
+                self.ack_latency.register(ack_time - pending_command.send_time)
+                command_key = (device.id, pending_command.code)
+                if self.pending_commands.get(command_key) is not pending_command:
+                    # Already reported (or replaced by a newer command)
+                    continue
+                if (
+                    pending_command.index < len(results)
+                    and results[pending_command.index]
+                ):
+                    pending_command.timeout_handle = hass.loop.call_later(
+                        self.confirmation_timeout, self._on_timeout, pending_command
+                    )
+                else:
+                    del self.pending_commands[command_key]
+                    self.failed_count += 1
+                    failed_commands.append(pending_command)
+        if failed_commands:
+            self._roll_back(device, failed_commands, "failed")
+
+    def _on_timeout(self, pending_command: MultiPendingCommand) -> None:
+        device = pending_command.device
+        with self.lock:
+            command_key = (device.id, pending_command.code)
+            if self.pending_commands.get(command_key) is not pending_command:
+                return
+            if self.multi_manager.loaded_from_snapshot:
+                # Not all the reports are received before the cloud refresh
+                # (MQ subscriptions), wait for it
+                pending_command.timeout_handle = self.multi_manager.hass.loop.call_later(
+                    self.confirmation_timeout, self._on_timeout, pending_command
+                )
+                return
+            del self.pending_commands[command_key]
+            self.timed_out_count += 1
+        self._roll_back(device, [pending_command], "timeout")
+
+    def _roll_back(
+        self,
+        device: shared.XTDevice,
+        pending_commands: list[MultiPendingCommand],
+        reason: str,
+    ) -> None:
+        updated_status_properties: list[str] = []
+        for pending_command in pending_commands:
+            self.multi_manager.hass.bus.async_fire(
+                EVENT_COMMAND_NOT_CONFIRMED,
+                {
+                    "device_id": device.id,
+                    "code": pending_command.code,
+                    "value": pending_command.value,
+                    "reason": reason,
+                },
+            )
+            # Don't overwrite a value that was reported in the meantime
+            if (
+                pending_command.is_optimistic
+                and device.status.get(pending_command.code) == pending_command.value
+            ):
+                device.status[pending_command.code] = pending_command.previous_value
+                updated_status_properties.append(pending_command.code)
+        if updated_status_properties:
+            LOGGER.debug(
+                f"Commands {updated_status_properties} of {device.id} were not confirmed ({reason}), rolled back"
+            )
+            self.multi_manager.multi_device_listener.update_device(
+                device, updated_status_properties
+            )
+
+    def on_status_report(
+        self, device: shared.XTDevice, status_list: list[dict[str, Any]]
+    ) -> None:
+        # Called from the MQTT workers once the report has been applied
+        if not self.pending_commands:
+            return
+        report_time = time.monotonic()
+        timeout_handles: list[asyncio.TimerHandle] = []
+        with self.lock:
+            for item in status_list:
+                pending_command = self.pending_commands.pop(
+                    (device.id, item.get("code")), None
+                )
+                if pending_command is None:
+                    continue
+                self.report_latency.register(report_time - pending_command.send_time)
+                if item.get("value") == pending_command.value:
+                    self.confirmed_count += 1
+                else:
+                    # The device reported its real value, nothing to roll back
+                    self.corrected_count += 1
+                if pending_command.timeout_handle is not None:
+                    timeout_handles.append(pending_command.timeout_handle)
+        for timeout_handle in timeout_handles:
+            self.multi_manager.hass.loop.call_soon_threadsafe(timeout_handle.cancel)
+
+    def stop(self) -> None:
+        with self.lock:
+            pending_commands = list(self.pending_commands.values())
+            self.pending_commands.clear()
+        for pending_command in pending_commands:
+            if pending_command.timeout_handle is not None:
+                self.multi_manager.hass.loop.call_soon_threadsafe(
+                    pending_command.timeout_handle.cancel
+                )
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "pending": len(self.pending_commands),
+                "confirmed": self.confirmed_count,
+                "corrected": self.corrected_count,
+                "failed": self.failed_count,
+                "timed_out": self.timed_out_count,
+                "send_to_ack": self.ack_latency.as_dict(),
+                "send_to_report": self.report_latency.as_dict(),
+            }
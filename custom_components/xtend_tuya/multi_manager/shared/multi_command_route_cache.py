@@ -0,0 +1,62 @@
+from __future__ import annotations
+import threading
+from typing import Any, NamedTuple
+from ...const import (
+    XTCommandApiType,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+
+
+class MultiCommandRoute(NamedTuple):
+    account_name: str
+    reverse_filters: bool
+    code: str
+    api_type: XTCommandApiType
+
+
+class MultiCommandRouteCache:
+    def __init__(self, multi_manager: mm.MultiManager) -> None:
+        self.multi_manager = multi_manager
+        self.lock = threading.Lock()
+
+        # (device_id, command code) -> last route that accepted the command
+        self.routes: dict[tuple[str, str], MultiCommandRoute] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.failed_routes: int = 0
+
+    def get_route(self, device_id: str, code: str) -> MultiCommandRoute | None:
+        with self.lock:
+            route = self.routes.get((device_id, code))
+            if route is None:
+                self.misses += 1
+            return route
+
+    def register_route(self, device_id: str, code: str, route: MultiCommandRoute):
+        with self.lock:
+            self.routes[(device_id, code)] = route
+
+    def register_hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def invalidate_route(self, device_id: str, code: str):
+        with self.lock:
+            if self.routes.pop((device_id, code), None) is not None:
+                self.failed_routes += 1
+
+    def invalidate_device(self, device_id: str):
+        with self.lock:
+            for route_key in [
+                route_key for route_key in self.routes if route_key[0] == device_id
+            ]:
+                del self.routes[route_key]
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "failed_routes": self.failed_routes,
+                "size": len(self.routes),
+            }
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from ...const import (
+    XT_DEDUPLICATION_CACHE_SIZE,
+    XT_DEDUPLICATION_HORIZON,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
+
+
+class MultiMessageDeduplicator:
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager,
+        cache_size: int = XT_DEDUPLICATION_CACHE_SIZE,
+        horizon: float = XT_DEDUPLICATION_HORIZON,
+    ) -> None:
+        self.multi_manager = multi_manager
+        self.cache_size = cache_size
+        self.horizon = horizon
+        self.lock = threading.Lock()
+
+        # (dev_id, dpId or code, value, t) -> (source, reception time)
+        self.seen_items: OrderedDict[tuple, tuple[str, float]] = OrderedDict()
+        self.suppressed_items: dict[str, int] = {}
+        self.suppressed_messages: dict[str, int] = {}
+
+    def filter_status_list(
+        self, dev_id: str, source: str, status_list: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        # Returns status_list itself when nothing was suppressed
+        device = self.multi_manager.device_map.get(dev_id, None)
+        if not device:
+            return status_list
+        now = time.monotonic()
+        kept_items: list[dict[str, Any]] = []
+        with self.lock:
+            for item in status_list:
+                item_key = self._get_item_key(dev_id, device, item)
+                if item_key is None:
+                    kept_items.append(item)
+                    continue
+                seen_item = self.seen_items.get(item_key)
+                if (
+                    seen_item is not None
+                    and seen_item[0] != source
+                    and now - seen_item[1] <= self.horizon
+                ):
+                    self.suppressed_items[source] = (
+                        self.suppressed_items.get(source, 0) + 1
+                    )
+                    continue
+                self.seen_items[item_key] = (source, now)
+                self.seen_items.move_to_end(item_key)
+                if len(self.seen_items) > self.cache_size:
+                    self.seen_items.popitem(last=False)
+                kept_items.append(item)
+            if not kept_items:
+                self.suppressed_messages[source] = (
+                    self.suppressed_messages.get(source, 0) + 1
+                )
+        if len(kept_items) == len(status_list):
+            return status_list
+        return kept_items
+
+    def _get_item_key(
+        self, dev_id: str, device: shared.XTDevice, item: dict[str, Any]
+    ) -> tuple | None:
+        # Without a timestamp two identical values can be two real reports
+        if (t := item.get("t")) is None:
+            return None
+        code, dpId, value, result_ok = (
+            self.multi_manager._read_code_dpid_value_from_state(
+                dev_id, item, False, False
+            )
+        )
+        if not result_ok or (code is None and dpId is None):
+            return None
+
+        # Codes with a virtual state are arbitrated by the MultiSourceHandler
+        if code in self.multi_manager.virtual_state_handler.get_category_virtual_states_by_key(
+            device.category
+        ):
+            return None
+        if isinstance(t, (int, float)) and t > 100000000000:
+            t = int(t / 1000)  # Sharing timestamps are in ms
+        try:
+            hash(value)
+        except TypeError:
+            value = repr(value)
+        return (dev_id, dpId if dpId is not None else code, value, t)
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "suppressed_items": dict(self.suppressed_items),
+                "suppressed_messages": dict(self.suppressed_messages),
+                "cache_size": len(self.seen_items),
+            }
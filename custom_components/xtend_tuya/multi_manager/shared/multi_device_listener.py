@@ -1,4 +1,5 @@
 from __future__ import annotations
+import threading
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import dispatcher_send
 from homeassistant.helpers import device_registry as dr
@@ -6,22 +7,100 @@ from ...const import (
     LOGGER,
     DOMAIN,
     DOMAIN_ORIG,
+    XT_STATUS_COALESCING_WINDOW,
+    XT_STATUS_COALESCING_CATEGORY_WINDOWS,
+    XT_STATUS_COALESCING_BYPASS_CATEGORIES,
 )
 import custom_components.xtend_tuya.multi_manager.multi_manager as mm
 import custom_components.xtend_tuya.multi_manager.shared.shared_classes as sh
 import custom_components.xtend_tuya.util as util
 
 
+class XTPendingDeviceUpdate:
+    def __init__(self, device: sh.XTDevice) -> None:
+        self.device = device
+        self.updated_status_properties: list[str] = []
+        self.dp_timestamps: dict = {}
+        self.update_count: int = 0
+
+    def add(
+        self,
+        updated_status_properties: list[str],
+        dp_timestamps: dict | None,
+    ) -> None:
+        for status_property in updated_status_properties:
+            if status_property not in self.updated_status_properties:
+                self.updated_status_properties.append(status_property)
+        if dp_timestamps:
+            # Later reports always carry the most recent timestamps
+            self.dp_timestamps.update(dp_timestamps)
+        self.update_count += 1
+
+
 class MultiDeviceListener:
     def __init__(self, hass: HomeAssistant, multi_manager: mm.MultiManager) -> None:
         self.multi_manager = multi_manager
         self.hass = hass
+        self.pending_updates: dict[str, XTPendingDeviceUpdate] = {}
+        self.pending_updates_lock = threading.Lock()
+        self.coalesced_update_count: int = 0
+
+    def get_coalescing_window(self, device: sh.XTDevice) -> float:
+        if device.category in XT_STATUS_COALESCING_BYPASS_CATEGORIES:
+            return 0.0
+        return XT_STATUS_COALESCING_CATEGORY_WINDOWS.get(
+            device.category, XT_STATUS_COALESCING_WINDOW
+        )
 
     def update_device(
         self,
         device: sh.XTDevice,
         updated_status_properties: list[str] | None = None,
         dp_timestamps: dict | None = None,
+    ):
+        window = self.get_coalescing_window(device)
+        if window > 0 and updated_status_properties is not None:
+            with self.pending_updates_lock:
+                if pending_update := self.pending_updates.get(device.id):
+                    pending_update.add(updated_status_properties, dp_timestamps)
+                    self.coalesced_update_count += 1
+                    return
+                pending_update = XTPendingDeviceUpdate(device)
+                pending_update.add(updated_status_properties, dp_timestamps)
+                self.pending_updates[device.id] = pending_update
+            self.hass.loop.call_soon_threadsafe(
+                self.hass.loop.call_later,
+                window,
+                self._flush_pending_update,
+                device.id,
+            )
+            return
+
+        # Immediate update, send what was waiting at the same time
+        with self.pending_updates_lock:
+            pending_update = self.pending_updates.pop(device.id, None)
+        if pending_update is not None and updated_status_properties is not None:
+            pending_update.add(updated_status_properties, dp_timestamps)
+            updated_status_properties = pending_update.updated_status_properties
+            dp_timestamps = pending_update.dp_timestamps or None
+        self._dispatch_device_update(device, updated_status_properties, dp_timestamps)
+
+    def _flush_pending_update(self, device_id: str) -> None:
+        with self.pending_updates_lock:
+            pending_update = self.pending_updates.pop(device_id, None)
+        if pending_update is None:
+            return
+        self._dispatch_device_update(
+            pending_update.device,
+            pending_update.updated_status_properties,
+            pending_update.dp_timestamps or None,
+        )
+
+    def _dispatch_device_update(
+        self,
+        device: sh.XTDevice,
+        updated_status_properties: list[str] | None = None,
+        dp_timestamps: dict | None = None,
     ):
         signal_list: list[str] = []
         for account in self.multi_manager.accounts.values():
@@ -62,6 +141,7 @@ class MultiDeviceListener:
             dispatcher_send(self.hass, signal, [device_id])
 
     def remove_device(self, device_id: str):
+        self.multi_manager.command_route_cache.invalidate_device(device_id)
         device_registry = dr.async_get(self.hass)
         identifiers: set = set()
         account_identifiers: set = set()
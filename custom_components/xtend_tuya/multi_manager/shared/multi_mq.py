@@ -1,11 +1,383 @@
 from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Any
+from ...lib.tuya_iot.device import (
+    PROTOCOL_DEVICE_REPORT,
+)
+from ...const import (
+    LOGGER,
+    XT_MQTT_INGEST_QUEUE_SIZE,
+    XT_MQTT_INGEST_WORKER_COUNT,
+    XT_MQTT_PENDING_BUFFER_SIZE,
+    XT_STATUS_COALESCING_BYPASS_CATEGORIES,
+)
 import custom_components.xtend_tuya.multi_manager.multi_manager as mm
 
 
+class MultiMQTTQueueItem:
+    def __init__(self, source: str, dev_id: str | None, msg: dict) -> None:
+        self.source = source
+        self.dev_id = dev_id
+        self.msg = msg
+        self.enqueue_time: float = time.monotonic()
+
+    def is_device_report(self) -> bool:
+        return self.msg.get("protocol", 0) == PROTOCOL_DEVICE_REPORT
+
+    def coalesce(self, other: MultiMQTTQueueItem) -> bool:
+        # Concatenate the status lists so that no reported value is lost
+        # (summed virtual states rely on every reported item)
+        if (
+            self.source != other.source
+            or self.dev_id != other.dev_id
+            or not self.is_device_report()
+            or not other.is_device_report()
+        ):
+            return False
+        data = self.msg.get("data", {})
+        other_data = other.msg.get("data", {})
+        if "status" not in data or "status" not in other_data:
+            return False
+        new_data = dict(data)
+        new_data["status"] = [*data["status"], *other_data["status"]]
+        new_msg = dict(self.msg)
+        new_msg["data"] = new_data
+        self.msg = new_msg
+        return True
+
+
+class MultiMQTTQueueStatistics:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.enqueued: int = 0
+        self.processed: int = 0
+        self.coalesced: int = 0
+        self.dropped: int = 0
+        self.max_depth: int = 0
+        self.total_latency: float = 0.0
+        self.max_latency: float = 0.0
+
+    def register_processed(self, latency: float) -> None:
+        with self.lock:
+            self.processed += 1
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def as_dict(self, current_depth: int) -> dict[str, Any]:
+        with self.lock:
+            average_latency = 0.0
+            if self.processed > 0:
+                average_latency = self.total_latency / self.processed
+            return {
+                "enqueued": self.enqueued,
+                "processed": self.processed,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "depth": current_depth,
+                "max_depth": self.max_depth,
+                "average_latency": round(average_latency, 6),
+                "max_latency": round(self.max_latency, 6),
+            }
+
+
+class MultiMQTTQueueWorker(threading.Thread):
+    def __init__(self, queue: MultiMQTTQueue, index: int, max_size: int) -> None:
+        super().__init__(name=f"xt_mqtt_ingest_{index}", daemon=True)
+        self.queue = queue
+        self.max_size = max_size
+        self.items: deque[MultiMQTTQueueItem] = deque()
+        self.condition = threading.Condition()
+        self.running = True
+
+    def put(self, item: MultiMQTTQueueItem) -> None:
+        statistics = self.queue.statistics
+        with self.condition:
+            if len(self.items) >= self.max_size and not self._make_room_for(item):
+                return
+            self.items.append(item)
+            with statistics.lock:
+                statistics.enqueued += 1
+                if len(self.items) > statistics.max_depth:
+                    statistics.max_depth = len(self.items)
+            self.condition.notify()
+
+    def _make_room_for(self, item: MultiMQTTQueueItem) -> bool:
+        statistics = self.queue.statistics
+
+        # First try to merge the report in a pending report of the same device
+        for pending_item in reversed(self.items):
+            if pending_item.dev_id == item.dev_id:
+                if pending_item.coalesce(item):
+                    with statistics.lock:
+                        statistics.coalesced += 1
+                    return False
+                # Don't merge across a different message of the same device
+                break
+
+        # Then drop the oldest report of the same device, the reports of the
+        # other devices are never dropped for it
+        for pending_item in self.items:
+            if pending_item.dev_id == item.dev_id and self.queue.is_droppable(
+                pending_item
+            ):
+                self.items.remove(pending_item)
+                self._register_dropped(pending_item)
+                return True
+
+        # The latest report is always kept, the queue goes over its size by at
+        # most one report per device (plus locks, alarms and summed DPs)
+        return True
+
+    def _register_dropped(self, item: MultiMQTTQueueItem) -> None:
+        with self.queue.statistics.lock:
+            self.queue.statistics.dropped += 1
+        LOGGER.debug(f"MQTT ingest queue full, dropped report of device {item.dev_id}")
+
+    def depth(self) -> int:
+        return len(self.items)
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.items.clear()
+            self.condition.notify()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.running and not self.items:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                item = self.items.popleft()
+            self.queue.process_item(item)
+
+
+class MultiMQTTPendingReport:
+    def __init__(self, dev_id: str, source: str, template: dict) -> None:
+        # Last report message (used as template) and latest item per absolute
+        # DP (every item of the summed DPs)
+        self.dev_id = dev_id
+        self.source = source
+        self.template = template
+        self.items: dict[Any, dict] = {}
+
+
+class MultiMQTTPendingBuffer:
+    # Not thread safe, the caller is responsible for the locking
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager,
+        max_size: int = XT_MQTT_PENDING_BUFFER_SIZE,
+    ) -> None:
+        self.multi_manager = multi_manager
+        self.max_size = max_size
+        # Reports and other messages in the order they were received, the
+        # reports of a device are coalesced until another message of the
+        # device is received
+        self.entries: list[MultiMQTTPendingReport | tuple[str, dict]] = []
+
+        # dev_id -> source -> report still receiving the items
+        self.open_reports: dict[str, dict[str, MultiMQTTPendingReport]] = {}
+        self.size: int = 0
+        self.sequence: int = 0
+        self.received: int = 0
+        self.coalesced: int = 0
+        self.overflow: int = 0
+        self.max_reached_size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _has_room(self) -> bool:
+        if self.size >= self.max_size:
+            self.overflow += 1
+            return False
+        return True
+
+    def _register_new_entry(self) -> None:
+        self.size += 1
+        if self.size > self.max_reached_size:
+            self.max_reached_size = self.size
+
+    def append(self, source: str, msg: dict) -> None:
+        self.received += 1
+        dev_id = self.multi_manager._get_device_id_from_message(msg)
+        if not dev_id:
+            # Would be ignored when processed
+            return
+        status_list = self.multi_manager._get_status_list_from_message(msg)
+        if status_list is None:
+            # Other protocols are all kept, the next reports of the device
+            # are replayed after them
+            if self._has_room():
+                self.open_reports.pop(dev_id, None)
+                self.entries.append((source, msg))
+                self._register_new_entry()
+            return
+
+        device_reports = self.open_reports.setdefault(dev_id, {})
+        report = device_reports.get(source)
+        if report is None:
+            report = device_reports[source] = MultiMQTTPendingReport(
+                dev_id, source, msg
+            )
+            self.entries.append(report)
+        report.template = msg
+        report_items = report.items
+        for item in status_list:
+            item_key = self._get_coalescing_key(dev_id, item)
+            if item_key in report_items:
+                # Keep only the latest value of the DP, at the end of the batch
+                report_items.pop(item_key)
+                report_items[item_key] = item
+                self.coalesced += 1
+            elif self._has_room():
+                report_items[item_key] = item
+                self._register_new_entry()
+
+    def _get_coalescing_key(self, dev_id: str, item: dict) -> Any:
+        # Only the DPs reporting absolute values are coalesced, the items of
+        # summed DPs (increments) and of the devices that are not loaded yet
+        # all get a unique key
+        item_key = item.get("dpId", item.get("code"))
+        device = self.multi_manager.device_map.get(dev_id)
+        if (
+            item_key is None
+            or device is None
+            or self.multi_manager.virtual_state_handler.is_summed_in_reporting_payload(
+                device, item
+            )
+        ):
+            self.sequence += 1
+            return ("kept", self.sequence)
+        return item_key
+
+    def pop_messages(self) -> list[tuple[str, dict]]:
+        # In the order they were received, one report per device and source
+        # between the other messages of the device, with the latest value of
+        # each absolute DP and every item of the summed DPs
+        return_list: list[tuple[str, dict]] = []
+        for entry in self.entries:
+            if not isinstance(entry, MultiMQTTPendingReport):
+                return_list.append(entry)
+                continue
+            if not entry.items:
+                continue
+
+            # The devices are loaded now, coalesce the items that were kept
+            status: dict[Any, dict] = {}
+            for item in entry.items.values():
+                item_key = self._get_coalescing_key(entry.dev_id, item)
+                if item_key in status:
+                    status.pop(item_key)
+                    self.coalesced += 1
+                status[item_key] = item
+            message = dict(entry.template)
+            message["data"] = dict(entry.template.get("data", {}))
+            message["data"]["status"] = list(status.values())
+            return_list.append((entry.source, message))
+        self.entries = []
+        self.open_reports = {}
+        self.size = 0
+        return return_list
+
+    def get_statistics(self) -> dict[str, Any]:
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "overflow": self.overflow,
+            "size": self.size,
+            "max_size": self.max_reached_size,
+        }
+
+
 class MultiMQTTQueue:
-    def __init__(self, multi_manager: mm.MultiManager) -> None:
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager,
+        worker_count: int = XT_MQTT_INGEST_WORKER_COUNT,
+        queue_size: int = XT_MQTT_INGEST_QUEUE_SIZE,
+    ) -> None:
         self.multi_manager = multi_manager
+        self.worker_count = worker_count
+        self.queue_size = queue_size
+        self.statistics = MultiMQTTQueueStatistics()
+        self.workers: list[MultiMQTTQueueWorker] = []
+        self.workers_lock = threading.Lock()
+        self.stopped: bool = False
+
+    def _start_workers(self) -> None:
+        with self.workers_lock:
+            if self.workers or self.stopped:
+                return
+            worker_queue_size = max(1, self.queue_size // self.worker_count)
+            for index in range(self.worker_count):
+                worker = MultiMQTTQueueWorker(self, index, worker_queue_size)
+                worker.start()
+                self.workers.append(worker)
+
+    def put(self, source: str, msg: dict) -> None:
+        if self.stopped:
+            return
+        item = MultiMQTTQueueItem(
+            source, self.multi_manager._get_device_id_from_message(msg), msg
+        )
+        if self.worker_count <= 0:
+            with self.statistics.lock:
+                self.statistics.enqueued += 1
+            self.process_item(item)
+            return
+        if not self.workers:
+            self._start_workers()
+
+        # Messages of a device always go to the same worker to keep them in order
+        if workers := self.workers:
+            workers[hash(item.dev_id) % len(workers)].put(item)
+
+    def is_droppable(self, item: MultiMQTTQueueItem) -> bool:
+        # Only the reports of known devices holding absolute values can be dropped
+        if not item.is_device_report() or item.dev_id is None:
+            return False
+        device = self.multi_manager.device_map.get(item.dev_id)
+        if device is None or device.category in XT_STATUS_COALESCING_BYPASS_CATEGORIES:
+            return False
+        status_list = self.multi_manager._get_status_list_from_message(item.msg)
+        if status_list is None:
+            return False
+        virtual_state_handler = self.multi_manager.virtual_state_handler
+        return not any(
+            virtual_state_handler.is_summed_in_reporting_payload(device, status_item)
+            for status_item in status_list
+        )
+
+    def process_item(self, item: MultiMQTTQueueItem) -> None:
+        self.statistics.register_processed(time.monotonic() - item.enqueue_time)
+        try:
+            self.multi_manager.process_message(item.source, item.msg)
+        except Exception as e:
+            LOGGER.error(
+                f"Processing MQTT message from {item.source} failed: {e}",
+                exc_info=True,
+            )
+
+    def get_depth(self) -> int:
+        depth = 0
+        for worker in self.workers:
+            depth += worker.depth()
+        return depth
+
+    def get_statistics(self) -> dict[str, Any]:
+        return self.statistics.as_dict(self.get_depth())
 
     def stop(self) -> None:
         for account in self.multi_manager.accounts.values():
             account.on_mqtt_stop()
+        self.stopped = True
+        with self.workers_lock:
+            for worker in self.workers:
+                worker.stop()
+            self.workers.clear()
@@ -1,7 +1,6 @@
 from __future__ import annotations
-import copy
-from typing import Any
 import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+import custom_components.xtend_tuya.multi_manager.shared.status_report_pipeline as srp
 from ...const import (
     LOGGER,  # noqa: F401
     XTDeviceWatcherCategory,  # noqa: F401
@@ -70,12 +69,12 @@ class MultiSourceHandler:
         if not device:
             return
 
-        virtual_states = (
-            self.multi_manager.virtual_state_handler.get_category_virtual_states(
+        virtual_states_by_key = (
+            self.multi_manager.virtual_state_handler.get_category_virtual_states_by_key(
                 device.category
             )
         )
-        if not virtual_states:
+        if not virtual_states_by_key:
             return
 
         for item in status_in:
@@ -85,65 +84,54 @@ class MultiSourceHandler:
             if not result_ok or code is None:
                 continue
 
-            for virtual_state in virtual_states:
-                if code == virtual_state.key:
-                    self._prepare_structure_for_code(dev_id, code)
-                    self.device_map[dev_id][code].register_source_message(source)
+            for _ in virtual_states_by_key.get(code, ()):
+                self._prepare_structure_for_code(dev_id, code)
+                self.device_map[dev_id][code].register_source_message(source)
 
     def filter_status_list(
-        self, dev_id: str, original_source: str, status_in: list[dict[str, Any]]
-    ) -> list[dict[str, Any]]:
-        status_list = copy.deepcopy(status_in)
+        self,
+        dev_id: str,
+        original_source: str,
+        status_list: list[srp.XTStatusReportItem],
+    ) -> list[srp.XTStatusReportItem]:
         device = self.multi_manager.device_map.get(dev_id, None)
         if not device:
             return status_list
 
         # Only filter for devices that have a VirtualState in their status_list
-        virtual_states = (
-            self.multi_manager.virtual_state_handler.get_category_virtual_states(
+        virtual_states_by_key = (
+            self.multi_manager.virtual_state_handler.get_category_virtual_states_by_key(
                 device.category
             )
         )
-        if not virtual_states:
+        if not virtual_states_by_key:
             return status_list
 
-        i = 0
-        for item in status_in:
-            code, _, _, result_ok = self.multi_manager._read_code_dpid_value_from_state(
-                dev_id, item, False, True
-            )
-            if not result_ok or code is None:
-                i += 1
+        filtered_list: list[srp.XTStatusReportItem] = []
+        for item in status_list:
+            code = item.code
+            if code is None or code not in virtual_states_by_key:
+                filtered_list.append(item)
+                continue
+
+            self._prepare_structure_for_code(dev_id, code)
+            if self._is_allowed_source_for_code(dev_id, code, original_source) is False:
+                continue
+
+            # Only check update time if the source is allowed
+            if (
+                self._is_code_update_time_valid(
+                    dev_id,
+                    code,
+                    item.data.get("t", 0),
+                    original_source,
+                )
+                is False
+            ):
                 continue
+            filtered_list.append(item)
 
-            update_time_valid: bool | None = None
-            for virtual_state in virtual_states:
-                if code == virtual_state.key:
-                    self._prepare_structure_for_code(dev_id, code)
-                    if (
-                        self._is_allowed_source_for_code(dev_id, code, original_source)
-                        is False
-                    ):
-                        status_list.pop(i)
-                        i -= 1
-                        break
-
-                    # Only check update time if the source is allowed
-                    if update_time_valid is None:
-                        #only check update time once per dpcode, otherwise it would always fail
-                        update_time_valid = self._is_code_update_time_valid(
-                            dev_id,
-                            code,
-                            item.get("t", 0),
-                            original_source,
-                        )
-                    if update_time_valid is False:
-                        status_list.pop(i)
-                        i -= 1
-                        break
-            i += 1
-
-        return status_list
+        return filtered_list
 
     def _prepare_structure_for_code(self, dev_id: str, code: str) -> None:
         if dev_id not in self.device_map:
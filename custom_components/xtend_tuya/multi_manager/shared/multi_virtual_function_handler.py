@@ -21,6 +21,15 @@ class XTVirtualFunctionHandler:
         self.descriptors_with_virtual_function = {}
         self.multi_manager = multi_manager
 
+        # Compiled from descriptors_with_virtual_function: command code
+        # (description key or reset state) -> virtual function, per category
+        self.category_virtual_functions: dict[
+            str, tuple[DescriptionVirtualFunction, ...]
+        ] = {}
+        self.category_command_routes: dict[
+            str, dict[str, DescriptionVirtualFunction]
+        ] = {}
+
     def register_device_descriptors(self, name: str, descriptors):
         descriptors_with_vf = {}
         for category in descriptors:
@@ -47,9 +56,43 @@ class XTVirtualFunctionHandler:
 
         if len(descriptors_with_vf) > 0:
             self.descriptors_with_virtual_function[name] = descriptors_with_vf
+            self._compile_category_virtual_functions()
+
+    def _compile_category_virtual_functions(self) -> None:
+        categories: set[str] = set()
+        for descriptor in self.descriptors_with_virtual_function.values():
+            categories.update(descriptor)
+        category_virtual_functions: dict[
+            str, tuple[DescriptionVirtualFunction, ...]
+        ] = {}
+        category_command_routes: dict[str, dict[str, DescriptionVirtualFunction]] = {}
+        for category in categories:
+            virtual_functions = self._build_category_virtual_functions(category)
+            if not virtual_functions:
+                continue
+            command_routes: dict[str, DescriptionVirtualFunction] = {}
+            for virtual_function in virtual_functions:
+                # The first matching virtual function wins, as in a linear scan
+                command_routes.setdefault(virtual_function.key, virtual_function)
+                for reset_state in virtual_function.vf_reset_state:
+                    command_routes.setdefault(reset_state, virtual_function)
+            category_virtual_functions[category] = tuple(virtual_functions)
+            category_command_routes[category] = command_routes
+        self.category_virtual_functions = category_virtual_functions
+        self.category_command_routes = category_command_routes
 
     def get_category_virtual_functions(
         self, category: str
+    ) -> tuple[DescriptionVirtualFunction, ...]:
+        return self.category_virtual_functions.get(category, ())
+
+    def get_category_command_routes(
+        self, category: str
+    ) -> dict[str, DescriptionVirtualFunction]:
+        return self.category_command_routes.get(category, {})
+
+    def _build_category_virtual_functions(
+        self, category: str
     ) -> list[DescriptionVirtualFunction]:
         to_return = []
         for virtual_function in VirtualFunctions:
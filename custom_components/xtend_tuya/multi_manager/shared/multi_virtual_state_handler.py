@@ -8,6 +8,7 @@ from ...const import (
 )
 import custom_components.xtend_tuya.multi_manager.multi_manager as mm
 import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
+import custom_components.xtend_tuya.multi_manager.shared.status_report_pipeline as srp
 
 
 class XTVirtualStateHandler:
@@ -15,6 +16,15 @@ class XTVirtualStateHandler:
         self.descriptors_with_virtual_state = {}
         self.multi_manager = multi_manager
 
+        # Compiled from descriptors_with_virtual_state, categories without
+        # virtual states are not present
+        self.category_virtual_states: dict[
+            str, tuple[DescriptionVirtualState, ...]
+        ] = {}
+        self.category_virtual_states_by_key: dict[
+            str, dict[str, tuple[DescriptionVirtualState, ...]]
+        ] = {}
+
     def register_device_descriptors(self, name: str, descriptors):
         descriptors_with_vs = {}
         for category in descriptors:
@@ -40,10 +50,36 @@ class XTVirtualStateHandler:
                 descriptors_with_vs[category] = tuple(description_list_vs)
         if len(descriptors_with_vs) > 0:
             self.descriptors_with_virtual_state[name] = descriptors_with_vs
+            self._compile_category_virtual_states()
             for device in self.multi_manager.device_map.values():
                 self.apply_init_virtual_states(device)
 
-    def get_category_virtual_states(
+    def _compile_category_virtual_states(self) -> None:
+        categories: set[str] = set()
+        for descriptor in self.descriptors_with_virtual_state.values():
+            categories.update(descriptor)
+        category_virtual_states: dict[str, tuple[DescriptionVirtualState, ...]] = {}
+        category_virtual_states_by_key: dict[
+            str, dict[str, tuple[DescriptionVirtualState, ...]]
+        ] = {}
+        for category in categories:
+            virtual_states = self._build_category_virtual_states(category)
+            if not virtual_states:
+                continue
+            by_key: dict[str, list[DescriptionVirtualState]] = {}
+            for virtual_state in virtual_states:
+                by_key.setdefault(virtual_state.key, []).append(virtual_state)
+            category_virtual_states[category] = tuple(virtual_states)
+            category_virtual_states_by_key[category] = {
+                key: tuple(key_virtual_states)
+                for key, key_virtual_states in by_key.items()
+            }
+
+        # Swap the tables at once so that message processing never sees a partial table
+        self.category_virtual_states = category_virtual_states
+        self.category_virtual_states_by_key = category_virtual_states_by_key
+
+    def _build_category_virtual_states(
         self, category: str
     ) -> list[DescriptionVirtualState]:
         to_return = []
@@ -70,6 +106,37 @@ class XTVirtualStateHandler:
                             to_return.append(found_virtual_state)
         return to_return
 
+    def has_category_virtual_states(self, category: str) -> bool:
+        return category in self.category_virtual_states
+
+    def get_category_virtual_states(
+        self, category: str
+    ) -> tuple[DescriptionVirtualState, ...]:
+        return self.category_virtual_states.get(category, ())
+
+    def get_category_virtual_states_by_key(
+        self, category: str
+    ) -> dict[str, tuple[DescriptionVirtualState, ...]]:
+        return self.category_virtual_states_by_key.get(category, {})
+
+    def is_summed_in_reporting_payload(
+        self, device: shared.XTDevice, item: dict[str, Any]
+    ) -> bool:
+        # The reports of these DPs are increments, none of them can be dropped
+        virtual_states_by_key = self.get_category_virtual_states_by_key(device.category)
+        if not virtual_states_by_key or ("code" not in item and "dpId" not in item):
+            return False
+        code, _, _, result_ok = self.multi_manager._read_code_dpid_value_from_state(
+            device.id, item, False, True
+        )
+        if not result_ok:
+            return False
+        return any(
+            virtual_state.virtual_state_value
+            == VirtualStates.STATE_SUMMED_IN_REPORTING_PAYLOAD
+            for virtual_state in virtual_states_by_key.get(code, ())
+        )
+
     def apply_init_virtual_states(self, device: shared.XTDevice):
         # WARNING, this method might be called multiple times for the same device, make sure it doesn't
         # fail upon multiple successive calls
@@ -127,6 +194,7 @@ class XTVirtualStateHandler:
                                         device.local_strategy[new_dp_id] = (
                                             new_local_strategy
                                         )
+                                        device.invalidate_dpcode_index()
                                         device.status_range[new_code].dp_id = new_dp_id
                         for vs_new_code in virtual_state.vs_copy_delta_to_state:
                             new_code = str(vs_new_code)
@@ -172,6 +240,7 @@ class XTVirtualStateHandler:
                                         device.local_strategy[new_dp_id] = (
                                             new_local_strategy
                                         )
+                                        device.invalidate_dpcode_index()
                                         device.status_range[new_code].dp_id = new_dp_id
                     if virtual_state.key in device.function:
                         for vs_new_code in virtual_state.vs_copy_to_state:
@@ -220,6 +289,7 @@ class XTVirtualStateHandler:
                                         device.local_strategy[new_dp_id] = (
                                             new_local_strategy
                                         )
+                                        device.invalidate_dpcode_index()
                                         device.function[new_code].dp_id = new_dp_id
                         for vs_new_code in virtual_state.vs_copy_delta_to_state:
                             new_code = str(vs_new_code)
@@ -265,68 +335,68 @@ class XTVirtualStateHandler:
                                         device.local_strategy[new_dp_id] = (
                                             new_local_strategy
                                         )
+                                        device.invalidate_dpcode_index()
                                         device.function[new_code].dp_id = new_dp_id
 
     def apply_virtual_states_to_status_list(
         self,
         device: shared.XTDevice,
-        status_in: list[dict[str, Any]],
+        status: list[srp.XTStatusReportItem],
         source: str | None = None,
-    ) -> list:
-        if not status_in:
-            return status_in
-        status = copy.deepcopy(status_in)
+    ) -> list[srp.XTStatusReportItem]:
+        # The items of status are owned by the status report pipeline and are updated in place
+        if not status or not self.has_category_virtual_states(device.category):
+            return status
         virtual_states = self.get_category_virtual_states(device.category)
         for virtual_state in virtual_states:
             if (
                 virtual_state.virtual_state_value
                 == VirtualStates.STATE_COPY_TO_MULTIPLE_STATE_NAME
             ):
-                for item in status:
-                    code, dpId, new_key_value, result_ok = (
-                        self.multi_manager._read_code_dpid_value_from_state(
-                            device.id, item
-                        )
-                    )
-                    if result_ok and code == virtual_state.key:
-                        cur_key_value = 0
-                        if code in device.status:
-                            cur_key_value = device.status[code]
-                        for state_name in virtual_state.vs_copy_to_state:
-                            code, dpId, new_key_value, result_ok = (
-                                self.multi_manager._read_code_dpid_value_from_state(
-                                    device.id,
-                                    {"code": str(state_name), "value": new_key_value},
-                                )
+                # Only go through the reported items, not the ones added below
+                for index in range(len(status)):
+                    item = status[index]
+                    if item.code != virtual_state.key or "dpId" not in item.data:
+                        continue
+                    new_key_value = item.data.get("value")
+                    cur_key_value = 0
+                    if item.code in device.status:
+                        cur_key_value = device.status[item.code]
+                    for state_name in virtual_state.vs_copy_to_state:
+                        code, dpId, new_key_value, result_ok = (
+                            self.multi_manager._read_code_dpid_value_from_state(
+                                device.id,
+                                {"code": str(state_name), "value": new_key_value},
                             )
-                            if result_ok:
-                                new_status = {
-                                    "code": code,
-                                    "value": copy.copy(new_key_value),
-                                    "dpId": dpId,
-                                }
-                                status.append(new_status)
-                        for state_name in virtual_state.vs_copy_delta_to_state:
-                            code, dpId, new_key_value, result_ok = (
-                                self.multi_manager._read_code_dpid_value_from_state(
-                                    device.id,
-                                    {"code": str(state_name), "value": new_key_value},
-                                )
+                        )
+                        if result_ok:
+                            new_status = {
+                                "code": code,
+                                "value": copy.copy(new_key_value),
+                                "dpId": dpId,
+                            }
+                            status.append(srp.XTStatusReportItem(new_status, code))
+                    for state_name in virtual_state.vs_copy_delta_to_state:
+                        code, dpId, new_key_value, result_ok = (
+                            self.multi_manager._read_code_dpid_value_from_state(
+                                device.id,
+                                {"code": str(state_name), "value": new_key_value},
                             )
-                            current_value = None
-                            if code in device.status:
-                                current_value = device.status.get(code)
-                            if (
-                                result_ok
-                                and current_value is not None
-                                and isinstance(new_key_value, (int, float))
-                            ):
-                                new_status = {
-                                    "code": code,
-                                    "value": copy.copy(new_key_value - cur_key_value),
-                                    "dpId": dpId,
-                                }
-                                status.append(new_status)
+                        )
+                        current_value = None
+                        if code in device.status:
+                            current_value = device.status.get(code)
+                        if (
+                            result_ok
+                            and current_value is not None
+                            and isinstance(new_key_value, (int, float))
+                        ):
+                            new_status = {
+                                "code": code,
+                                "value": copy.copy(new_key_value - cur_key_value),
+                                "dpId": dpId,
+                            }
+                            status.append(srp.XTStatusReportItem(new_status, code))
 
             if (
                 virtual_state.virtual_state_value
@@ -336,27 +406,19 @@ class XTVirtualStateHandler:
                     continue
                 if device.status[virtual_state.key] is None:
                     device.status[virtual_state.key] = 0
-                if virtual_state.key in device.status:
-                    for item in status:
-                        code, dpId, new_key_value, result_ok = (
-                            self.multi_manager._read_code_dpid_value_from_state(
-                                device.id,
-                                item,
-                                False,
-                                True,
-                            )
+                # Several reports of the same code in one payload add up
+                summed_value = device.status[virtual_state.key]
+                for item in status:
+                    if item.code == virtual_state.key:
+                        before_value = item.data["value"]
+                        summed_value = before_value + summed_value
+                        item.data["value"] = summed_value
+                        self.multi_manager.device_watcher.report_message(
+                            device.id,
+                            f"[{source}]VS State applying: code: {item.code}, before_update: {before_value}, after_update: {summed_value}, status: {status}",
+                            XTDeviceWatcherCategory.VIRTUAL_STATE,
+                            device,
                         )
-                        if result_ok and code == virtual_state.key:
-                            before_value = item["value"]
-                            item["value"] += device.status[virtual_state.key]
-                            after_value = item["value"]
-                            self.multi_manager.device_watcher.report_message(
-                                device.id,
-                                f"[{source}]VS State applying: code: {code}, before_update: {before_value}, after_update: {after_value}, status_in: {status_in}",
-                                XTDeviceWatcherCategory.VIRTUAL_STATE,
-                                device,
-                            )
-                            continue
         return status
 
     def _get_empty_local_strategy_dp_id(self, device: shared.XTDevice) -> int | None:
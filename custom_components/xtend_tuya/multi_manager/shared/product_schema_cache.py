@@ -0,0 +1,212 @@
+from __future__ import annotations
+import copy
+import hashlib
+import threading
+import time
+from enum import StrEnum
+from typing import Any, Callable
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from ...const import (
+    DOMAIN,
+    LOGGER,
+    XT_PRODUCT_SCHEMA_CACHE_MAX_AGE,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+
+
+class XTProductSchemaKind(StrEnum):
+    IOT_SPECIFICATION = "iot_specification"
+    IOT_MODEL = "iot_model"
+    SHARING_SPECIFICATION = "sharing_specification"
+    SHARING_STRATEGY = "sharing_strategy"
+
+
+class _XTProductSchema:
+    def __init__(
+        self, fetch_time: float, response: dict[str, Any], fingerprints: set[str]
+    ) -> None:
+        self.fetch_time = fetch_time
+        self.response = response
+
+        # Fingerprints of the devices the schema was checked against
+        self.fingerprints = fingerprints
+
+
+class _XTPendingSchemaRequest:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.response: dict[str, Any] | None = None
+
+
+class XTProductSchemaCache:
+    STORAGE_VERSION = 1
+
+    # Bumped when the way the schemas are parsed changes, older caches are dropped
+    SCHEMA_VERSION = 1
+
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager,
+        max_age: float = XT_PRODUCT_SCHEMA_CACHE_MAX_AGE,
+    ) -> None:
+        self.multi_manager = multi_manager
+        self.max_age = max_age
+        self.store = XTProductSchemaCache.get_store(
+            multi_manager.hass, multi_manager.config_entry.entry_id
+        )
+        self.lock = threading.Lock()
+        self.loaded: bool = False
+
+        # "kind|product_id" -> successful response
+        self.schemas: dict[str, _XTProductSchema] = {}
+        self.pending_requests: dict[str, _XTPendingSchemaRequest] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.changed: int = 0
+
+    @staticmethod
+    def get_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+        return Store(
+            hass,
+            XTProductSchemaCache.STORAGE_VERSION,
+            f"{DOMAIN}.product_schemas.{entry_id}",
+        )
+
+    @staticmethod
+    def get_device_fingerprint(device: Any) -> str:
+        # The DPs a device reports in the device list, they change with the
+        # functions of its product (the update time changes with the status)
+        status = getattr(device, "status", None) or {}
+        if isinstance(status, list):
+            # Not converted yet, as received in the device list
+            codes = [str(item.get("code")) for item in status]
+        else:
+            codes = [str(code) for code in status]
+        return hashlib.sha1("|".join(sorted(codes)).encode("utf8")).hexdigest()
+
+    def get_response(
+        self,
+        kind: str,
+        product_id: str | None,
+        request: Callable[[], dict[str, Any]],
+        fingerprint: str | None = None,
+    ) -> dict[str, Any]:
+        # The schemas are shared by the devices of a product, only the first
+        # device of a product fetches them and the others get a copy.
+        # A device with an unknown fingerprint fetches it again, in case the
+        # functions of the product changed in the cloud
+        if not product_id:
+            return request()
+        key = f"{kind}|{product_id}"
+        with self.lock:
+            entry = self.schemas.get(key)
+            if (
+                entry is not None
+                and time.time() - entry.fetch_time < self.max_age
+                and (fingerprint is None or fingerprint in entry.fingerprints)
+            ):
+                self.hits += 1
+                return copy.deepcopy(entry.response)
+            pending_request = self.pending_requests.get(key)
+            is_owner = pending_request is None
+            if pending_request is None:
+                pending_request = self.pending_requests[key] = (
+                    _XTPendingSchemaRequest()
+                )
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_owner:
+            pending_request.event.wait()
+            if pending_request.response is None:
+                return request()
+            return copy.deepcopy(pending_request.response)
+
+        try:
+            response = request()
+            pending_request.response = response
+            if response.get("success", False):
+                with self.lock:
+                    fingerprints = {fingerprint} if fingerprint else set()
+                    previous_entry = self.schemas.get(key)
+                    if previous_entry is not None:
+                        if previous_entry.response.get("result") == response.get(
+                            "result"
+                        ):
+                            fingerprints |= previous_entry.fingerprints
+                        else:
+                            # The devices checked against the old schema are
+                            # checked again
+                            self.changed += 1
+                    self.schemas[key] = _XTProductSchema(
+                        time.time(), copy.deepcopy(response), fingerprints
+                    )
+            return copy.deepcopy(response)
+        finally:
+            with self.lock:
+                self.pending_requests.pop(key, None)
+            pending_request.event.set()
+
+    def invalidate_product(self, product_id: str):
+        with self.lock:
+            for key in [
+                key for key in self.schemas if key.endswith(f"|{product_id}")
+            ]:
+                del self.schemas[key]
+
+    async def async_load(self) -> None:
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            data = await self.store.async_load()
+            if not data:
+                return
+            if data.get("schema_version") != XTProductSchemaCache.SCHEMA_VERSION:
+                LOGGER.debug("Product schema cache is outdated, ignoring it")
+                return
+            now = time.time()
+            with self.lock:
+                for key, entry in data.get("schemas", {}).items():
+                    if now - entry["time"] < self.max_age:
+                        self.schemas[key] = _XTProductSchema(
+                            entry["time"],
+                            entry["response"],
+                            set(entry.get("fingerprints", [])),
+                        )
+        except Exception as e:
+            LOGGER.warning(f"Could not load the product schema cache, ignoring it: {e}")
+
+    async def async_save(self) -> None:
+        with self.lock:
+            schemas = {
+                key: {
+                    "time": entry.fetch_time,
+                    "response": entry.response,
+                    "fingerprints": sorted(entry.fingerprints),
+                }
+                for key, entry in self.schemas.items()
+            }
+        try:
+            await self.store.async_save(
+                {
+                    "schema_version": XTProductSchemaCache.SCHEMA_VERSION,
+                    "schemas": schemas,
+                }
+            )
+        except Exception as e:
+            LOGGER.warning(f"Could not save the product schema cache: {e}")
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "changed": self.changed,
+                "products": len({key.split("|", 1)[1] for key in self.schemas}),
+                "size": len(self.schemas),
+            }
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import json
 import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from aiohttp import web
@@ -33,6 +34,9 @@ CONF_SESSION_ID = "session_id"
 CONF_FORMAT = "format"
 CONF_CHANNEL = "channel"
 
+STARTUP_TRACE_FORMAT_CHROME = "chrome"
+STARTUP_TRACE_FORMAT_SUMMARY = "summary"
+
 SERVICE_GET_CAMERA_STREAM_URL = "get_camera_stream_url"
 SERVICE_GET_CAMERA_STREAM_URL_SCHEMA = vol.Schema(
     {
@@ -80,6 +84,15 @@ SERVICE_WEBRTC_DEBUG_SCHEMA = vol.Schema(
     }
 )
 
+SERVICE_EXPORT_STARTUP_TRACE = "export_startup_trace"
+SERVICE_EXPORT_STARTUP_TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_FORMAT): vol.In(
+            [STARTUP_TRACE_FORMAT_CHROME, STARTUP_TRACE_FORMAT_SUMMARY]
+        ),
+    }
+)
+
 
 class ServiceManager:
     def __init__(self, multi_manager: mm.MultiManager) -> None:
@@ -132,6 +145,15 @@ class ServiceManager:
             True,
             False,
         )
+        self._register_service(
+            DOMAIN,
+            SERVICE_EXPORT_STARTUP_TRACE,
+            self._handle_export_startup_trace,
+            SERVICE_EXPORT_STARTUP_TRACE_SCHEMA,
+            True,
+            True,
+            False,
+        )
 
     def _register_service(
         self,
@@ -186,12 +208,7 @@ class ServiceManager:
         if source is not None and method is not None and url is not None:
             if account := self.multi_manager.get_account_by_name(source):
                 try:
-                    if (
-                        response
-                        := await XTEventLoopProtector.execute_out_of_event_loop_and_return(
-                            account.call_api, method, url, payload
-                        )
-                    ):
+                    if response := await account.async_call_api(method, url, payload):
                         LOGGER.debug(f"API call response: {response}")
                         return response
                 except Exception as e:
@@ -240,6 +257,38 @@ class ServiceManager:
                     return debug_output
         return None
 
+    async def _handle_export_startup_trace(
+        self, event: XTEventData
+    ) -> web.Response | dict[str, Any] | None:
+        format = event.data.get(CONF_FORMAT, STARTUP_TRACE_FORMAT_CHROME)
+        multi_manager_list = get_all_multi_managers(self.hass)
+        if format == STARTUP_TRACE_FORMAT_SUMMARY:
+            trace: dict[str, Any] = {
+                multi_manager.config_entry.title: multi_manager.startup_tracer.get_summary()
+                for multi_manager in multi_manager_list
+            }
+        else:
+            trace_events: list[dict[str, Any]] = []
+            for index, multi_manager in enumerate(multi_manager_list):
+                trace_events.extend(
+                    multi_manager.startup_tracer.get_chrome_trace_events(index + 1)
+                )
+            trace = {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+        file_path = self.hass.config.path(f"{DOMAIN}_startup_trace_{format}.json")
+        try:
+            await self.hass.async_add_executor_job(
+                self._write_json_file, file_path, trace
+            )
+            LOGGER.info(f"Startup trace written to {file_path}")
+        except Exception as e:
+            LOGGER.warning(f"Could not write the startup trace to {file_path}: {e}")
+        return trace
+
+    @staticmethod
+    def _write_json_file(file_path: str, data: dict[str, Any]):
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
     async def _handle_webrtc_sdp_exchange(
         self, event: XTEventData
     ) -> web.Response | str | None:
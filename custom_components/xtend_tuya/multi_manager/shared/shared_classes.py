@@ -167,6 +167,40 @@ class XTDeviceFunction(XTDeviceStatusFunctionShared):
         )
 
 
+class XTDeviceDPCodeIndex:
+    def __init__(self, device: XTDevice) -> None:
+        self.local_strategy = device.local_strategy
+        self.local_strategy_size = len(device.local_strategy)
+        self.code_to_dpid: dict[str, int] = {}
+        self.dpid_to_code: dict[int, str] = {}
+        self.alias_to_code: dict[str, str] = {}
+        self.code_to_aliases: dict[str, list[str]] = {}
+        for dpId, dp_item in device.local_strategy.items():
+            status_code = dp_item.get("status_code")
+            if status_code is not None:
+                self.dpid_to_code[dpId] = status_code
+                self.code_to_dpid.setdefault(status_code, dpId)
+            if "status_code_alias" not in dp_item:
+                LOGGER.warning(
+                    f"Device {device.name} ({device.id}) has no status_code_alias dict for dpId {dpId}, please contact the developer about this"
+                )
+                continue
+            for alias in dp_item["status_code_alias"]:
+                self.code_to_dpid.setdefault(alias, dpId)
+                if status_code:
+                    self.alias_to_code[alias] = status_code
+            if status_code is not None:
+                self.code_to_aliases.setdefault(status_code, []).extend(
+                    dp_item["status_code_alias"]
+                )
+
+    def is_valid_for(self, device: XTDevice) -> bool:
+        return (
+            self.local_strategy is device.local_strategy
+            and self.local_strategy_size == len(device.local_strategy)
+        )
+
+
 class XTDevice(TuyaDevice):
     id: str
     name: str
@@ -200,6 +234,7 @@ class XTDevice(TuyaDevice):
     device_preference: dict[str, Any] = {}
     original_device: Any = None
     device_map: XTDeviceMap | None = None
+    dpcode_index: XTDeviceDPCodeIndex | None = None
 
     FIELDS_TO_EXCLUDE_FROM_SYNC: list[str] = [
         "id",
@@ -207,6 +242,7 @@ class XTDevice(TuyaDevice):
         "device_source_priority",
         "original_device",
         "source",
+        "dpcode_index",
     ]
 
     class XTDevicePreference(StrEnum):
@@ -358,20 +394,24 @@ class XTDevice(TuyaDevice):
     def set_preference(self, pref_id: str, pref_val: Any):
         self.device_preference[pref_id] = pref_val
 
+    def get_dpcode_index(self) -> XTDeviceDPCodeIndex:
+        dpcode_index = self.dpcode_index
+        if dpcode_index is None or not dpcode_index.is_valid_for(self):
+            dpcode_index = self.rebuild_dpcode_index()
+        return dpcode_index
+
+    def rebuild_dpcode_index(self) -> XTDeviceDPCodeIndex:
+        self.dpcode_index = XTDeviceDPCodeIndex(self)
+        return self.dpcode_index
+
+    def invalidate_dpcode_index(self):
+        self.dpcode_index = None
+
     def get_all_status_code_aliases(self) -> dict[str, str]:
-        return_list: dict[str, str] = {}
-        for local_strategy in self.local_strategy.values():
-            if status_code := local_strategy.get("status_code", None):
-                for alias in local_strategy.get("status_code_alias", {}):
-                    return_list[alias] = status_code
-        return return_list
+        return dict(self.get_dpcode_index().alias_to_code)
 
     def get_status_code_aliases(self, status_code: str) -> list[str]:
-        alias_list: list[str] = []
-        for local_strategy in self.local_strategy.values():
-            if local_strategy.get("status_code", None) == status_code:
-                alias_list.extend(local_strategy.get("status_code_alias", []))
-        return alias_list
+        return list(self.get_dpcode_index().code_to_aliases.get(status_code, []))
 
     def replace_status_code_with_another(
         self,
@@ -416,6 +456,7 @@ class XTDevice(TuyaDevice):
                             break
                         config_item["statusFormat"] = json.dumps(status_formats_dict)
                 break
+        self.invalidate_dpcode_index()
 
     def get_dpcode_information(
         self, dpcode: str | None = None, dpid: int | None = None
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from typing import Any, Iterator
+from ...const import (
+    XT_STARTUP_TRACE_MAX_SPANS,
+    XTDeviceWatcherCategory,
+    XTDeviceWatcherSpecialDevice,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+
+# Device ids, uids, asset ids... are replaced to group the calls by endpoint
+ID_IN_PATH_PATTERN = re.compile(r"/(?=[a-zA-Z]*[0-9])[0-9a-zA-Z]{12,}(?=/|$)")
+
+# Logins and token refreshes (refresh token in the path) are never traced
+UNTRACED_PATH_PATTERN = re.compile(r"/token|/login|authorized-login")
+
+
+class XTTraceSpan:
+    __slots__ = ("name", "category", "track", "start", "duration", "args")
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        track: str,
+        start: float,
+        duration: float,
+        args: dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.category = category
+        self.track = track
+        self.start = start
+        self.duration = duration
+        self.args = args
+
+
+class XTStartupTracer:
+    CATEGORY_SETUP = "setup"
+    CATEGORY_ACCOUNT = "account"
+    CATEGORY_DEVICE = "device"
+    CATEGORY_CLOUD_FIX = "cloud_fix"
+    CATEGORY_API = "api"
+
+    def __init__(
+        self,
+        multi_manager: mm.MultiManager | None = None,
+        enabled: bool = False,
+        max_spans: int = XT_STARTUP_TRACE_MAX_SPANS,
+    ) -> None:
+        self.multi_manager = multi_manager
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.spans: list[XTTraceSpan] = []
+        self.dropped_span_count: int = 0
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        category: str = CATEGORY_SETUP,
+        track: str | None = None,
+        report: bool = False,
+        **args: Any,
+    ) -> Iterator[None]:
+        # report keeps the XT_PERFORMANCE device watcher message of the phase,
+        # it is sent even when tracing is disabled
+        if not self.enabled and not report:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if report and self.multi_manager is not None:
+                self.multi_manager.device_watcher.report_message(
+                    XTDeviceWatcherSpecialDevice.NOT_LINKED_TO_A_DEVICE,
+                    f"Xtended Tuya {self.multi_manager.config_entry.title} {timedelta(seconds=duration)} for {name}",
+                    XTDeviceWatcherCategory.XT_PERFORMANCE,
+                    None,
+                    False,
+                )
+            if self.enabled:
+                self._add_span(name, category, track, start, duration, args)
+
+    def api_span(self, method: str, path: str):
+        if not self.enabled or UNTRACED_PATH_PATTERN.search(path):
+            return nullcontext()
+        return self.span(
+            f"{method} {ID_IN_PATH_PATTERN.sub('/{id}', path)}",
+            XTStartupTracer.CATEGORY_API,
+        )
+
+    def _add_span(
+        self,
+        name: str,
+        category: str,
+        track: str | None,
+        start: float,
+        duration: float,
+        args: dict[str, Any],
+    ):
+        if track is None:
+            track = threading.current_thread().name
+        with self.lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped_span_count += 1
+                return
+            self.spans.append(
+                XTTraceSpan(
+                    name, category, track, start - self.origin, duration, args
+                )
+            )
+
+    def stop(self):
+        # Only the startup is traced
+        self.enabled = False
+
+    def get_chrome_trace_events(self, pid: int = 1) -> list[dict[str, Any]]:
+        # Chrome trace event format, can be opened in chrome://tracing or Perfetto
+        with self.lock:
+            spans = list(self.spans)
+        track_ids: dict[str, int] = {}
+        events: list[dict[str, Any]] = []
+        if self.multi_manager is not None:
+            events.append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": self.multi_manager.config_entry.title},
+                }
+            )
+        for span in spans:
+            if span.track not in track_ids:
+                track_ids[span.track] = len(track_ids) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": track_ids[span.track],
+                        "args": {"name": span.track},
+                    }
+                )
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round(span.start * 1_000_000),
+                    "dur": round(span.duration * 1_000_000),
+                    "pid": pid,
+                    "tid": track_ids[span.track],
+                    "args": span.args,
+                }
+            )
+        return events
+
+    def get_summary(self, top: int = 20) -> dict[str, Any]:
+        with self.lock:
+            spans = list(self.spans)
+        by_name: dict[str, dict[str, Any]] = {}
+        for span in spans:
+            if span.category != XTStartupTracer.CATEGORY_API:
+                continue
+            entry = by_name.setdefault(
+                span.name,
+                {
+                    "name": span.name,
+                    "count": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                },
+            )
+            entry["count"] += 1
+            entry["total_time"] += span.duration
+            entry["max_time"] = max(entry["max_time"], span.duration)
+        slowest_devices = sorted(
+            (
+                span
+                for span in spans
+                if span.category == XTStartupTracer.CATEGORY_DEVICE
+            ),
+            key=lambda span: span.duration,
+            reverse=True,
+        )[:top]
+        return {
+            "span_count": len(spans),
+            "dropped_span_count": self.dropped_span_count,
+            "phases": [
+                {
+                    "name": span.name,
+                    "start": round(span.start, 6),
+                    "duration": round(span.duration, 6),
+                }
+                for span in spans
+                if span.category
+                in (XTStartupTracer.CATEGORY_SETUP, XTStartupTracer.CATEGORY_ACCOUNT)
+            ],
+            "slowest_endpoints": sorted(
+                by_name.values(), key=lambda entry: entry["total_time"], reverse=True
+            )[:top],
+            "slowest_devices": [
+                {"name": span.name, "duration": round(span.duration, 6), **span.args}
+                for span in slowest_devices
+            ],
+        }
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import time
+from typing import Any, Callable
+from ...const import (
+    MESSAGE_SOURCE_TUYA_SHARING,
+)
+import custom_components.xtend_tuya.multi_manager.multi_manager as mm
+import custom_components.xtend_tuya.multi_manager.shared.shared_classes as shared
+
+
+class XTStatusReportItem:
+    __slots__ = ("data", "code")
+
+    def __init__(self, data: dict[str, Any], code: str | None) -> None:
+        # data is owned by the pipeline and is what is finally applied to the device
+        self.data = data
+        self.code = code
+
+    def __repr__(self) -> str:
+        return f"{self.data}"
+
+
+class XTStatusReportStageStatistics:
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total_time: float = 0.0
+        self.max_time: float = 0.0
+
+    def register(self, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        if duration > self.max_time:
+            self.max_time = duration
+
+    def as_dict(self) -> dict[str, Any]:
+        average_time = 0.0
+        if self.count > 0:
+            average_time = self.total_time / self.count
+        return {
+            "count": self.count,
+            "average_time": round(average_time, 6),
+            "max_time": round(self.max_time, 6),
+        }
+
+
+class XTStatusReportPipeline:
+    STAGE_NORMALIZE = "normalize"
+    STAGE_FILTER = "filter"
+    STAGE_VIRTUAL_STATE = "virtual_state"
+    STAGE_APPLY = "apply"
+
+    def __init__(self, multi_manager: mm.MultiManager) -> None:
+        self.multi_manager = multi_manager
+        self.stage_statistics: dict[str, XTStatusReportStageStatistics] = {
+            XTStatusReportPipeline.STAGE_NORMALIZE: XTStatusReportStageStatistics(),
+            XTStatusReportPipeline.STAGE_FILTER: XTStatusReportStageStatistics(),
+            XTStatusReportPipeline.STAGE_VIRTUAL_STATE: XTStatusReportStageStatistics(),
+            XTStatusReportPipeline.STAGE_APPLY: XTStatusReportStageStatistics(),
+        }
+        self.timing_hooks: list[Callable[[str, str, str, float], None]] = []
+
+    def add_timing_hook(self, hook: Callable[[str, str, str, float], None]) -> None:
+        # hook(device_id, source, stage, duration)
+        self.timing_hooks.append(hook)
+
+    def remove_timing_hook(self, hook: Callable[[str, str, str, float], None]) -> None:
+        if hook in self.timing_hooks:
+            self.timing_hooks.remove(hook)
+
+    def get_statistics(self) -> dict[str, Any]:
+        return {
+            stage: statistics.as_dict()
+            for stage, statistics in self.stage_statistics.items()
+        }
+
+    def _register_stage_time(
+        self, device_id: str, source: str, stage: str, start_time: float
+    ) -> float:
+        end_time = time.perf_counter()
+        duration = end_time - start_time
+        self.stage_statistics[stage].register(duration)
+        for hook in self.timing_hooks:
+            hook(device_id, source, stage, duration)
+        return end_time
+
+    def process(
+        self,
+        device: shared.XTDevice,
+        status_in: list[dict[str, Any]],
+        source: str,
+        apply_callback: Callable[[list[dict[str, Any]]], None],
+    ) -> None:
+        start_time = time.perf_counter()
+        status = self.normalize(device, status_in, source)
+        start_time = self._register_stage_time(
+            device.id, source, XTStatusReportPipeline.STAGE_NORMALIZE, start_time
+        )
+        status = self.multi_manager.multi_source_handler.filter_status_list(
+            device.id, source, status
+        )
+        start_time = self._register_stage_time(
+            device.id, source, XTStatusReportPipeline.STAGE_FILTER, start_time
+        )
+        status = self.multi_manager.virtual_state_handler.apply_virtual_states_to_status_list(
+            device, status, source
+        )
+        start_time = self._register_stage_time(
+            device.id, source, XTStatusReportPipeline.STAGE_VIRTUAL_STATE, start_time
+        )
+        status_list = [item.data for item in status]
+        apply_callback(status_list)
+        self._register_stage_time(
+            device.id, source, XTStatusReportPipeline.STAGE_APPLY, start_time
+        )
+        self.multi_manager.command_dispatcher.on_status_report(device, status_list)
+
+    def normalize(
+        self, device: shared.XTDevice, status_in: list[dict[str, Any]], source: str
+    ) -> list[XTStatusReportItem]:
+        # The incoming items belong to the MQTT message, only shallow copies are modified
+        status: list[XTStatusReportItem] = []
+        convert_time = source == MESSAGE_SOURCE_TUYA_SHARING
+        for item_in in status_in:
+            item = dict(item_in)
+            if convert_time and "t" in item:
+                item["t"] = int(item["t"] / 1000)  # Convert from ms to s
+            code, dpId, value, result_ok = (
+                self.multi_manager._read_code_dpid_value_from_state(
+                    device.id, item, False, True
+                )
+            )
+            if not result_ok:
+                code = None
+            elif dpId is not None:
+                item["code"] = code
+                item["dpId"] = dpId
+                item["value"] = value
+            status.append(XTStatusReportItem(item, code))
+        return status
@@ -2,14 +2,19 @@ from __future__ import annotations
 import threading
 import inspect
 import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from functools import partial
-from typing import Any
+from typing import Any, Callable
 from homeassistant.core import (
     HomeAssistant,
     callback,
 )
 from ...const import (
+    DOMAIN,
     LOGGER,
+    XT_EXECUTOR_MAX_WORKERS,
+    XT_EXECUTOR_MAX_NESTED_WORKERS,
 )
 
 
@@ -96,68 +101,155 @@ class XTEventLoopProtector:
                 )
 
 
-class XTThread(threading.Thread):
-    def __init__(self, callable, immediate_start: bool = False, *args, **kwargs):
-        self.callable = callable
-        self.immediate_start = immediate_start
-        self.exception: Exception | None = None
-        super().__init__(target=self.call_thread, args=args, kwargs=kwargs)
+class XTExecutorService:
+    # Integration wide pool, shared by all the config entries.
+    # The jobs submitted by its jobs run on the nested pool so that a job
+    # waiting for them can't exhaust the pool it runs on, and the jobs
+    # submitted from the nested pool run inline (no third level of fan-out)
+    max_workers: int = XT_EXECUTOR_MAX_WORKERS
+    max_nested_workers: int = XT_EXECUTOR_MAX_NESTED_WORKERS
+    _executor: ThreadPoolExecutor | None = None
+    _nested_executor: ThreadPoolExecutor | None = None
+    _lock = threading.Lock()
+    _worker_state = threading.local()
+
+    job_count: int = 0
+    failed_job_count: int = 0
+    total_run_time: float = 0.0
+    max_run_time: float = 0.0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
 
-    def call_thread(self, *args, **kwargs):
-        try:
-            self.callable(*args, **kwargs)
-        except Exception as e:
-            self.exception = e
+    @staticmethod
+    def get_executor() -> ThreadPoolExecutor:
+        with XTExecutorService._lock:
+            if XTExecutorService._executor is None:
+                XTExecutorService._executor = ThreadPoolExecutor(
+                    max_workers=XTExecutorService.max_workers,
+                    thread_name_prefix=DOMAIN,
+                )
+            return XTExecutorService._executor
 
-    def raise_exception_if_needed(self):
-        if self.exception:
-            raise self.exception
+    @staticmethod
+    def get_nested_executor() -> ThreadPoolExecutor:
+        with XTExecutorService._lock:
+            if XTExecutorService._nested_executor is None:
+                XTExecutorService._nested_executor = ThreadPoolExecutor(
+                    max_workers=XTExecutorService.max_nested_workers,
+                    thread_name_prefix=f"{DOMAIN}_nested",
+                )
+            return XTExecutorService._nested_executor
 
+    @staticmethod
+    def get_worker_depth() -> int:
+        # 0 out of the pools, 1 on the pool, 2 on the nested pool
+        return getattr(XTExecutorService._worker_state, "depth", 0)
 
-class XTThreadingManager:
-    join_timeout: float = 0.05
+    @staticmethod
+    def is_worker_thread() -> bool:
+        return XTExecutorService.get_worker_depth() > 0
 
-    def __init__(self) -> None:
-        self.thread_queue: list[XTThread] = []
-        self.thread_active_list: list[XTThread] = []
-        self.thread_finished_list: list[XTThread] = []
-        self.max_concurrency: int | None = None
+    @staticmethod
+    def _run_job(
+        submit_time: float, depth: int, callable: Callable, *args, **kwargs
+    ) -> Any:
+        start_time = time.monotonic()
+        previous_depth = XTExecutorService.get_worker_depth()
+        XTExecutorService._worker_state.depth = depth
+        failed = False
+        try:
+            return callable(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            XTExecutorService._worker_state.depth = previous_depth
+            end_time = time.monotonic()
+            with XTExecutorService._lock:
+                XTExecutorService.job_count += 1
+                if failed:
+                    XTExecutorService.failed_job_count += 1
+                XTExecutorService.total_run_time += end_time - start_time
+                XTExecutorService.max_run_time = max(
+                    XTExecutorService.max_run_time, end_time - start_time
+                )
+                XTExecutorService.total_wait_time += start_time - submit_time
+                XTExecutorService.max_wait_time = max(
+                    XTExecutorService.max_wait_time, start_time - submit_time
+                )
 
-    def add_thread(self, callable, immediate_start: bool = False, *args, **kwargs):
-        thread = XTThread(callable=callable, *args, **kwargs)
-        self.thread_queue.append(thread)
-        if immediate_start:
-            thread.start()
+    @staticmethod
+    def submit(callable: Callable, *args, **kwargs) -> Future:
+        depth = XTExecutorService.get_worker_depth()
+        if depth >= 2:
+            # The nested jobs never wait for queued jobs, they can't deadlock
+            future: Future = Future()
+            try:
+                future.set_result(
+                    XTExecutorService._run_job(
+                        time.monotonic(), depth, callable, *args, **kwargs
+                    )
+                )
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        executor = (
+            XTExecutorService.get_executor()
+            if depth == 0
+            else XTExecutorService.get_nested_executor()
+        )
+        return executor.submit(
+            XTExecutorService._run_job,
+            time.monotonic(),
+            depth + 1,
+            callable,
+            *args,
+            **kwargs,
+        )
 
-    def start_all_threads(self, max_concurrency: int | None = None) -> None:
-        self.max_concurrency = max_concurrency
-        while (
-            max_concurrency is None or len(self.thread_active_list) < max_concurrency
-        ) and len(self.thread_queue) > 0:
-            added_thread = self.thread_queue.pop(0)
-            added_thread.start()
-            self.thread_active_list.append(added_thread)
-
-    def start_and_wait(self, max_concurrency: int | None = None) -> None:
-        self.start_all_threads(max_concurrency)
-        self.wait_for_all_threads()
-
-    def clean_finished_threads(self):
-        thread_active_list = self.thread_active_list
-        at_least_one_thread_removed: bool = False
-        for thread in thread_active_list:
-            if thread.is_alive() is False:
-                thread.join()
-                self.thread_active_list.remove(thread)
-                self.thread_finished_list.append(thread)
-                at_least_one_thread_removed = True
-        if at_least_one_thread_removed:
-            self.start_all_threads(max_concurrency=self.max_concurrency)
-
-    def wait_for_all_threads(self) -> None:
-        while len(self.thread_active_list) > 0:
-            self.clean_finished_threads()
-            if len(self.thread_active_list) > 0:
-                self.thread_active_list[0].join(timeout=self.join_timeout)
-        for thread in self.thread_finished_list:
-            thread.raise_exception_if_needed()
+    @staticmethod
+    def run_all(jobs: list[Callable[[], Any]], max_concurrency: int | None = None) -> list[Any]:
+        # Returns the results in the order of the jobs once they are all done,
+        # the exceptions of the failed jobs are raised together
+        futures: list[Future] = []
+        running: set[Future] = set()
+        for job in jobs:
+            if max_concurrency is not None and len(running) >= max_concurrency:
+                _, running = wait(running, return_when=FIRST_COMPLETED)
+            future = XTExecutorService.submit(job)
+            futures.append(future)
+            running.add(future)
+        wait(futures)
+        return XTExecutorService._get_results(futures)
+
+    @staticmethod
+    def _get_results(futures: list[Future]) -> list[Any]:
+        exceptions = [
+            exception for future in futures if (exception := future.exception())
+        ]
+        if exceptions:
+            raise ExceptionGroup(
+                f"{len(exceptions)} of {len(futures)} jobs failed", exceptions
+            )
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def get_statistics() -> dict[str, Any]:
+        with XTExecutorService._lock:
+            job_count = XTExecutorService.job_count
+            return {
+                "max_workers": XTExecutorService.max_workers,
+                "max_nested_workers": XTExecutorService.max_nested_workers,
+                "jobs": job_count,
+                "failed_jobs": XTExecutorService.failed_job_count,
+                "average_run_time": round(
+                    XTExecutorService.total_run_time / job_count if job_count else 0.0,
+                    6,
+                ),
+                "max_run_time": round(XTExecutorService.max_run_time, 6),
+                "average_wait_time": round(
+                    XTExecutorService.total_wait_time / job_count if job_count else 0.0,
+                    6,
+                ),
+                "max_wait_time": round(XTExecutorService.max_wait_time, 6),
+            }
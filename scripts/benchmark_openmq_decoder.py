@@ -0,0 +1,126 @@
+"""Compare the legacy MQTT message decoding with TuyaMQMessageDecoder.
+
+Run from the repository root:
+
+    python scripts/benchmark_openmq_decoder.py
+"""
+
+from __future__ import annotations
+
+import base64
+import importlib.util
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from Crypto.Cipher import AES
+
+# Loaded from its file, importing the integration package requires Home Assistant
+DECODER_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "xtend_tuya"
+    / "lib"
+    / "tuya_iot"
+    / "openmq_decoder.py"
+)
+_spec = importlib.util.spec_from_file_location("openmq_decoder", DECODER_PATH)
+openmq_decoder = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(openmq_decoder)
+
+GCM_TAG_LENGTH = openmq_decoder.GCM_TAG_LENGTH
+JSON_BACKEND = openmq_decoder.JSON_BACKEND
+TuyaMQMessageDecoder = openmq_decoder.TuyaMQMessageDecoder
+
+
+def legacy_decode(payload: bytes, password: str, use_ecb: bool) -> dict[str, Any]:
+    # Decoding as done before TuyaMQMessageDecoder
+    msg_dict = json.loads(payload.decode("utf8"))
+    key = password[8:24]
+    buffer = base64.b64decode(msg_dict["data"])
+    if use_ecb:
+        msg = AES.new(key.encode("utf8"), AES.MODE_ECB).decrypt(buffer)
+        msg_dict["data"] = json.loads(msg[: -msg[-1]])
+        return msg_dict
+    iv_length = int.from_bytes(buffer[0:4], byteorder="big")
+    cipher = AES.new(key.encode("utf8"), AES.MODE_GCM, nonce=buffer[4 : iv_length + 4])
+    cipher.update(str(msg_dict.get("t", "")).encode("utf8"))
+    plaintext = cipher.decrypt_and_verify(
+        buffer[iv_length + 4 : len(buffer) - GCM_TAG_LENGTH],
+        buffer[len(buffer) - GCM_TAG_LENGTH :],
+    ).decode("utf8")
+    msg_dict["data"] = json.loads(plaintext)
+    return msg_dict
+
+
+def encode(data: dict[str, Any], password: str, use_ecb: bool, t: int) -> bytes:
+    key = password[8:24].encode("utf8")
+    plaintext = json.dumps(data).encode("utf8")
+    if use_ecb:
+        padding = 16 - len(plaintext) % 16
+        encrypted = AES.new(key, AES.MODE_ECB).encrypt(
+            plaintext + bytes([padding]) * padding
+        )
+    else:
+        iv = b"0123456789ab"
+        cipher = AES.new(key, AES.MODE_GCM, nonce=iv)
+        cipher.update(str(t).encode("utf8"))
+        ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+        encrypted = len(iv).to_bytes(4, byteorder="big") + iv + ciphertext + tag
+    envelope = {
+        "protocol": 4,
+        "pv": "2.0",
+        "sign": "",
+        "t": t,
+        "data": base64.b64encode(encrypted).decode("utf8"),
+    }
+    return json.dumps(envelope).encode("utf8")
+
+
+def benchmark(
+    payloads: list[bytes], password: str, use_ecb: bool, iterations: int = 2000
+) -> dict[str, float]:
+    decoder = TuyaMQMessageDecoder(password, use_ecb)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for payload in payloads:
+            legacy_decode(payload, password, use_ecb)
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for payload in payloads:
+            decoder.decode(payload)
+    decoder_time = time.perf_counter() - start
+    message_count = iterations * len(payloads)
+    return {
+        "legacy_us_per_message": legacy_time / message_count * 1e6,
+        "decoder_us_per_message": decoder_time / message_count * 1e6,
+        "speedup": legacy_time / decoder_time,
+    }
+
+
+def main():
+    password = "0123456789abcdef0123456789abcdef"
+    report = {
+        "devId": "bf0123456789abcdefghij",
+        "productKey": "abcdefghijklmnop",
+        "status": [
+            {"code": "cur_current", "value": 512, "t": 1700000000000, "1": 512},
+            {"code": "cur_power", "value": 1103, "t": 1700000000000, "2": 1103},
+            {"code": "cur_voltage", "value": 2301, "t": 1700000000000, "3": 2301},
+        ],
+    }
+    for use_ecb in (True, False):
+        payloads = [
+            encode(report, password, use_ecb, 1700000000000 + i) for i in range(10)
+        ]
+        assert TuyaMQMessageDecoder(password, use_ecb).decode(
+            payloads[0]
+        ) == legacy_decode(payloads[0], password, use_ecb)
+        result = benchmark(payloads, password, use_ecb)
+        print(f"{'ECB' if use_ecb else 'GCM'} ({JSON_BACKEND}): {result}")
+
+
+if __name__ == "__main__":
+    main()